@@ -0,0 +1,3 @@
+"""
+benchmarks: performance benchmarks for realtime_gtfs, run with `make benchmark`
+"""
@@ -0,0 +1,43 @@
+"""
+bench_columnar.py: compare the memory used by stop_times as a list of StopTime
+and as a StopTimeTable
+"""
+
+import argparse
+import tempfile
+import tracemalloc
+
+from realtime_gtfs import GTFS
+
+from benchmarks.bench_csv_reader import write_stop_times
+
+def measure(temp_file, columnar):
+    """
+    measure: parse stop_times.txt, returns the number of rows and the bytes still
+    allocated afterwards
+    """
+    temp_file.seek(0)
+    tracemalloc.start()
+    gtfs = GTFS(columnar=columnar)
+    gtfs.parse_stop_times(temp_file)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(gtfs.stop_times), size
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile() as temp_file:
+        write_stop_times(temp_file, args.rows)
+        for name, columnar in [("list", False), ("StopTimeTable", True)]:
+            rows, size = measure(temp_file, columnar)
+            print(f"{name:>14}: {rows} stop_times in {size / 2**20:.1f} MiB "
+                  f"({size / rows:.0f} bytes/row)")
+
+if __name__ == "__main__":
+    main()
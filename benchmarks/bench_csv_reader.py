@@ -0,0 +1,68 @@
+"""
+bench_csv_reader.py: compare read_csv against the old strip/split loop on a
+synthetic stop_times.txt
+"""
+
+import argparse
+import tempfile
+import time
+
+from realtime_gtfs.csv_reader import read_csv
+
+HEADER = "trip_id,arrival_time,departure_time,stop_id,stop_sequence,pickup_type,drop_off_type\n"
+
+def write_stop_times(temp_file, rows):
+    """
+    write_stop_times: write a synthetic stop_times.txt with `rows` rows
+    """
+    temp_file.write(HEADER.encode("UTF-8"))
+    batch = []
+    for i in range(rows):
+        seconds = 6 * 3600 + (i % 500) * 60
+        time_str = f"{seconds // 3600}:{seconds // 60 % 60:02}:00"
+        batch.append(f"T{i // 20},{time_str},{time_str},S{i % 5000},{i % 20},0,0\n")
+        if len(batch) == 100000:
+            temp_file.write("".join(batch).encode("UTF-8"))
+            batch = []
+    temp_file.write("".join(batch).encode("UTF-8"))
+    temp_file.flush()
+
+def split_loop(temp_file):
+    """
+    split_loop: the parsing loop used before read_csv
+    """
+    temp_file.seek(0)
+    count = 0
+    for line in str(temp_file.read(), "UTF-8").strip().split('\n'):
+        line.strip().split(',')
+        count += 1
+    return count
+
+def csv_loop(temp_file):
+    """
+    csv_loop: the parsing loop using read_csv
+    """
+    temp_file.seek(0)
+    count = 0
+    for _ in read_csv(temp_file):
+        count += 1
+    return count
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile() as temp_file:
+        write_stop_times(temp_file, args.rows)
+        for name, loop in [("strip/split", split_loop), ("read_csv", csv_loop)]:
+            start = time.perf_counter()
+            count = loop(temp_file)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>12}: {count} lines in {elapsed:.2f}s ({count / elapsed:,.0f} lines/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+bench_database.py: measure how many stop_times per second are written to SQLite,
+with batched executemany and with one autocommitted INSERT per row
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import sqlalchemy
+
+from realtime_gtfs import DatabaseConnection, GTFS
+
+from benchmarks.bench_csv_reader import write_stop_times
+
+def write_per_row(dbcon, stop_times):
+    """
+    write_per_row: the old way of writing, one INSERT statement per row
+    """
+    for stop_time in stop_times:
+        ins = sqlalchemy.sql.expression.insert(dbcon.tables["stop_times"],
+                                               values=stop_time.to_dict())
+        dbcon.connection.execute(ins)
+
+def measure(temp_dir, stop_times, batch_size=None):
+    """
+    measure: write stop_times to a new SQLite database, returns rows/second.
+    Writes a row at a time if batch_size is None.
+    """
+    path = os.path.join(temp_dir, f"bench-{batch_size}.sqlite")
+    dbcon = DatabaseConnection(f"sqlite:///{path}", batch_size=batch_size)
+    dbcon.meta.create_all()
+    start = time.perf_counter()
+    if batch_size is None:
+        write_per_row(dbcon, stop_times)
+    else:
+        dbcon.write_stop_times(stop_times)
+    elapsed = time.perf_counter() - start
+    dbcon.connection.close()
+    dbcon.engine.dispose()
+    return len(stop_times) / elapsed
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--per-row-rows", type=int, default=20000,
+                        help="rows written one INSERT at a time")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    gtfs = GTFS()
+    with tempfile.TemporaryFile() as temp_file:
+        write_stop_times(temp_file, args.rows)
+        temp_file.seek(0)
+        gtfs.parse_stop_times(temp_file)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rate = measure(temp_dir, gtfs.stop_times[:args.per_row_rows])
+        print(f"{'per row':>16}: {rate:10.0f} rows/s ({args.per_row_rows} rows)")
+        for batch_size in args.batch_size:
+            rate = measure(temp_dir, gtfs.stop_times, batch_size)
+            print(f"{f'batch {batch_size}':>16}: {rate:10.0f} rows/s ({args.rows} rows)")
+
+if __name__ == "__main__":
+    main()
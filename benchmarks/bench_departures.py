@@ -0,0 +1,120 @@
+"""
+bench_departures.py: compare answering "next departures from a stop" by scanning
+stop_times, joined to trips and services, with the precomputed DepartureBoard
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.models import Frequency, Service, StopTime, Trip
+from realtime_gtfs.service_calendar import WEEKDAYS
+
+BASE = datetime.date(2024, 1, 1)
+
+def random_feed(args, seed):
+    """
+    random_feed: a GTFS instance with random routes over random stops, every
+    route running `args.trips` trips spread over the day on random services
+    """
+    rng = random.Random(seed)
+    gtfs = GTFS()
+    gtfs.services = []
+    for index in range(args.services):
+        values = {"service_id": f"S{index}", "start_date": "20240101", "end_date": "20241231"}
+        values.update({name: str(rng.randrange(2)) for name in WEEKDAYS})
+        gtfs.services.append(Service.from_dict(values))
+    trips, rows, frequencies = [], [], []
+    keys = tuple(StopTime.__slots__)
+    for route in range(args.routes):
+        stops = rng.sample(range(args.stops), args.length)
+        gaps = [rng.randrange(60, 300) for _ in stops]
+        for number in range(args.trips):
+            trip_id = f"R{route}T{number}"
+            trips.append(Trip.from_dict({"route_id": f"R{route}", "trip_id": trip_id,
+                                         "service_id": f"S{rng.randrange(args.services)}"}))
+            departure = rng.randrange(5 * 3600, 24 * 3600)
+            for sequence, (stop, gap) in enumerate(zip(stops, gaps)):
+                rows.append((trip_id, departure, departure, f"STOP{stop}", sequence,
+                             None, 0, 0, None, 1))
+                departure += gap
+        if route % 50 == 0:
+            frequencies.append(Frequency.from_dict({
+                "trip_id": f"R{route}T0", "start_time": "06:00:00", "end_time": "20:00:00",
+                "headway_secs": "600"}))
+    gtfs.trips = trips
+    gtfs.stop_times = StopTime.from_rows(keys, rows)
+    gtfs.frequencies = frequencies
+    return gtfs
+
+def scan(gtfs, stop_id, seconds, date, count):
+    """
+    scan: the next departures from a stop, scanning stop_times and joining
+    them to trips and services, frequencies are left out
+    """
+    trips = {trip.trip_id: trip for trip in gtfs.trips}
+    active = gtfs.service_calendar().active_services(date)
+    found = [(stop_time.departure_time, stop_time.trip_id) for stop_time in gtfs.stop_times
+             if stop_time.stop_id == stop_id and stop_time.departure_time >= seconds
+             and trips[stop_time.trip_id].service_id in active]
+    return sorted(found)[:count]
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stops", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--trips", type=int, default=40, help="trips per route")
+    parser.add_argument("--length", type=int, default=25, help="stops per route")
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--scans", type=int, default=5)
+    parser.add_argument("--count", type=int, default=10, help="departures per query")
+    args = parser.parse_args()
+
+    gtfs = random_feed(args, 1)
+    print(f"{len(gtfs.stop_times)} stop_times, {len(gtfs.trips)} trips")
+    rng = random.Random(2)
+    queries = [(f"STOP{rng.randrange(args.stops)}", rng.randrange(24 * 3600),
+                BASE + datetime.timedelta(days=rng.randrange(365)))
+               for _ in range(args.queries)]
+    gtfs.service_calendar()
+
+    start = time.perf_counter()
+    board = gtfs.departure_board()
+    print(f"{'build board':>20}: {(time.perf_counter() - start) * 1e3:10.1f} ms")
+
+    start = time.perf_counter()
+    for stop_id, seconds, date in queries[:args.scans]:
+        scan(gtfs, stop_id, seconds, date, args.count)
+    print(f"{'scan':>20}: {(time.perf_counter() - start) / args.scans * 1e3:10.3f} ms/query")
+
+    latencies = []
+    for stop_id, seconds, date in queries:
+        start = time.perf_counter()
+        board.next_departures(stop_id, seconds, date, args.count)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    for name, latency in [("board, mean", sum(latencies) / len(latencies)),
+                          ("board, median", latencies[len(latencies) // 2]),
+                          ("board, p99", latencies[len(latencies) * 99 // 100]),
+                          ("board, max", latencies[-1])]:
+        print(f"{name:>20}: {latency * 1e3:10.3f} ms/query")
+
+    # check the board against the scan, which leaves out frequencies and the previous day
+    gtfs.frequencies = []
+    board = gtfs.departure_board()
+    for stop_id, seconds, date in queries[:args.scans]:
+        found = [(departure.departure_time, departure.trip_id) for departure in
+                 board.next_departures(stop_id, seconds, date, args.count)
+                 if departure.service_date == date]
+        expected = scan(gtfs, stop_id, seconds, date, args.count)
+        assert [departure[0] for departure in found] == \
+            [departure[0] for departure in expected[:len(found)]]
+
+if __name__ == "__main__":
+    main()
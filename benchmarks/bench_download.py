@@ -0,0 +1,63 @@
+"""
+bench_download.py: measure download throughput from a local HTTP server with
+the old 128 byte chunks and with larger ones
+"""
+
+import argparse
+import http.server
+import os
+import tempfile
+import threading
+import time
+
+from realtime_gtfs.download import Downloader
+
+class BodyHandler(http.server.BaseHTTPRequestHandler):
+    """
+    BodyHandler: answers every GET with the body of the server
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """
+        do_GET: send the body
+        """
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        pass
+
+def measure(url, chunk_size, size):
+    """
+    measure: download url into a temporary file, returns MB/second
+    """
+    with tempfile.TemporaryFile() as temp_file:
+        start = time.perf_counter()
+        download = Downloader(chunk_size=chunk_size).download(url, temp_file)
+        elapsed = time.perf_counter() - start
+    assert download.size == size
+    return size / elapsed / 1e6
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[128, 65536, 1024 * 1024])
+    args = parser.parse_args()
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), BodyHandler)
+    httpd.body = os.urandom(args.megabytes * 1000000)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/feed.zip"
+    for chunk_size in args.chunk_size:
+        rate = measure(url, chunk_size, len(httpd.body))
+        print(f"{f'chunk {chunk_size}':>16}: {rate:8.1f} MB/s")
+    httpd.shutdown()
+
+if __name__ == "__main__":
+    main()
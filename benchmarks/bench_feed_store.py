@@ -0,0 +1,80 @@
+"""
+bench_feed_store.py: compare the time and Python heap memory needed to get a
+queryable feed from a snapshot and from a memory mapped feed store
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from realtime_gtfs import GTFS, FeedStore
+
+from benchmarks.bench_snapshot import write_feed
+
+def query(feed, trip_id, expected):
+    """
+    query: look up the stop_times of one trip, which has `expected` of them
+    """
+    if isinstance(feed, FeedStore):
+        found = feed.stop_times.where("trip_id", trip_id)
+    else:
+        found = [stop_time for stop_time in feed.stop_times if stop_time.trip_id == trip_id]
+    assert len(found) == expected
+
+def measure(open_feed, trip_id, expected):
+    """
+    measure: open a feed and query it, returns the seconds that took and
+    the megabytes of Python heap the open feed holds on to, measured in a
+    second run as tracing slows it down
+    """
+    start = time.perf_counter()
+    query(open_feed(), trip_id, expected)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    feed = open_feed()
+    query(feed, trip_id, expected)
+    memory = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    return elapsed, memory
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        feed_path = os.path.join(temp_dir, "feed.zip")
+        snapshot_path = os.path.join(temp_dir, "feed.snapshot")
+        store_path = os.path.join(temp_dir, "feed.store")
+        write_feed(feed_path, args.rows)
+        gtfs = GTFS(columnar=True)
+        with zipfile.ZipFile(feed_path) as zip_file:
+            gtfs.from_zip(zip_file)
+        gtfs.save_snapshot(snapshot_path)
+        gtfs.save_feed_store(store_path)
+        # the trip of the middle stop_time
+        trip_ids = gtfs.stop_times.trip_id
+        trip_id = trip_ids[len(trip_ids) // 2]
+        expected = sum(1 for value in trip_ids if value == trip_id)
+        del gtfs, trip_ids
+
+        def load(columnar):
+            gtfs = GTFS(columnar=columnar)
+            gtfs.load_snapshot(snapshot_path)
+            return gtfs
+
+        for name, open_feed in [("snapshot", lambda: load(False)),
+                                ("columnar snapshot", lambda: load(True)),
+                                ("feed store", lambda: FeedStore(store_path))]:
+            elapsed, memory = measure(open_feed, trip_id, expected)
+            print(f"{name:>18}: {elapsed:6.2f} s, {memory:8.1f} MB held")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+bench_lazy.py: time to the first query on stops and routes, with every member
+parsed up front and with lazy parsing
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+
+from realtime_gtfs import GTFS
+
+from benchmarks.bench_snapshot import write_feed
+
+def first_query(zip_file, lazy):
+    """
+    first_query: seconds from opening the feed to counting its stops and routes
+    """
+    start = time.perf_counter()
+    gtfs = GTFS()
+    gtfs.from_zip(zip_file, lazy=lazy)
+    len(gtfs.stops) + len(gtfs.routes) # pylint: disable=expression-not-assigned
+    return time.perf_counter() - start
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        feed_path = os.path.join(temp_dir, "feed.zip")
+        write_feed(feed_path, args.rows)
+        with zipfile.ZipFile(feed_path) as zip_file:
+            for lazy in [False, True]:
+                print(f"lazy={lazy!s:5}: {first_query(zip_file, lazy):6.3f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+bench_models.py: memory used by the models of the sample feed scaled up, compared
+to the same attributes stored in a per-instance __dict__
+"""
+
+import argparse
+import tracemalloc
+import zipfile
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.gtfs import GTFS_FILES
+
+from benchmarks.bench_parallel_parse import SAMPLE_FEED
+
+class DictModel(): # pylint: disable=too-few-public-methods
+    """
+    DictModel: plain object holding its attributes in a __dict__, like the
+    models did before they used __slots__
+    """
+
+def load(scale, as_dicts):
+    """
+    load: parse the sample feed `scale` times, returns the number of models and
+    the bytes they use
+    """
+    with zipfile.ZipFile(SAMPLE_FEED) as zip_file:
+        tracemalloc.start()
+        models = []
+        for _ in range(scale):
+            gtfs = GTFS()
+            gtfs.from_zip(zip_file)
+            for _, _, attribute, _ in GTFS_FILES:
+                value = getattr(gtfs, attribute)
+                if isinstance(value, list):
+                    models.extend(value)
+                elif value is not None:
+                    models.append(value)
+        if as_dicts:
+            dict_models = []
+            for model in models:
+                dict_model = DictModel()
+                for key in model.__slots__:
+                    setattr(dict_model, key, getattr(model, key))
+                dict_models.append(dict_model)
+            models = dict_models
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(models), size
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1000)
+    args = parser.parse_args()
+
+    for name, as_dicts in [("__dict__", True), ("__slots__", False)]:
+        count, size = load(args.scale, as_dicts)
+        print(f"{name:>9}: {count} models in {size / 2**20:.1f} MiB "
+              f"({size / count:.0f} bytes/model)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+bench_parallel_parse.py: time GTFS.from_zip on a feed with a large synthetic
+stop_times.txt for an increasing number of workers
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+
+from realtime_gtfs import GTFS
+
+from benchmarks.bench_csv_reader import write_stop_times
+
+SAMPLE_FEED = os.path.join(os.path.dirname(__file__), "..", "tests", "static", "sample-feed.zip")
+
+def write_feed(path, rows):
+    """
+    write_feed: write the sample feed to `path`, with a stop_times.txt of `rows` rows
+    """
+    with zipfile.ZipFile(SAMPLE_FEED) as sample, \
+            zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as feed, \
+            tempfile.TemporaryFile() as stop_times:
+        for name in sample.namelist():
+            if name.endswith(".txt") and "/" not in name and name != "stop_times.txt":
+                feed.writestr(name, sample.read(name))
+        write_stop_times(stop_times, rows)
+        stop_times.seek(0)
+        with feed.open("stop_times.txt", "w") as member:
+            while True:
+                block = stop_times.read(1024 * 1024)
+                if not block:
+                    break
+                member.write(block)
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=8 * 1024 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "feed.zip")
+        write_feed(path, args.rows)
+        workers = 1
+        while workers <= args.max_workers:
+            with zipfile.ZipFile(path) as zip_file:
+                gtfs = GTFS()
+                start = time.perf_counter()
+                gtfs.from_zip(zip_file, workers=workers, chunk_size=args.chunk_size)
+                elapsed = time.perf_counter() - start
+            print(f"{workers:>3} workers: {len(gtfs.stop_times)} stop_times in {elapsed:.2f}s")
+            workers *= 2
+
+if __name__ == "__main__":
+    main()
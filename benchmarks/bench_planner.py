@@ -0,0 +1,100 @@
+"""
+bench_planner.py: earliest arrival queries between random origins and destinations
+with the Connection Scan planner on a random network the size of a national rail feed
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.models import Service, StopTime, Transfer, Trip
+
+DATE = datetime.date(2024, 1, 10)
+
+def random_network(args, seed):
+    """
+    random_network: a GTFS instance with routes over random stops running
+    `args.trips` trips a day in both directions, with minimum transfer times
+    at some stops and transfers on foot between others
+    """
+    rng = random.Random(seed)
+    gtfs = GTFS()
+    gtfs.services = [Service.from_dict({
+        "service_id": "DAILY", "start_date": "20240101", "end_date": "20241231",
+        **{day: "1" for day in ["monday", "tuesday", "wednesday", "thursday", "friday",
+                                "saturday", "sunday"]}})]
+    keys = ("trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence",
+            "pickup_type", "drop_off_type")
+    trips, rows = [], []
+    for route in range(args.routes):
+        path = rng.sample(range(args.stops), args.length)
+        runs = [rng.randrange(120, 900) for _ in path]
+        for direction, stops in enumerate([path, path[::-1]]):
+            for number in range(args.trips):
+                trip_id = f"R{route}D{direction}T{number}"
+                trips.append(Trip.from_dict({"route_id": f"R{route}", "service_id": "DAILY",
+                                             "trip_id": trip_id}))
+                departure = 5 * 3600 + number * 19 * 3600 // args.trips + rng.randrange(600)
+                for sequence, (stop, run) in enumerate(zip(stops, runs)):
+                    rows.append((trip_id, departure, departure + 60, f"S{stop}", sequence, 0, 0))
+                    departure += 60 + run
+    gtfs.trips = trips
+    gtfs.stop_times = StopTime.from_rows(keys, rows)
+    gtfs.transfers = []
+    for stop in range(0, args.stops, 5):
+        gtfs.transfers.append(Transfer.from_dict({
+            "from_stop_id": f"S{stop}", "to_stop_id": f"S{stop}", "transfer_type": "2",
+            "min_transfer_time": "180"}))
+        gtfs.transfers.append(Transfer.from_dict({
+            "from_stop_id": f"S{stop}", "to_stop_id": f"S{stop + 1}", "transfer_type": "2",
+            "min_transfer_time": "300"}))
+    return gtfs
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stops", type=int, default=1000)
+    parser.add_argument("--routes", type=int, default=300)
+    parser.add_argument("--trips", type=int, default=40, help="trips per route and direction")
+    parser.add_argument("--length", type=int, default=15, help="stops per route")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    gtfs = random_network(args, 1)
+    print(f"{len(gtfs.stop_times)} stop_times, {len(gtfs.trips)} trips")
+    gtfs.index("stop_times_by_trip")
+
+    start = time.perf_counter()
+    planner = gtfs.planner()
+    print(f"{'build planner':>16}: {(time.perf_counter() - start) * 1e3:10.1f} ms")
+    start = time.perf_counter()
+    connections = planner.connections(DATE)
+    print(f"{'build day':>16}: {(time.perf_counter() - start) * 1e3:10.1f} ms "
+          f"({len(connections)} connections)")
+
+    rng = random.Random(2)
+    latencies, reached, legs = [], 0, 0
+    for _ in range(args.queries):
+        origin, target = rng.sample(range(args.stops), 2)
+        departure_time = rng.randrange(6 * 3600, 20 * 3600)
+        start = time.perf_counter()
+        journey = planner.plan(f"S{origin}", f"S{target}", departure_time, DATE)
+        latencies.append(time.perf_counter() - start)
+        if journey is not None:
+            reached += 1
+            legs += len(journey)
+    latencies.sort()
+    print(f"{'reached':>16}: {reached} of {args.queries}, "
+          f"{legs / max(reached, 1):.1f} legs per journey")
+    for name, latency in [("plan, mean", sum(latencies) / len(latencies)),
+                          ("plan, median", latencies[len(latencies) // 2]),
+                          ("plan, p99", latencies[len(latencies) * 99 // 100]),
+                          ("plan, max", latencies[-1])]:
+        print(f"{name:>16}: {latency * 1e3:10.3f} ms/query")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_service_calendar.py: compare finding the services running on a date by
+scanning services and exceptions with the precomputed ServiceCalendar
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from realtime_gtfs.models import Service, ServiceException
+from realtime_gtfs.service_calendar import WEEKDAYS, ServiceCalendar
+
+BASE = datetime.date(2024, 1, 1)
+
+def random_feed(services, days, exceptions_per_service, seed):
+    """
+    random_feed: random services over `days` days with random exceptions
+    """
+    rng = random.Random(seed)
+    service_list, exception_list = [], []
+    for index in range(services):
+        start = BASE + datetime.timedelta(days=rng.randrange(days // 2))
+        end = start + datetime.timedelta(days=rng.randrange(days // 2))
+        values = {"service_id": f"S{index}", "start_date": start.strftime("%Y%m%d"),
+                  "end_date": end.strftime("%Y%m%d")}
+        values.update({name: str(rng.randrange(2)) for name in WEEKDAYS})
+        service_list.append(Service.from_dict(values))
+        for _ in range(exceptions_per_service):
+            date = BASE + datetime.timedelta(days=rng.randrange(days))
+            exception_list.append(ServiceException.from_dict({
+                "service_id": f"S{index}", "date": date.strftime("%Y%m%d"),
+                "exception_type": str(rng.randrange(1, 3))}))
+    return service_list, exception_list
+
+def scan(services, service_exceptions, date):
+    """
+    scan: the services running on a date, parsing the date strings every time
+    """
+    day = date.strftime("%Y%m%d")
+    weekday = WEEKDAYS[date.weekday()]
+    active = {service.service_id for service in services
+              if service.start_date <= day <= service.end_date and getattr(service, weekday)}
+    for exception in service_exceptions:
+        if datetime.datetime.strptime(exception.date, "%Y%m%d").date() == date:
+            if exception.exception_type == 1:
+                active.add(exception.service_id)
+            else:
+                active.discard(exception.service_id)
+    return active
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--exceptions", type=int, default=2, help="exceptions per service")
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    services, service_exceptions = random_feed(args.services, args.days, args.exceptions, 1)
+    dates = [BASE + datetime.timedelta(days=day) for day in range(0, args.days,
+                                                                  args.days // args.queries)]
+
+    start = time.perf_counter()
+    expected = [scan(services, service_exceptions, date) for date in dates]
+    print(f"{'scan':>24}: {(time.perf_counter() - start) / len(dates) * 1e3:10.3f} ms/query")
+
+    start = time.perf_counter()
+    calendar = ServiceCalendar(services, service_exceptions)
+    print(f"{'build calendar':>24}: {(time.perf_counter() - start) * 1e3:10.3f} ms")
+
+    start = time.perf_counter()
+    found = [calendar.active_services(date) for date in dates]
+    print(f"{'active_services, first':>24}: "
+          f"{(time.perf_counter() - start) / len(dates) * 1e3:10.3f} ms/query")
+    assert found == expected
+
+    start = time.perf_counter()
+    for date in dates:
+        calendar.active_services(date)
+    print(f"{'active_services, cached':>24}: "
+          f"{(time.perf_counter() - start) / len(dates) * 1e6:10.3f} us/query")
+
+    start = time.perf_counter()
+    for date in dates:
+        for service in services[:1000]:
+            calendar.is_active(service.service_id, date)
+    print(f"{'is_active':>24}: "
+          f"{(time.perf_counter() - start) / len(dates) / 1000 * 1e6:10.3f} us/query")
+
+if __name__ == "__main__":
+    main()
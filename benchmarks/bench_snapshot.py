@@ -0,0 +1,55 @@
+"""
+bench_snapshot.py: compare parsing a synthetic feed with loading a snapshot of it
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+
+from realtime_gtfs import GTFS
+
+from benchmarks.bench_csv_reader import write_stop_times
+
+def write_feed(path, rows):
+    """
+    write_feed: write a zipped feed with `rows` stop_times and otherwise empty tables
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for file_name, header in [("agency.txt", "agency_name,agency_url,agency_timezone"),
+                                  ("stops.txt", "stop_id"), ("routes.txt", "route_id"),
+                                  ("trips.txt", "route_id,service_id,trip_id")]:
+            zip_file.writestr(file_name, header + "\n")
+        with tempfile.TemporaryFile() as temp_file:
+            write_stop_times(temp_file, rows)
+            temp_file.seek(0)
+            zip_file.writestr("stop_times.txt", temp_file.read())
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        feed_path = os.path.join(temp_dir, "feed.zip")
+        snapshot_path = os.path.join(temp_dir, "feed.snapshot")
+        write_feed(feed_path, args.rows)
+        for columnar in [True, False]:
+            with zipfile.ZipFile(feed_path) as zip_file:
+                start = time.perf_counter()
+                GTFS(columnar=columnar).load_snapshot(snapshot_path, zip_file)
+                parse = time.perf_counter() - start
+                start = time.perf_counter()
+                assert GTFS(columnar=columnar).load_snapshot(snapshot_path, zip_file)
+                load = time.perf_counter() - start
+            size = os.path.getsize(snapshot_path) / 1e6
+            print(f"columnar={columnar!s:5}: parse and save {parse:6.2f} s, "
+                  f"load snapshot {load:6.2f} s ({size:.1f} MB)")
+            os.remove(snapshot_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+bench_spatial.py: compare finding stops near a point with a linear scan and with the StopIndex grid
+"""
+
+import argparse
+import random
+import time
+
+from realtime_gtfs.models import Stop
+from realtime_gtfs.spatial import StopIndex, haversine
+
+def scan_nearest(stops, lat, lon, k):
+    """
+    scan_nearest: the k nearest stops, computing the distance to every stop
+    """
+    return sorted((haversine(lat, lon, stop.stop_lat, stop.stop_lon), stop.stop_id)
+                  for stop in stops)[:k]
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stops", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=5)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius", type=float, default=500, help="meters")
+    args = parser.parse_args()
+
+    # stops spread over a country the size of Belgium
+    rng = random.Random(1)
+    stops = Stop.from_rows(("stop_id", "stop_lat", "stop_lon"),
+                           [(f"S{index}", rng.uniform(49.5, 51.5), rng.uniform(2.5, 6.4))
+                            for index in range(args.stops)])
+    points = [(rng.uniform(49.5, 51.5), rng.uniform(2.5, 6.4)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = StopIndex(stops)
+    print(f"{'build index':>16}: {(time.perf_counter() - start) * 1e3:10.1f} ms "
+          f"({len(index.cells)} cells of {index.cell_size:.4f} degrees)")
+
+    start = time.perf_counter()
+    expected = [scan_nearest(stops, lat, lon, args.k) for lat, lon in points[:args.scans]]
+    print(f"{'scan':>16}: {(time.perf_counter() - start) / args.scans * 1e3:10.3f} ms/query")
+    found = [[(distance, stop.stop_id) for distance, stop in index.nearest_stops(lat, lon, args.k)]
+             for lat, lon in points[:args.scans]]
+    assert found == expected
+
+    delta = args.radius / 111000
+    for name, query in [
+            ("nearest_stops", lambda lat, lon: index.nearest_stops(lat, lon, args.k)),
+            ("stops_within", lambda lat, lon: index.stops_within(lat, lon, args.radius)),
+            ("stops_in_bbox", lambda lat, lon: index.stops_in_bbox(
+                lat - delta, lon - delta, lat + delta, lon + delta))]:
+        start = time.perf_counter()
+        results = sum(len(query(lat, lon)) for lat, lon in points)
+        elapsed = (time.perf_counter() - start) / len(points)
+        print(f"{name:>16}: {elapsed * 1e3:10.3f} ms/query "
+              f"({results / len(points):.1f} stops/query)")
+
+if __name__ == "__main__":
+    main()
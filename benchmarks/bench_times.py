@@ -0,0 +1,61 @@
+"""
+bench_times.py: departure range queries over stop_times, with times kept as
+strings that are parsed by every query and with times parsed into seconds at load time
+"""
+
+import argparse
+import tempfile
+import time
+
+from realtime_gtfs import GTFS
+
+from benchmarks.bench_csv_reader import write_stop_times
+
+def to_seconds(value):
+    """
+    to_seconds: what every query had to do with a time kept as a string
+    """
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+def departures_strings(departure_times, start, end):
+    """
+    departures_strings: indices of the departures in [start, end), times as strings
+    """
+    return [index for index, value in enumerate(departure_times)
+            if start <= to_seconds(value) < end]
+
+def departures_seconds(departure_times, start, end):
+    """
+    departures_seconds: indices of the departures in [start, end), times as seconds
+    """
+    return [index for index, value in enumerate(departure_times) if start <= value < end]
+
+def main():
+    """
+    main: run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    gtfs = GTFS()
+    with tempfile.TemporaryFile() as temp_file:
+        write_stop_times(temp_file, args.rows)
+        temp_file.seek(0)
+        gtfs.parse_stop_times(temp_file)
+    seconds = [stop_time.departure_time for stop_time in gtfs.stop_times]
+    # the strings as they were kept before, without zero padded hours
+    strings = [f"{value // 3600}:{value // 60 % 60:02}:{value % 60:02}" for value in seconds]
+
+    ranges = [(hour * 3600, (hour + 1) * 3600) for hour in range(6, 6 + args.queries)]
+    for name, query, times in [("strings", departures_strings, strings),
+                               ("seconds", departures_seconds, seconds)]:
+        start = time.perf_counter()
+        found = [len(query(times, low, high)) for low, high in ranges]
+        elapsed = (time.perf_counter() - start) / len(ranges)
+        print(f"{name:>8}: {elapsed * 1e3:8.1f} ms/query ({found[0]} departures in the first)")
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,5 @@ realtime_gtfs: Combines static GTFS and realtime GTFS data
 
 from .gtfs import GTFS
 from .database import DatabaseConnection
+from .versions import FeedVersions
+from .feed_store import FeedStore
@@ -0,0 +1,208 @@
+"""
+columnar.py: column-oriented (struct-of-arrays) storage for the largest GTFS tables
+"""
+
+import math
+from array import array
+
+from realtime_gtfs.models import StopTime, Shape
+from realtime_gtfs.models.schema import Model
+
+# Stands for None in "i" columns
+NULL_INT = -2 ** 31
+
+class StringColumn():
+    """
+    StringColumn: dictionary-encoded column of strings (or None), every row is
+    stored as a 4 byte code into a list of distinct values
+    """
+    def __init__(self):
+        self.values = [None]
+        self.index = {None: 0}
+        self.codes = array("I")
+
+    def append(self, value):
+        """
+        append: add a value to the end of the column
+        """
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def code_of(self, value):
+        """
+        code_of: the code used for `value`, None if it does not occur in the column
+        """
+        return self.index.get(value)
+
+    def __getstate__(self):
+        # the index is rebuilt from the values, which is faster than unpickling it
+        return self.values, self.codes
+
+    def __setstate__(self, state):
+        self.values, self.codes = state
+        self.index = {value: code for code, value in enumerate(self.values)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.values[code] for code in self.codes[index]]
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+class ColumnarTable():
+    """
+    ColumnarTable: list-like container for instances of MODEL, stored as one
+    column per field. Subclasses set MODEL and COLUMNS, a list of (field name,
+    array typecode) tuples where a typecode of None means a StringColumn. None
+    is stored as NaN in float columns and as NULL_INT in "i" columns, other
+    integer columns can not hold None.
+
+    Every column is available as an attribute with the name of its field,
+    which subclasses declare as annotations, indexing or iterating the table
+    yields MODEL instances built on demand.
+    """
+    MODEL = Model
+    COLUMNS = []
+    # number of changes made, see indexes.py
+    version = 0
+
+    def __init__(self, models=None):
+        for name, typecode in self.COLUMNS:
+            setattr(self, name, StringColumn() if typecode is None else array(typecode))
+        if models is not None:
+            self.extend(models)
+
+    def append(self, model):
+        """
+        append: add a model instance to the end of the table
+        """
+        self.version += 1
+        for name, typecode in self.COLUMNS:
+            value = getattr(model, name)
+            if value is None:
+                if typecode == "d":
+                    value = math.nan
+                elif typecode == "i":
+                    value = NULL_INT
+            getattr(self, name).append(value)
+
+    def extend(self, models):
+        """
+        extend: add all model instances of an iterable to the end of the table
+        """
+        for model in models:
+            self.append(model)
+
+    def to_models(self):
+        """
+        to_models: all rows as a list of MODEL instances, a lot faster than
+        iterating the table
+        """
+        columns = []
+        for name, typecode in self.COLUMNS:
+            column = getattr(self, name)
+            if typecode is None:
+                values = column.values
+                column = [values[code] for code in column.codes]
+            elif typecode == "d":
+                column = [None if math.isnan(value) else value for value in column]
+            elif typecode == "i":
+                column = [None if value == NULL_INT else value for value in column]
+            columns.append(column)
+        keys = tuple(name for name, _ in self.COLUMNS)
+        return self.MODEL.from_rows(keys, zip(*columns))
+
+    def _row(self, index):
+        model = self.MODEL()
+        for name, typecode in self.COLUMNS:
+            value = getattr(self, name)[index]
+            if typecode == "d" and math.isnan(value) or typecode == "i" and value == NULL_INT:
+                value = None
+            setattr(model, name, value)
+        return model
+
+    def __len__(self):
+        return len(getattr(self, self.COLUMNS[0][0]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("table index out of range")
+        return self._row(index)
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self)))
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return False
+        return all(mine == theirs for mine, theirs in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return str(self)
+
+    def __str__(self):
+        return f"[{type(self).__name__} ({len(self)} rows)]"
+
+class StopTimeTable(ColumnarTable):
+    """
+    StopTimeTable: columnar storage for StopTime
+    """
+    MODEL = StopTime
+    COLUMNS = [
+        ("trip_id", None),
+        ("arrival_time", "i"),
+        ("departure_time", "i"),
+        ("stop_id", None),
+        ("stop_sequence", "i"),
+        ("stop_headsign", None),
+        ("pickup_type", "b"),
+        ("drop_off_type", "b"),
+        ("shape_dist_traveled", "d"),
+        ("timepoint", "b"),
+    ]
+    trip_id: StringColumn
+    arrival_time: array
+    departure_time: array
+    stop_id: StringColumn
+    stop_sequence: array
+    stop_headsign: StringColumn
+    pickup_type: array
+    drop_off_type: array
+    shape_dist_traveled: array
+    timepoint: array
+
+class ShapeTable(ColumnarTable):
+    """
+    ShapeTable: columnar storage for Shape
+    """
+    MODEL = Shape
+    COLUMNS = [
+        ("shape_id", None),
+        ("shape_pt_lat", "d"),
+        ("shape_pt_lon", "d"),
+        ("shape_pt_sequence", "i"),
+        ("shape_dist_traveled", "d"),
+    ]
+    shape_id: StringColumn
+    shape_pt_lat: array
+    shape_pt_lon: array
+    shape_pt_sequence: array
+    shape_dist_traveled: array
@@ -0,0 +1,46 @@
+"""
+csv_reader.py: shared reader for the CSV files in a GTFS feed
+"""
+
+import csv
+import io
+import itertools
+
+def _split_lines(text):
+    """
+    _split_lines: split every non-blank line of `text`, taking the csv module
+    only for (possibly multi-line) records containing quotes
+    """
+    for line in text:
+        if '"' in line:
+            # the reader yields the record starting at line, even an unterminated one
+            record = next(csv.reader(itertools.chain((line,), text)), None)
+            if record is not None:
+                yield record
+        elif line not in ("\n", "\r\n"):
+            yield line.rstrip("\r\n").split(",")
+
+def read_csv(data):
+    """
+    read_csv: lazily read a GTFS file, yielding the header (with surrounding
+    whitespace stripped from every key) followed by every row as a list of values.
+    Quoted fields, a UTF-8 byte order mark and CRLF line endings are handled
+    as described in RFC 4180, blank lines are skipped.
+
+    Arguments:
+    data: bytes-like object or binary file-like object containing a GTFS file,
+    a file-like object is left open
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = io.BytesIO(data)
+    text = io.TextIOWrapper(data, encoding="utf-8-sig", newline="")
+    try:
+        rows = _split_lines(text)
+        header = next(rows, None)
+        if header is not None:
+            yield [key.strip() for key in header]
+            yield from rows
+    finally:
+        # the caller may have closed the file before this generator is finalized
+        if not text.buffer.closed:
+            text.detach()
@@ -2,79 +2,569 @@
 database.py: all database interactions for GTFS
 """
 
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+
 import sqlalchemy
+from sqlalchemy.schema import AddConstraint, CreateIndex, CreateTable, DropTable
 
+from realtime_gtfs.diff import (diff_hashes, hash_rows, parse_row_key, row_key, table_hash,
+                                text_hash)
 from realtime_gtfs.models import (Agency, Route, Stop, Trip, StopTime, Service,
                                   FareAttribute, FareRule, Shape, Frequency,
                                   Transfer, Pathway, Level, FeedInfo, Translation)
 
+# Number of rows sent to the database in a single executemany
+BATCH_SIZE = 10000
+
+# Tables filled from a list attribute of GTFS, services also gets the service exceptions
+TABLE_ATTRIBUTES = [
+    ("agencies", "agencies"),
+    ("fare_attributes", "fare_attributes"),
+    ("routes", "routes"),
+    ("stops", "stops"),
+    ("fare_rules", "fare_rules"),
+    ("frequencies", "frequencies"),
+    ("levels", "levels"),
+    ("pathways", "pathways"),
+    ("services", "services"),
+    ("shapes", "shapes"),
+    ("stop_times", "stop_times"),
+    ("transfers", "transfers"),
+    ("translations", "translations"),
+    ("trips", "trips"),
+]
+
+# Columns identifying a row, for tables where the primary key does not identify it
+DIFF_KEYS = {
+    "frequencies": ["trip_id", "start_time"],
+    # a calendar row has no exception_type, so it differs from an exception on its start_date
+    "services": ["service_id", "start_date", "exception_type"],
+    "shapes": ["shape_id", "shape_pt_sequence"],
+    "stop_times": ["trip_id", "stop_sequence"],
+}
+# Key columns that are NULL in some rows, matched with IS NOT DISTINCT FROM
+NULLABLE_DIFF_KEYS = {"exception_type"}
+
+def _batches(data_list, batch_size):
+    """
+    _batches: split an iterable into lists of at most batch_size items
+    """
+    iterator = iter(data_list)
+    batch = list(islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, batch_size))
+
+def _csv_field(value, null):
+    """
+    _csv_field: format a value for a CSV file loaded by the database, strings
+    are always quoted so an unquoted `null` is unambiguous
+    """
+    if value is None:
+        return null
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+def csv_lines(dicts, columns, null=""):
+    """
+    csv_lines: turn rows given as dicts into CSV lines for COPY or LOAD DATA
+
+    Arguments:
+    dicts: iterable of dicts, missing keys are written as null
+    columns: names of the columns, in order
+    null: representation of None, unquoted
+    """
+    for row in dicts:
+        yield ",".join([_csv_field(row.get(column), null) for column in columns]) + "\n"
+
+def load_in_tiers(tiers, load, max_workers):
+    """
+    load_in_tiers: call `load` for every table in a thread pool, a tier only
+    starts once every table of the previous tier is loaded. Raises the first
+    error of a tier after the rest of that tier has finished.
+
+    Arguments:
+    tiers: list of lists of table names
+    load: function loading the table with the given name
+    max_workers: maximum number of tables loaded at the same time
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for tier in tiers:
+            futures = [executor.submit(load, table_name) for table_name in tier]
+            errors = [future.exception() for future in futures]
+            for error in errors:
+                if error is not None:
+                    raise error
+
+def _gtfs_rows(gtfs):
+    """
+    _gtfs_rows: the rows of every table for a GTFS instance, as iterables of dicts
+    """
+    rows = {table_name: (data.to_dict() for data in getattr(gtfs, attribute))
+            for table_name, attribute in TABLE_ATTRIBUTES}
+    rows["services"] = _service_dicts(gtfs.services, gtfs.service_exceptions)
+    rows["feed_infos"] = [] if gtfs.feed_info is None else [gtfs.feed_info.to_dict()]
+    return rows
+
+def _key_condition(table, key_columns, params):
+    """
+    _key_condition: SQL condition matching the key columns of a table to bind parameters
+    """
+    return sqlalchemy.and_(*[
+        table.c[column].isnot_distinct_from(sqlalchemy.bindparam(param))
+        if column in NULLABLE_DIFF_KEYS else table.c[column] == sqlalchemy.bindparam(param)
+        for column, param in zip(key_columns, params)])
+
+def _as_stored(rows, table):
+    """
+    _as_stored: rows with their values converted to what the columns of the
+    table store, so they hash the same as the rows read back from it
+    """
+    strings = [column.name for column in table.columns
+               if isinstance(column.type, sqlalchemy.String)]
+    for row in rows:
+        for column in strings:
+            value = row.get(column)
+            if value is not None and not isinstance(value, str):
+                row[column] = str(value)
+        yield row
+
+def _service_dicts(services, service_exceptions):
+    """
+    _service_dicts: the rows of the services table, the services followed by
+    the service exceptions
+    """
+    return chain(({**service.to_dict(), "exception_type": None} for service in services),
+                 _service_exception_dicts(service_exceptions))
+
+def _service_exception_dicts(service_exceptions):
+    """
+    _service_exception_dicts: service exceptions as rows of the services table,
+    with the weekdays set to None
+    """
+    for service_exception in service_exceptions:
+        row = dict.fromkeys(field.name for field in Service.FIELDS)
+        row["service_id"] = service_exception.service_id
+        row["start_date"] = service_exception.date
+        row["end_date"] = service_exception.date
+        row["exception_type"] = service_exception.exception_type
+        yield row
+
+def create_tables(meta, suffix=""):
+    """
+    create_tables: define all GTFS tables, returns a dict mapping the table
+    names used throughout this module to the SQLAlchemy tables
+
+    Arguments:
+    meta: the SQLAlchemy MetaData
+    suffix: appended to the name of every table
+    """
+    tables = {}
+    tables["agencies"] = Agency.create_table(meta, suffix)
+    tables["fare_attributes"] = FareAttribute.create_table(meta, suffix)
+    tables["routes"] = Route.create_table(meta, suffix)
+    tables["stops"] = Stop.create_table(meta, suffix)
+    tables["fare_rules"] = FareRule.create_table(meta, suffix)
+    tables["feed_infos"] = FeedInfo.create_table(meta, suffix)
+    tables["frequencies"] = Frequency.create_table(meta, suffix)
+    tables["levels"] = Level.create_table(meta, suffix)
+    tables["pathways"] = Pathway.create_table(meta, suffix)
+    tables["services"] = Service.create_table(meta, suffix)
+    tables["shapes"] = Shape.create_table(meta, suffix)
+    tables["stop_times"] = StopTime.create_table(meta, suffix)
+    tables["transfers"] = Transfer.create_table(meta, suffix)
+    tables["translations"] = Translation.create_table(meta, suffix)
+    tables["trips"] = Trip.create_table(meta, suffix)
+
+    # update_gtfs updates and deletes rows by these keys
+    for table_name, key_columns in DIFF_KEYS.items():
+        table = tables[table_name]
+        sqlalchemy.Index(f"ix_{table.name}_key", *[table.c[column] for column in key_columns])
+    return tables
 
 class DatabaseConnection:
     """
     DatabaseConnection: Handles database interactions
+
+    Arguments:
+    url: URL for database connection
+    options:
+    batch_size: number of rows inserted per executemany or COPY
+    bulk_load: use COPY on PostgreSQL (psycopg2) and LOAD DATA LOCAL INFILE on
+    MySQL instead of INSERT, defaults to True
+    defer_constraints: let add_gtfs create missing tables without keys, indexes
+    and constraints and build those after loading the data, defaults to False
+    max_parallel_tables: maximum number of tables add_gtfs loads at the same
+    time, each on its own connection from the pool. Tables only load once the
+    tables they refer to are loaded. Defaults to 1, SQLite always loads one
+    table at a time because it allows a single writer.
+    table_suffix: appended to the name of every table, see versions.py
     """
-    def __init__(self, url):
-        self.engine = sqlalchemy.create_engine(url)
+    def __init__(self, url, **options):
+        self.batch_size = options.pop("batch_size", BATCH_SIZE)
+        self.bulk_load = options.pop("bulk_load", True)
+        self.defer_constraints = options.pop("defer_constraints", False)
+        self.max_parallel_tables = options.pop("max_parallel_tables", 1)
+        self.table_suffix = options.pop("table_suffix", "")
+        if options:
+            raise TypeError(f"unknown options: {', '.join(options)}")
+
+        connect_args = {}
+        if self.bulk_load and sqlalchemy.engine.url.make_url(url).get_backend_name() == "mysql":
+            connect_args["local_infile"] = 1
+        self.engine = sqlalchemy.create_engine(url, connect_args=connect_args)
         self.connection = self.engine.connect()
         self.meta = sqlalchemy.MetaData()
         self.meta.bind = self.engine
-        self.tables = {}
-
-        self.tables["agencies"] = Agency.create_table(self.meta)
-        self.tables["fare_attributes"] = FareAttribute.create_table(self.meta)
-        self.tables["routes"] = Route.create_table(self.meta)
-        self.tables["stops"] = Stop.create_table(self.meta)
-        self.tables["fare_rules"] = FareRule.create_table(self.meta)
-        self.tables["feed_infos"] = FeedInfo.create_table(self.meta)
-        self.tables["frequencies"] = Frequency.create_table(self.meta)
-        self.tables["levels"] = Level.create_table(self.meta)
-        self.tables["pathways"] = Pathway.create_table(self.meta)
-        self.tables["services"] = Service.create_table(self.meta)
-        self.tables["shapes"] = Shape.create_table(self.meta)
-        self.tables["stop_times"] = StopTime.create_table(self.meta)
-        self.tables["transfers"] = Transfer.create_table(self.meta)
-        self.tables["translations"] = Translation.create_table(self.meta)
-        self.tables["trips"] = Trip.create_table(self.meta)
+        self.tables = create_tables(self.meta, self.table_suffix)
 
+        # Content hashes of the stored rows, written by update_gtfs
+        self.row_hashes = sqlalchemy.Table(
+            "row_hashes" + self.table_suffix, self.meta,
+            sqlalchemy.Column("table_name", sqlalchemy.String(length=255), primary_key=True),
+            sqlalchemy.Column("key_hash", sqlalchemy.String(length=32), primary_key=True),
+            sqlalchemy.Column("row_key", sqlalchemy.Text),
+            sqlalchemy.Column("row_hash", sqlalchemy.String(length=32)),
+        )
+
+    def close(self):
+        """
+        close: close the connection and every connection in the pool
+        """
+        self.connection.close()
+        self.engine.dispose()
 
     def reset(self):
         """
-        reset: resets the ENTIRE database, dropping and recreating all tables
+        reset: resets the ENTIRE database, dropping and recreating all tables.
+        With defer_constraints the tables are only dropped, add_gtfs creates them.
         """
         self.meta.drop_all()
-        self.meta.create_all()
+        if not self.defer_constraints:
+            self.meta.create_all()
 
     def add_gtfs(self, gtfs):
         """
         add_gtfs: Write all data of a GTFS instance to the database
+
+        With defer_constraints, tables that do not exist yet are created bare,
+        loaded, and get their primary keys, unique constraints, indexes and
+        foreign keys in one pass at the end. Foreign key checks are off on
+        MySQL while loading.
+        """
+        if not self.defer_constraints:
+            self.meta.create_all()
+            self._write_gtfs(gtfs)
+            return
+
+        created = self._create_bare_tables()
+        self._write_gtfs(gtfs)
+        self._add_constraints(created)
+
+    def _create_bare_tables(self):
+        """
+        _create_bare_tables: create the tables that do not exist yet with only
+        their columns, returns the full definitions of the tables it created
+        """
+        bare_meta = sqlalchemy.MetaData()
+        created = []
+        for table in self.meta.sorted_tables:
+            if self.engine.dialect.has_table(self.connection, table.name):
+                continue
+            sqlalchemy.Table(table.name, bare_meta, *[
+                sqlalchemy.Column(column.name, column.type, nullable=column.nullable)
+                for column in table.columns
+            ])
+            created.append(table)
+        bare_meta.create_all(self.connection)
+        return created
+
+    def _add_constraints(self, tables):
+        """
+        _add_constraints: add the keys, indexes and constraints of tables that
+        were created bare. SQLite can not add constraints to a table, there
+        every table is rebuilt with INSERT ... SELECT into its full definition.
+        """
+        if self.engine.dialect.name == "sqlite":
+            with self.connection.begin():
+                for table in tables:
+                    loaded = sqlalchemy.Table(table.name + "_bare", sqlalchemy.MetaData(),
+                                              *[sqlalchemy.Column(column.name)
+                                                for column in table.columns])
+                    self.connection.execute(f"ALTER TABLE {table.name} RENAME TO {loaded.name}")
+                    self.connection.execute(CreateTable(table))
+                    for index in table.indexes:
+                        self.connection.execute(CreateIndex(index))
+                    self.connection.execute(
+                        table.insert().from_select(table.columns.keys(), loaded.select()))
+                    self.connection.execute(DropTable(loaded))
+            return
+
+        with self.connection.begin():
+            for table in tables:
+                if table.primary_key.columns:
+                    self.connection.execute(AddConstraint(table.primary_key))
+                for constraint in table.constraints:
+                    if isinstance(constraint, sqlalchemy.UniqueConstraint):
+                        self.connection.execute(AddConstraint(constraint))
+                for index in table.indexes:
+                    self.connection.execute(CreateIndex(index))
+            for table in tables:
+                for constraint in table.foreign_key_constraints:
+                    self.connection.execute(AddConstraint(constraint))
+
+    def load_tiers(self):
+        """
+        load_tiers: group the tables into tiers, every table only refers to
+        tables in earlier tiers (or to itself). Returns a list of lists of names.
+        """
+        tier_of = {}
+        for table in self.meta.sorted_tables:
+            tier_of[table] = max((tier_of[foreign_key.column.table] + 1
+                                  for foreign_key in table.foreign_keys
+                                  if foreign_key.column.table is not table), default=0)
+        tiers = [[] for _ in range(max(tier_of.values()) + 1)]
+        for table_name, table in self.tables.items():
+            tiers[tier_of[table]].append(table_name)
+        return tiers
+
+    def diff_key(self, table_name):
+        """
+        diff_key: names of the columns identifying a row of a table, None if
+        the table has no key
+        """
+        if table_name in DIFF_KEYS:
+            return DIFF_KEYS[table_name]
+        return self.tables[table_name].primary_key.columns.keys() or None
+
+    def update_gtfs(self, gtfs):
+        """
+        update_gtfs: write only the differences between a GTFS instance and the
+        stored feed, in a single transaction. Rows are compared by the content
+        hash stored for their key in row_hashes: new keys are inserted, changed
+        rows updated and keys that are gone deleted. Tables without a key are
+        replaced entirely when any of their rows changed. The first update of a
+        table that was filled by add_gtfs hashes the rows read from the table.
+
+        Returns a dict mapping table names to (inserted, updated, deleted) counts
         """
         self.meta.create_all()
+        rows = _gtfs_rows(gtfs)
+        order = list(chain.from_iterable(self.load_tiers()))
+        counts = {}
+        deletes = {}
+        with self.connection.begin():
+            # Parents before children for inserts, children before parents for deletes
+            for table_name in order:
+                counts[table_name], deletes[table_name] = self._upsert_table(
+                    table_name, rows[table_name])
+            for table_name in reversed(order):
+                self._delete_keys(table_name, deletes[table_name])
+        return counts
 
-        self.write_agencies(gtfs.agencies)
-        self.write_levels(gtfs.levels)
+    def _stored_hashes(self, table_name, columns, key_columns):
+        """
+        _stored_hashes: the hashes of the stored rows of a table, as a dict
+        mapping row keys to row hashes, and whether they were computed from the
+        table itself because row_hashes had none
+        """
+        query = sqlalchemy.select([self.row_hashes.c.row_key, self.row_hashes.c.row_hash]) \
+            .where(self.row_hashes.c.table_name == table_name)
+        stored = dict(self.connection.execute(query).fetchall())
+        if stored:
+            return stored, False
+
+        existing = [dict(row.items())
+                    for row in self.connection.execute(self.tables[table_name].select())]
+        if key_columns is None:
+            return ({"": table_hash(existing, columns)} if existing else {}), True
+        return {key_text: row_hash for key_text, (_, row_hash, _)
+                in hash_rows(existing, columns, key_columns).items()}, True
+
+    def _upsert_table(self, table_name, rows):
+        """
+        _upsert_table: insert and update the rows of a table that changed, returns
+        the (inserted, updated, deleted) counts and the keys still to delete
+        """
+        table = self.tables[table_name]
+        columns = table.columns.keys()
+        key_columns = self.diff_key(table_name)
+        stored, from_table = self._stored_hashes(table_name, columns, key_columns)
+
+        if key_columns is None:
+            rows = list(_as_stored(rows, table))
+            digest = table_hash(rows, columns)
+            if stored.get("") == digest:
+                return (0, 0, 0), []
+            deleted = self.connection.execute(table.delete()).rowcount
+            self._write_dicts(rows, table_name)
+            self._write_row_hashes(table_name, [("", digest)], list(stored))
+            return (len(rows), 0, deleted), []
+
+        new = hash_rows(_as_stored(rows, table), columns, key_columns)
+        inserts, updates, deletes = diff_hashes(stored, new)
+        # a row whose diff key changed in a column beyond the primary key is
+        # deleted before its replacement is inserted, not after
+        primary = [column.name for column in table.primary_key.columns]
+        if primary and set(primary) < set(key_columns):
+            positions = [key_columns.index(column) for column in primary]
+            inserted = {tuple(row[column] for column in primary) for row in inserts}
+            replaced = {key_text for key_text in deletes if tuple(
+                parse_row_key(key_text)[position] for position in positions) in inserted}
+            self._delete_keys(table_name, [parse_row_key(key_text) for key_text in replaced])
+        else:
+            replaced = set()
+        self._write_dicts(inserts, table_name)
+        key_params = ["key_" + column for column in key_columns]
+        if updates:
+            update = table.update().where(_key_condition(table, key_columns, key_params))
+            for batch in _batches(updates, self.batch_size):
+                self.connection.execute(update, [{**row, **dict(zip(key_params, key))}
+                                                 for key, row in batch])
+
+        if from_table:
+            changed = new.items()
+            removed = []
+        else:
+            changed = [(key_text, entry) for key_text, entry in new.items()
+                       if stored.get(key_text) != entry[1]]
+            removed = [row_key(key) for key, _ in updates] + deletes
+        self._write_row_hashes(table_name,
+                               [(key_text, row_hash) for key_text, (_, row_hash, _) in changed],
+                               removed)
+        return (len(inserts), len(updates), len(deletes)), \
+            [parse_row_key(key_text) for key_text in deletes if key_text not in replaced]
 
-        self.write_fare_attributes(gtfs.fare_attributes)
-        self.write_routes(gtfs.routes)
-        self.write_stops(gtfs.stops)
-        self.write_shapes(gtfs.shapes)
-        self.write_services(gtfs.services, gtfs.service_exceptions)
+    def _write_row_hashes(self, table_name, entries, removed):
+        """
+        _write_row_hashes: remove the hashes of the given row keys and add
+        (row key, row hash) entries
+        """
+        if removed:
+            delete = sqlalchemy.sql.expression.delete(self.row_hashes).where(sqlalchemy.and_(
+                self.row_hashes.c.table_name == table_name,
+                self.row_hashes.c.key_hash == sqlalchemy.bindparam("removed_key_hash")))
+            for batch in _batches(removed, self.batch_size):
+                self.connection.execute(delete, [{"removed_key_hash": text_hash(key_text)}
+                                                 for key_text in batch])
+        ins = sqlalchemy.sql.expression.insert(self.row_hashes)
+        for batch in _batches(entries, self.batch_size):
+            self.connection.execute(ins, [{
+                "table_name": table_name,
+                "key_hash": text_hash(key_text),
+                "row_key": key_text,
+                "row_hash": row_hash,
+            } for key_text, row_hash in batch])
 
-        self.write_fare_rules(gtfs.fare_rules)
-        self.write_transfers(gtfs.transfers)
-        self.write_trips(gtfs.trips)
-        self.write_pathways(gtfs.pathways)
+    def _delete_keys(self, table_name, keys):
+        """
+        _delete_keys: delete the rows of a table with the given keys
+        """
+        if not keys:
+            return
+        table = self.tables[table_name]
+        key_columns = self.diff_key(table_name)
+        delete = table.delete().where(
+            _key_condition(table, key_columns, ["key_" + column for column in key_columns]))
+        for batch in _batches(keys, self.batch_size):
+            self.connection.execute(delete, [{"key_" + column: value
+                                              for column, value in zip(key_columns, key)}
+                                             for key in batch])
 
-        self.write_stop_times(gtfs.stop_times)
-        self.write_frequencies(gtfs.frequencies)
+    def _write_gtfs(self, gtfs):
+        rows = _gtfs_rows(gtfs)
+        tiers = self.load_tiers()
+        if self.max_parallel_tables <= 1 or self.engine.dialect.name == "sqlite":
+            for table_name in chain.from_iterable(tiers):
+                self._write_dicts(rows[table_name], table_name)
+            return
 
-        self.write_feed_info(gtfs.feed_info)
-        self.write_translations(gtfs.translations)
+        def load(table_name):
+            with self.engine.connect() as connection:
+                self._write_dicts(rows[table_name], table_name, connection)
+
+        load_in_tiers(tiers, load, self.max_parallel_tables)
+
+    def _write_dicts(self, dicts, table_name, connection=None):
+        """
+        _write_dicts: insert rows given as dicts in a single transaction, using
+        the bulk load path of the database if there is one and executemany per
+        batch otherwise
+
+        Arguments:
+        dicts: iterable of dicts
+        table_name: key of the table in self.tables
+        connection: connection to use, defaults to self.connection
+        """
+        if connection is None:
+            connection = self.connection
+        table = self.tables[table_name]
+        dialect = self.engine.dialect.name
+        mysql_checks_off = dialect == "mysql" and self.defer_constraints
+        if mysql_checks_off:
+            connection.execute("SET foreign_key_checks = 0")
+        try:
+            with connection.begin():
+                # copy_expert is psycopg2's, other PostgreSQL drivers insert
+                if self.bulk_load and dialect == "postgresql" and \
+                        self.engine.dialect.driver == "psycopg2":
+                    self._copy_postgresql(dicts, table, connection)
+                elif self.bulk_load and dialect == "mysql":
+                    self._load_data_mysql(dicts, table, connection)
+                else:
+                    ins = sqlalchemy.sql.expression.insert(table)
+                    for batch in _batches(dicts, self.batch_size):
+                        connection.execute(ins, batch)
+        finally:
+            if mysql_checks_off:
+                connection.execute("SET foreign_key_checks = 1")
+
+    def _quoted_columns(self, table):
+        preparer = self.engine.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(column.name) for column in table.columns)
+        return preparer.format_table(table), columns
+
+    def _copy_postgresql(self, dicts, table, connection):
+        """
+        _copy_postgresql: write rows with COPY ... FROM STDIN, one COPY per batch
+        """
+        table_name, columns = self._quoted_columns(table)
+        sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        cursor = connection.connection.cursor()
+        try:
+            for batch in _batches(dicts, self.batch_size):
+                data = io.StringIO("".join(csv_lines(batch, table.columns.keys())))
+                cursor.copy_expert(sql, data)
+        finally:
+            cursor.close()
+
+    def _load_data_mysql(self, dicts, table, connection):
+        """
+        _load_data_mysql: write rows to a temporary CSV file and load it with
+        LOAD DATA LOCAL INFILE, the connection needs local_infile enabled
+        """
+        table_name, columns = self._quoted_columns(table)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=".csv",
+                                         delete=False) as temp_file:
+            temp_file.writelines(csv_lines(dicts, table.columns.keys(), null="NULL"))
+        try:
+            connection.execute(
+                sqlalchemy.text(f"LOAD DATA LOCAL INFILE :path INTO TABLE {table_name} "
+                                "CHARACTER SET utf8mb4 "
+                                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                                "ESCAPED BY '' LINES TERMINATED BY '\\n' "
+                                f"({columns})"),
+                path=temp_file.name)
+        finally:
+            os.remove(temp_file.name)
 
     def _write_list_as_dicts(self, data_list, table_name):
-        for data in data_list:
-            ins = sqlalchemy.sql.expression.insert(self.tables[table_name],
-                                                   values=data.to_dict())
-            self.connection.execute(ins)
+        self._write_dicts((data.to_dict() for data in data_list), table_name)
 
     def write_agencies(self, agencies):
         """
@@ -99,9 +589,7 @@ class DatabaseConnection:
         write_feed_info: writes all instances of FeedInfo
         """
         if feedinfo is not None:
-            ins = sqlalchemy.sql.expression.insert(self.tables["feed_infos"],
-                                                   values=feedinfo.to_dict())
-            self.connection.execute(ins)
+            self._write_list_as_dicts([feedinfo], "feed_infos")
 
     def write_frequencies(self, frequencies):
         """
@@ -129,18 +617,10 @@ class DatabaseConnection:
 
     def write_services(self, services, service_exceptions):
         """
-        write_services: writes all instances of Service
-        """
-        self._write_list_as_dicts(services, "services")
-        for service_exception in service_exceptions:
-            data = {}
-            data["service_id"] = service_exception.service_id
-            data["start_date"] = service_exception.date
-            data["end_date"] = service_exception.date
-            data["exception_type"] = service_exception.exception_type
-            ins = sqlalchemy.sql.expression.insert(self.tables["services"],
-                                                   values=data)
-            self.connection.execute(ins)
+        write_services: writes all instances of Service and ServiceException
+        in one transaction
+        """
+        self._write_dicts(_service_dicts(services, service_exceptions), "services")
 
     def write_shapes(self, shapes):
         """
@@ -0,0 +1,153 @@
+"""
+departures.py: per-stop timetables of departure times, searched by bisection for departure boards
+"""
+
+import collections
+import datetime
+from array import array
+from bisect import bisect_left
+
+from realtime_gtfs.models.schema import parse_time
+from realtime_gtfs.service_calendar import parse_date
+
+# pickup_type of a StopTime passengers can not board at
+NO_PICKUP = 1
+SECONDS_PER_DAY = 24 * 3600
+
+# departure_time is in seconds since noon minus 12h of the queried date, so
+# departures of trips of the previous service day running past midnight are
+# also found, service_date is the date of the service day of the trip
+Departure = collections.namedtuple("Departure", ["departure_time", "trip_id", "stop_sequence",
+                                                 "service_date"])
+
+def trip_run_offsets(stop_times, frequencies):
+    """
+    trip_run_offsets: list of the seconds to add to the times of the stop
+    times of a trip for every run of the trip. A trip without frequencies runs
+    once at its times, a trip with frequencies runs every headway_secs from
+    start_time up to end_time, its stop times only give the time between stops.
+
+    Arguments:
+    stop_times: StopTimes of the trip, by stop_sequence
+    frequencies: Frequencies of the trip
+    """
+    if not frequencies:
+        return [0]
+    first = next((time for stop_time in stop_times
+                  for time in (stop_time.departure_time, stop_time.arrival_time)
+                  if time is not None), None)
+    if first is None:
+        return []
+    return [start - first for frequency in frequencies if frequency.headway_secs > 0
+            for start in range(frequency.start_time, frequency.end_time, frequency.headway_secs)]
+
+def _trip_departures(stop_times, frequencies):
+    """
+    _trip_departures: (departure time, stop_id, stop_sequence) of every
+    departure of a trip, every run of a trip with frequencies included
+
+    Arguments:
+    stop_times: StopTimes of the trip, by stop_sequence
+    frequencies: Frequencies of the trip
+    """
+    # passengers can not depart from the last stop of a trip
+    departures = [(stop_time.arrival_time if stop_time.departure_time is None
+                   else stop_time.departure_time, stop_time.stop_id, stop_time.stop_sequence)
+                  for stop_time in stop_times[:-1] if stop_time.pickup_type != NO_PICKUP]
+    departures = [departure for departure in departures if departure[0] is not None]
+    if not frequencies:
+        return departures
+    return [(offset + time, stop_id, stop_sequence)
+            for offset in trip_run_offsets(stop_times, frequencies)
+            for time, stop_id, stop_sequence in departures]
+
+class DepartureBoard(): # pylint: disable=too-few-public-methods
+    """
+    DepartureBoard: the departures at every stop, as an array of departure
+    times sorted in ascending order with parallel arrays of the index of the
+    trip and the stop_sequence of every departure. A query bisects the times
+    and walks forward, skipping the trips whose service is not running.
+
+    Arguments:
+    trips: list of Trip
+    stop_times_by_trip: dict of trip_id to the StopTimes of the trip, by stop_sequence
+    frequencies_by_trip: dict of trip_id to the Frequencies of the trip
+    calendar: ServiceCalendar of the services of the trips
+    """
+    def __init__(self, trips, stop_times_by_trip, frequencies_by_trip, calendar):
+        self.calendar = calendar
+        self.trip_ids = []
+        service_ids = {}
+        # index in service_ids of the service of every trip
+        self.trip_services = array("i")
+        rows = {}
+        for trip in trips:
+            stop_times = stop_times_by_trip.get(trip.trip_id)
+            if not stop_times:
+                continue
+            index = len(self.trip_ids)
+            self.trip_ids.append(trip.trip_id)
+            self.trip_services.append(service_ids.setdefault(trip.service_id, len(service_ids)))
+            for time, stop_id, stop_sequence in _trip_departures(
+                    stop_times, frequencies_by_trip.get(trip.trip_id)):
+                rows.setdefault(stop_id, []).append((time, index, stop_sequence))
+        self.service_ids = list(service_ids)
+
+        # stop_id: (departure times, trip indexes, stop_sequences)
+        self.timetables = {}
+        for stop_id, departures in rows.items():
+            departures.sort()
+            times, trip_indexes, stop_sequences = zip(*departures)
+            self.timetables[stop_id] = (array("i", times), array("i", trip_indexes),
+                                        array("i", stop_sequences))
+        # bytearray holding 1 for the active services of a date, by service index
+        self.active_by_date = {}
+
+    def _active(self, date):
+        """
+        _active: bytearray, 1 at the index of every service running on a date
+        """
+        active = self.active_by_date.get(date)
+        if active is None:
+            running = self.calendar.active_services(date)
+            active = bytearray(service_id in running for service_id in self.service_ids)
+            self.active_by_date[date] = active
+        return active
+
+    def next_departures(self, stop_id, time, date, count=10):
+        """
+        next_departures: list of the first `count` Departures from a stop at or
+        after a time on a date, by departure time
+
+        Arguments:
+        stop_id: id of the stop
+        time: seconds since noon minus 12h of the date, or a GTFS time string
+        date: datetime.date or GTFS date string
+        count: maximum number of departures
+        """
+        timetable = self.timetables.get(stop_id)
+        if timetable is None or count <= 0:
+            return []
+        if isinstance(time, str):
+            time = parse_time(time)
+        date = parse_date(date)
+        times, trip_indexes, stop_sequences = timetable
+        found = []
+        # trips of the previous service day are at times shifted by a day
+        for days_before in (0, 1):
+            service_date = date - datetime.timedelta(days=days_before)
+            shift = days_before * SECONDS_PER_DAY
+            active = self._active(service_date)
+            trip_services = self.trip_services
+            position = bisect_left(times, time + shift)
+            end = len(times)
+            matches = 0
+            while position < end and matches < count:
+                trip_index = trip_indexes[position]
+                if active[trip_services[trip_index]]:
+                    found.append(Departure(times[position] - shift, self.trip_ids[trip_index],
+                                           stop_sequences[position], service_date))
+                    matches += 1
+                position += 1
+        found.sort(key=lambda departure: departure.departure_time)
+        return found[:count]
@@ -0,0 +1,90 @@
+"""
+diff.py: compare the rows of a table with the content hashes of the rows already stored
+"""
+
+import ast
+import hashlib
+from operator import itemgetter
+
+def _tuple_getter(columns):
+    """
+    _tuple_getter: function returning the values of `columns` of a dict as a tuple
+    """
+    if len(columns) == 1:
+        column = columns[0]
+        return lambda row: (row[column],)
+    return itemgetter(*columns)
+
+def row_key(values):
+    """
+    row_key: text identifying a tuple of values (strings, numbers or None), the
+    repr of str, int, float and None is unambiguous and does not depend on the platform
+    """
+    return repr(values)
+
+def parse_row_key(key):
+    """
+    parse_row_key: the tuple of values a row key was made from
+    """
+    return ast.literal_eval(key)
+
+def text_hash(text):
+    """
+    text_hash: hexadecimal MD5 hash of a string
+    """
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+def content_hash(values):
+    """
+    content_hash: hash of a tuple of values, see row_key
+    """
+    return text_hash(row_key(values))
+
+def hash_rows(rows, columns, key_columns):
+    """
+    hash_rows: hash every row, returns a dict mapping the row key of a row
+    to a (key, row hash, row) tuple. Of rows with the same key the last one is kept.
+
+    Arguments:
+    rows: iterable of dicts with a value for every column
+    columns: names of all columns, in order
+    key_columns: names of the columns identifying a row
+    """
+    get_key = _tuple_getter(key_columns)
+    get_values = _tuple_getter(columns)
+    hashes = {}
+    for row in rows:
+        key = get_key(row)
+        hashes[row_key(key)] = (key, content_hash(get_values(row)), row)
+    return hashes
+
+def table_hash(rows, columns):
+    """
+    table_hash: hash of all rows of a table, independent of their order
+
+    Arguments:
+    rows: iterable of dicts with a value for every column
+    columns: names of all columns, in order
+    """
+    get_values = _tuple_getter(columns)
+    return content_hash(tuple(sorted(content_hash(get_values(row)) for row in rows)))
+
+def diff_hashes(stored, new):
+    """
+    diff_hashes: compare stored and new rows, returns a tuple of the rows to
+    insert, the (key, row) tuples to update and the row keys to delete
+
+    Arguments:
+    stored: dict mapping row keys to row hashes
+    new: dict mapping row keys to (key, row hash, row) tuples, see hash_rows
+    """
+    inserts = []
+    updates = []
+    for key_text, (key, row_hash, row) in new.items():
+        old = stored.get(key_text)
+        if old is None:
+            inserts.append(row)
+        elif old != row_hash:
+            updates.append((key, row))
+    deletes = [key_text for key_text in stored if key_text not in new]
+    return inserts, updates, deletes
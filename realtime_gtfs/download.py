@@ -0,0 +1,141 @@
+"""
+download.py: streaming downloads with resume after a dropped connection
+"""
+
+import collections
+import functools
+import hashlib
+import time
+
+import requests
+
+# Bytes read from the response at a time
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Number of times a download is resumed after the connection dropped
+DOWNLOAD_RETRIES = 5
+# Seconds to wait for the server to connect and to send data
+DOWNLOAD_TIMEOUT = 60
+
+# Result of Downloader.download, sha256 and size are None if no body was downloaded
+Download = collections.namedtuple("Download", ["status_code", "headers", "sha256", "size"])
+
+@functools.lru_cache(maxsize=None)
+def shared_session():
+    """
+    shared_session: requests.Session shared by all downloaders, so keep-alive
+    connections to a server are pooled and reused across downloads
+    """
+    return requests.Session()
+
+def _content_range_start(response):
+    """
+    _content_range_start: first byte of a 206 Partial Content response, None
+    if the response is not partial
+    """
+    if response.status_code != 206:
+        return None
+    try:
+        unit, byte_range = response.headers["Content-Range"].split(" ", 1)
+        return int(byte_range.split("-", 1)[0]) if unit == "bytes" else None
+    except (KeyError, ValueError):
+        return None
+
+class Downloader: # pylint: disable=too-few-public-methods
+    """
+    Downloader: streams a URL into a file in large chunks. If the connection
+    drops, the download is resumed where it stopped with a Range request,
+    guarded by If-Range so a feed that changed in the meantime is downloaded
+    again from the start. The chunk that was being read when the connection
+    dropped is downloaded again. The body is requested without content
+    encoding, as Range offsets count encoded bytes; a body the server encodes
+    anyway is downloaded again from the start.
+
+    Arguments:
+    chunk_size: bytes read from the response at a time
+    retries: number of times a download is resumed after the connection dropped
+    progress: called with the bytes downloaded so far, the total size (None if
+    unknown) and the throughput in bytes per second after every chunk
+    session: requests.Session to download with, the shared session by default
+    """
+    def __init__(self, chunk_size=DOWNLOAD_CHUNK_SIZE, retries=DOWNLOAD_RETRIES,
+                 progress=None, session=None):
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.progress = progress
+        self.session = session if session is not None else shared_session()
+        self.timeout = DOWNLOAD_TIMEOUT
+
+    def download(self, url, out_file, headers=None):
+        """
+        download: write the body of a GET request to out_file, returns a Download.
+        Only 200 responses are written, the Download of any other response
+        holds its status code and headers.
+
+        Arguments:
+        url: URL to download
+        out_file: binary file opened for writing, truncated if a resume fails
+        headers: extra request headers, e.g. conditional ones
+        """
+        state = {"sha256": hashlib.sha256(), "size": 0, "validator": None,
+                 "total": None, "headers": None, "encoded": False}
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            request_headers = {**(headers or {}), "Accept-Encoding": "identity"}
+            if state["size"]:
+                # the body being resumed was already sent in answer to these
+                request_headers.pop("If-None-Match", None)
+                request_headers.pop("If-Modified-Since", None)
+            if state["size"] and not state["encoded"]:
+                request_headers["Range"] = f"bytes={state['size']}-"
+                if state["validator"] is not None:
+                    request_headers["If-Range"] = state["validator"]
+            try:
+                with self.session.get(url, headers=request_headers, stream=True,
+                                      timeout=self.timeout) as response:
+                    if not self._start_response(response, state, out_file):
+                        return Download(response.status_code, response.headers, None, None)
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        out_file.write(chunk)
+                        state["sha256"].update(chunk)
+                        state["size"] += len(chunk)
+                        if self.progress is not None:
+                            elapsed = max(time.perf_counter() - start, 1e-9)
+                            self.progress(state["size"], state["total"],
+                                          state["size"] / elapsed)
+                if state["total"] is not None and state["size"] < state["total"]:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"{url}: {state['size']} of {state['total']} bytes received")
+                return Download(200, state["headers"], state["sha256"].hexdigest(),
+                                state["size"])
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout):
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+
+    @staticmethod
+    def _start_response(response, state, out_file):
+        """
+        _start_response: prepare state and out_file for the body of a response,
+        returns False if the response has no body to download
+        """
+        if state["size"] and not state["encoded"] and \
+                _content_range_start(response) == state["size"]:
+            return True
+        if response.status_code != 200:
+            return False
+        if state["size"]:
+            # the server ignored the Range request or the feed changed, start over
+            out_file.seek(0)
+            out_file.truncate()
+            state["sha256"] = hashlib.sha256()
+            state["size"] = 0
+        state["headers"] = response.headers
+        state["validator"] = response.headers.get("ETag", response.headers.get("Last-Modified"))
+        length = response.headers.get("Content-Length", "")
+        # the length of an encoded body is not the number of bytes written
+        state["encoded"] = response.headers.get("Content-Encoding", "identity") != "identity"
+        state["total"] = int(length) if length.isdigit() and not state["encoded"] else None
+        return True
@@ -33,3 +33,27 @@ class InvalidURLError(RuntimeError):
     def __init__(self, arg):
         self.args = ["Invalid URL: " + arg]
         RuntimeError.__init__(self)
+
+class VersionError(RuntimeError):
+    """
+    VersionError: raised when a feed version does not exist
+    """
+    def __init__(self, arg):
+        self.args = ["Unknown feed version: " + arg]
+        RuntimeError.__init__(self)
+
+class SnapshotError(RuntimeError):
+    """
+    SnapshotError: raised when a snapshot can not be loaded
+    """
+    def __init__(self, arg):
+        self.args = ["Unusable snapshot: " + arg]
+        RuntimeError.__init__(self)
+
+class FeedStoreError(RuntimeError):
+    """
+    FeedStoreError: raised when a feed store can not be written or opened
+    """
+    def __init__(self, arg):
+        self.args = ["Unusable feed store: " + arg]
+        RuntimeError.__init__(self)
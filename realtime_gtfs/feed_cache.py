@@ -0,0 +1,109 @@
+"""
+feed_cache.py: on-disk cache of downloaded feeds, revalidated with conditional requests
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from realtime_gtfs.download import Downloader
+from realtime_gtfs.exceptions import InvalidURLError
+
+class FeedCache():
+    """
+    FeedCache: keeps the last download of every URL in a directory, next to its
+    ETag, Last-Modified and SHA-256. Downloads send If-None-Match and
+    If-Modified-Since, so an unchanged feed is not transferred again by servers
+    supporting them.
+
+    Arguments:
+    directory: directory holding the cache, created if it does not exist
+    downloader: Downloader to fetch feeds with, a default one if None
+    """
+    def __init__(self, directory, downloader=None):
+        self.directory = directory
+        self.downloader = downloader if downloader is not None else Downloader()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url, extension):
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name + extension)
+
+    def path(self, url):
+        """
+        path: path of the cached feed for `url`, which might not exist yet
+        """
+        return self._path(url, ".zip")
+
+    def metadata(self, url):
+        """
+        metadata: dict with the url, etag, last_modified and sha256 of the cached
+        feed for `url`, None if it is not cached
+        """
+        if not os.path.exists(self.path(url)):
+            return None
+        try:
+            with open(self._path(url, ".json"), encoding="utf-8") as metadata_file:
+                return json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_metadata(self, url, metadata):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory,
+                                         delete=False) as metadata_file:
+            json.dump(metadata, metadata_file)
+        os.replace(metadata_file.name, self._path(url, ".json"))
+
+    def _download(self, url, headers):
+        """
+        _download: download `url` to a temporary file in the cache directory,
+        returns the Download and the path of the file. The file is removed if
+        the download fails or the response has no body.
+        """
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as temp_file:
+            download = None
+            try:
+                download = self.downloader.download(url, temp_file, headers)
+            finally:
+                if download is None or download.status_code != 200:
+                    temp_file.close()
+                    os.remove(temp_file.name)
+        return download, temp_file.name
+
+    def fetch(self, url):
+        """
+        fetch: make sure the cache holds the current feed at `url`, returns the
+        path of the cached feed and whether its contents changed. The feed is
+        unchanged if the server answers 304 Not Modified or if the downloaded
+        file has the same SHA-256 as the cached one.
+
+        Arguments:
+        url: URL to static GTFS data
+        """
+        metadata = self.metadata(url)
+        headers = {}
+        if metadata is not None:
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+
+        download, temp_path = self._download(url, headers)
+        if download.status_code == 304 and metadata is not None:
+            return self.path(url), False
+        if download.status_code != 200:
+            raise InvalidURLError(url)
+
+        changed = metadata is None or metadata["sha256"] != download.sha256
+        if changed:
+            os.replace(temp_path, self.path(url))
+        else:
+            os.remove(temp_path)
+        self._write_metadata(url, {
+            "url": url,
+            "etag": download.headers.get("ETag"),
+            "last_modified": download.headers.get("Last-Modified"),
+            "sha256": download.sha256,
+        })
+        return self.path(url), changed
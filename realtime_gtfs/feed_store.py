@@ -0,0 +1,384 @@
+"""
+feed_store.py: read-only on-disk feed format that is memory mapped and queried in place
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from realtime_gtfs import models
+from realtime_gtfs.columnar import NULL_INT, ColumnarTable
+from realtime_gtfs.exceptions import FeedStoreError
+
+# Increase whenever the layout of the file changes
+FEED_STORE_VERSION = 2
+FEED_STORE_MAGIC = b"RTGTFSMM"
+# magic, format version, length of the JSON metadata following the header
+HEADER = struct.Struct("<8sIQ")
+# Sections start at multiples of this, so every column can be cast in place
+ALIGNMENT = 8
+# Integer typecodes tried from small to large, the smallest value of the
+# chosen type stands for None
+INT_TYPECODES = ["b", "h", "i", "q"]
+
+# (attribute of GTFS, model class)
+STORE_TABLES = [
+    ("agencies", models.Agency),
+    ("stops", models.Stop),
+    ("routes", models.Route),
+    ("trips", models.Trip),
+    ("stop_times", models.StopTime),
+    ("services", models.Service),
+    ("service_exceptions", models.ServiceException),
+    ("fare_attributes", models.FareAttribute),
+    ("fare_rules", models.FareRule),
+    ("shapes", models.Shape),
+    ("frequencies", models.Frequency),
+    ("transfers", models.Transfer),
+    ("pathways", models.Pathway),
+    ("levels", models.Level),
+    ("feed_info", models.FeedInfo),
+    ("translations", models.Translation),
+]
+
+def _int_typecode(values):
+    """
+    _int_typecode: smallest integer typecode holding all values, keeping its
+    smallest value free for None
+    """
+    present = [value for value in values if value is not None]
+    low, high = min(present, default=0), max(present, default=0)
+    for typecode in INT_TYPECODES:
+        bits = array(typecode).itemsize * 8
+        if -2 ** (bits - 1) < low and high < 2 ** (bits - 1):
+            return typecode
+    raise FeedStoreError(f"integers out of range: {low}, {high}")
+
+def _column_values(rows, name):
+    """
+    _column_values: the values of one field of a table, a list of models or a
+    ColumnarTable, with None for missing values
+    """
+    if isinstance(rows, ColumnarTable):
+        typecode = dict(rows.COLUMNS)[name]
+        column = getattr(rows, name)
+        if typecode == "i":
+            return [None if value == NULL_INT else value for value in column]
+        if typecode == "d":
+            return [None if math.isnan(value) else value for value in column]
+        return list(column)
+    return [getattr(row, name) for row in rows]
+
+def _encode_column(values, converter, string_codes):
+    """
+    _encode_column: turn the values of a field into a (typecode, array) tuple
+    """
+    if converter is not str and converter is not float:
+        typecode = _int_typecode(values)
+        null = -2 ** (array(typecode).itemsize * 8 - 1)
+        return typecode, array(typecode, [null if value is None else value for value in values])
+    if converter is float:
+        return "d", array("d", [math.nan if value is None else value for value in values])
+    return "I", array("I", [string_codes[value] for value in values])
+
+def _gtfs_tables(gtfs):
+    """
+    _gtfs_tables: (attribute, model class, rows) of every table of a GTFS instance
+    """
+    for attribute, model_class in STORE_TABLES:
+        rows = getattr(gtfs, attribute)
+        if attribute == "feed_info":
+            rows = [] if rows is None else [rows]
+        yield attribute, model_class, rows
+
+def write_feed_store(gtfs, path):
+    """
+    write_feed_store: write all tables of a GTFS instance to a feed store file,
+    replacing it atomically. Every field becomes a fixed-width column: integers
+    in the smallest type they fit, floats as doubles and strings as 4 byte
+    codes into one sorted table of all distinct strings.
+
+    Arguments:
+    gtfs: the GTFS instance
+    path: path of the feed store
+    """
+    columns = []
+    strings = set()
+    for attribute, model_class, rows in _gtfs_tables(gtfs):
+        for field in model_class.FIELDS:
+            values = _column_values(rows, field.name)
+            if field.converter is str:
+                strings.update(values)
+            columns.append((attribute, field, values))
+    strings.discard(None)
+    strings = sorted(strings)
+    string_codes = {value: code for code, value in enumerate(strings, 1)}
+    string_codes[None] = 0
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = array("Q", [0, 0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    sections = [offsets, b"".join(encoded)]
+    metadata = {"strings": {"count": len(strings)}, "tables": {}}
+    for attribute, model_class, rows in _gtfs_tables(gtfs):
+        metadata["tables"][attribute] = {"model": model_class.__name__, "rows": len(rows),
+                                         "columns": {}}
+    for attribute, field, values in columns:
+        typecode, data = _encode_column(values, field.converter, string_codes)
+        metadata["tables"][attribute]["columns"][field.name] = [typecode, len(sections)]
+        sections.append(data)
+
+    # the metadata refers to sections by index, their offsets follow it
+    section_bytes = [bytes(section) for section in sections]
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+    position = HEADER.size + len(metadata_bytes)
+    position += -position % ALIGNMENT + 8 + 8 * len(sections)
+    layout = array("Q")
+    for data in section_bytes:
+        position += -position % ALIGNMENT
+        layout.append(position)
+        position += len(data)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp_file:
+        temp_file.write(HEADER.pack(FEED_STORE_MAGIC, FEED_STORE_VERSION, len(metadata_bytes)))
+        temp_file.write(metadata_bytes)
+        temp_file.write(b"\0" * (-temp_file.tell() % ALIGNMENT))
+        temp_file.write(struct.pack("<Q", len(sections)))
+        temp_file.write(layout.tobytes())
+        for start, data in zip(layout, section_bytes):
+            temp_file.write(b"\0" * (start - temp_file.tell()))
+            temp_file.write(data)
+    os.replace(temp_file.name, path)
+
+class StoreStrings():
+    """
+    StoreStrings: the sorted table of all strings of a feed store, code 0 is None
+    """
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        if code == 0:
+            return None
+        return str(self.blob[self.offsets[code]:self.offsets[code + 1]], "utf-8")
+
+    def _encoded(self, code):
+        return bytes(self.blob[self.offsets[code]:self.offsets[code + 1]])
+
+    def code_of(self, value):
+        """
+        code_of: the code of `value`, found with a binary search, None if the
+        store does not hold it
+        """
+        if value is None:
+            return 0
+        target = value.encode("utf-8")
+        low, high = 1, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._encoded(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self._encoded(low) == target:
+            return low
+        return None
+
+class StoreColumn():
+    """
+    StoreColumn: read-only column of a feed store, backed directly by the mapped
+    file. Indexing and iterating yield the values the model field holds.
+
+    Arguments:
+    view: memoryview of the column, cast to its typecode
+    strings: StoreStrings if the column holds string codes, None otherwise
+    """
+    def __init__(self, view, strings=None):
+        self.view = view
+        self.strings = strings
+        typecode = view.format
+        if strings is None and typecode in INT_TYPECODES:
+            self.null = -2 ** (view.itemsize * 8 - 1)
+        else:
+            self.null = None
+
+    def _value(self, raw):
+        if self.strings is not None:
+            return self.strings[raw]
+        if self.null is not None:
+            return None if raw == self.null else raw
+        return None if math.isnan(raw) else raw
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._value(raw) for raw in self.view[index]]
+        return self._value(self.view[index])
+
+    def __iter__(self):
+        return (self._value(raw) for raw in self.view)
+
+    def indices(self, value):
+        """
+        indices: indices of the rows holding `value`, without decoding the column
+        """
+        if self.strings is not None:
+            raw = self.strings.code_of(value)
+            if raw is None:
+                return []
+        elif value is None:
+            if self.null is None:
+                return [index for index, raw in enumerate(self.view) if math.isnan(raw)]
+            raw = self.null
+        else:
+            raw = value
+        return [index for index, stored in enumerate(self.view) if stored == raw]
+
+class StoreTable():
+    """
+    StoreTable: read-only, list-like table of a feed store. Every field is
+    available as a StoreColumn attribute with the name of the field, indexing
+    or iterating the table yields model instances built on demand.
+
+    Arguments:
+    model_class: model class of the rows
+    columns: dict mapping field names to StoreColumns
+    rows: number of rows
+    """
+    def __init__(self, model_class, columns, rows):
+        self.MODEL = model_class # pylint: disable=invalid-name
+        self.keys = tuple(field.name for field in model_class.FIELDS)
+        self.columns = [columns[key] for key in self.keys]
+        self.rows = rows
+        for key, column in columns.items():
+            setattr(self, key, column)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.MODEL.from_rows(self.keys, zip(*(column[index]
+                                                          for column in self.columns)))
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError("table index out of range")
+        return self.MODEL.from_rows(self.keys, [tuple(column[index]
+                                                      for column in self.columns)])[0]
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def where(self, name, value):
+        """
+        where: the rows whose field `name` holds `value`, as model instances
+        """
+        return [self[index] for index in getattr(self, name).indices(value)]
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return False
+        return all(mine == theirs for mine, theirs in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return str(self)
+
+    def __str__(self):
+        return f"[StoreTable {self.MODEL.__name__} ({self.rows} rows)]"
+
+class FeedStore():
+    """
+    FeedStore: a feed store written by write_feed_store, memory mapped
+    read-only. Nothing is deserialized when opening it, columns are read
+    straight from the mapped file, so processes opening the same file share
+    its pages through the page cache. Tables are StoreTables available under
+    the attribute names GTFS uses, feed_info is a FeedInfo or None.
+
+    Arguments:
+    path: path of the feed store
+    """
+    def __init__(self, path):
+        with open(path, "rb") as store_file:
+            self.mmap = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.views = []
+        try:
+            self._open()
+        except (struct.error, ValueError, KeyError, TypeError) as error:
+            self.close()
+            raise FeedStoreError(f"{path}: {error}") from error
+
+    def _view(self, start, end, typecode):
+        view = memoryview(self.mmap)[start:end].cast(typecode)
+        self.views.append(view)
+        return view
+
+    def _open(self):
+        magic, version, metadata_length = HEADER.unpack_from(self.mmap)
+        if magic != FEED_STORE_MAGIC or version != FEED_STORE_VERSION:
+            raise ValueError(f"format version {version}")
+        position = HEADER.size + metadata_length
+        metadata = json.loads(self.mmap[HEADER.size:position])
+        position += -position % ALIGNMENT
+        count, = struct.unpack_from("<Q", self.mmap, position)
+        starts = array("Q", self.mmap[position + 8:position + 8 + 8 * count])
+
+        string_count = metadata["strings"]["count"]
+        offsets = self._view(starts[0], starts[0] + 8 * (string_count + 2), "Q")
+        blob = self._view(starts[1], starts[1] + offsets[-1], "B")
+        self.strings = StoreStrings(offsets, blob)
+
+        model_classes = dict(STORE_TABLES)
+        self.tables = {}
+        for attribute, table in metadata["tables"].items():
+            model_class = model_classes[attribute]
+            if table["model"] != model_class.__name__:
+                raise ValueError(f"{attribute} holds {table['model']}")
+            columns = {}
+            for name, (typecode, section) in table["columns"].items():
+                size = array(typecode).itemsize * table["rows"]
+                view = self._view(starts[section], starts[section] + size, typecode)
+                columns[name] = StoreColumn(view, self.strings if typecode == "I" else None)
+            if set(columns) != {field.name for field in model_class.FIELDS}:
+                raise ValueError(f"{attribute} was written for other fields")
+            self.tables[attribute] = StoreTable(model_class, columns, table["rows"])
+
+    def __getattr__(self, name):
+        tables = self.__dict__.get("tables", {})
+        if name == "feed_info" and name in tables:
+            return tables[name][0] if len(tables[name]) else None
+        if name in tables:
+            return tables[name]
+        raise AttributeError(name)
+
+    def close(self):
+        """
+        close: release every column and unmap the file
+        """
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -2,338 +2,808 @@
 gtfs.py: contains main class GTFS
 """
 
+import os
+import shutil
 import tempfile
 import zipfile
-import requests
+from concurrent.futures import ProcessPoolExecutor
 
+from realtime_gtfs.columnar import StopTimeTable, ShapeTable
+from realtime_gtfs.csv_reader import read_csv
 from realtime_gtfs.database import DatabaseConnection
+from realtime_gtfs.departures import DepartureBoard
+from realtime_gtfs.download import Downloader
+from realtime_gtfs.feed_cache import FeedCache
+from realtime_gtfs.feed_store import write_feed_store
+from realtime_gtfs.indexes import INDEXES, TableList, build_index, table_version
+from realtime_gtfs.service_calendar import ServiceCalendar
+from realtime_gtfs.spatial import StopIndex
 
 from realtime_gtfs.models import (Agency, Route, Stop, Trip, StopTime, Service,
                                   ServiceException, FareAttribute, FareRule, Shape, Frequency,
                                   Transfer, Pathway, Level, FeedInfo, Translation)
+from realtime_gtfs.models.schema import RowDecoder
+
+from realtime_gtfs.exceptions import InvalidURLError, SnapshotError
+from realtime_gtfs.packing import pack_models, unpack_models
+from realtime_gtfs.planner import Planner
+from realtime_gtfs.snapshot import feed_hash, read_snapshot, write_snapshot
+
+# Members larger than this are parsed in chunks when parsing in parallel
+CHUNK_SIZE = 32 * 1024 * 1024
+
+# (file name, parse method, attribute, required)
+GTFS_FILES = [
+    ("agency.txt", "parse_agencies", "agencies", True),
+    ("stops.txt", "parse_stops", "stops", True),
+    ("routes.txt", "parse_routes", "routes", True),
+    ("trips.txt", "parse_trips", "trips", True),
+    ("stop_times.txt", "parse_stop_times", "stop_times", True),
+    ("calendar.txt", "parse_calendar", "services", False),
+    ("calendar_dates.txt", "parse_calendar_dates", "service_exceptions", False),
+    ("fare_attributes.txt", "parse_fare_attributes", "fare_attributes", False),
+    ("fare_rules.txt", "parse_fare_rules", "fare_rules", False),
+    ("shapes.txt", "parse_shapes", "shapes", False),
+    ("frequencies.txt", "parse_frequencies", "frequencies", False),
+    ("transfers.txt", "parse_transfers", "transfers", False),
+    ("pathways.txt", "parse_pathways", "pathways", False),
+    ("levels.txt", "parse_levels", "levels", False),
+    ("feed_info.txt", "parse_feed_info", "feed_info", False),
+    ("translations.txt", "parse_translations", "translations", False),
+]
+
+def _parse_member(source, file_name, parser, attribute, byte_range=None):
+    """
+    _parse_member: parse a single member file, or a part of one, in a worker
+    process, returning the resulting models packed with pack_models
+
+    Arguments:
+    source: path to the zip file, or the contents of the member as bytes
+    file_name, parser, attribute: entry of GTFS_FILES to parse
+    byte_range: (start, end) tuple, if given, source is the path to the extracted
+    member and only the lines between these offsets are parsed
+    """
+    gtfs = GTFS()
+    if byte_range is not None:
+        start, end = byte_range
+        with open(source, "rb") as extracted:
+            header = extracted.readline()
+            extracted.seek(start)
+            getattr(gtfs, parser)(header + extracted.read(end - start))
+    elif isinstance(source, bytes):
+        getattr(gtfs, parser)(source)
+    else:
+        with zipfile.ZipFile(source) as zip_file, zip_file.open(file_name) as member:
+            getattr(gtfs, parser)(member)
+
+    models = getattr(gtfs, attribute)
+    if attribute == "feed_info":
+        models = [] if models is None else [models]
+    return pack_models(models)
+
+def _split_member(zip_file, file_name, temp_dir, chunk_size):
+    """
+    _split_member: extract a member to temp_dir and cut it into byte ranges of
+    about chunk_size bytes that start and end on a record boundary, returns the
+    path to the extracted file and the list of (start, end) tuples. A newline
+    only ends a record after an even number of quotes, so quoted values
+    spanning multiple lines stay in one range.
+    """
+    path = os.path.join(temp_dir, file_name)
+    with zip_file.open(file_name) as member, open(path, "wb") as extracted:
+        shutil.copyfileobj(member, extracted, 1024 * 1024)
+
+    size = os.path.getsize(path)
+    byte_ranges = []
+    with open(path, "rb") as extracted:
+        start = _record_end(extracted, 0)
+        while start < size:
+            end = min(_record_end(extracted, chunk_size), size)
+            byte_ranges.append((start, end))
+            start = end
+    return path, byte_ranges
+
+def _record_end(extracted, skip):
+    """
+    _record_end: offset of the end of the first record ending at least skip
+    bytes after the current position of a binary file that is on a record
+    boundary, the file is left at that offset
 
-from realtime_gtfs.exceptions import InvalidURLError
+    Arguments:
+    extracted: binary file
+    skip: number of bytes to pass before looking for the end of a record
+    """
+    # an escaped quote adds two quotes, so an odd count means inside a quoted value
+    quotes = extracted.read(skip).count(b'"')
+    line = extracted.readline()
+    quotes += line.count(b'"')
+    while line and quotes % 2:
+        line = extracted.readline()
+        quotes += line.count(b'"')
+    return extracted.tell()
+
+class LazyTable():
+    """
+    LazyTable: descriptor for a table of GTFS. If from_zip was called with
+    lazy=True, the member file of the table is parsed when the table is first
+    accessed, if that fails every access raises the error again. Assigning
+    the table cancels parsing its member, lists are turned into a TableList
+    so indexes notice changes.
+    """
+    def __init__(self):
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, gtfs, owner=None):
+        if gtfs is None:
+            return self
+        member = gtfs.lazy_members.pop(self.name, None)
+        if member is not None:
+            table = gtfs.loaded_tables[self.name]
+            try:
+                gtfs.parse_lazy_member(*member)
+            except Exception:
+                # drop the rows parsed before the error, the next access fails the same way
+                gtfs.lazy_members[self.name] = member
+                gtfs.loaded_tables[self.name] = None if table is None else type(table)()
+                raise
+        return gtfs.loaded_tables[self.name]
+
+    def __set__(self, gtfs, value):
+        gtfs.lazy_members.pop(self.name, None)
+        if isinstance(value, list) and not isinstance(value, TableList):
+            value = TableList(value)
+        gtfs.loaded_tables[self.name] = value
 
 class GTFS():
     """
     GTFS: main GTFS class
+
+    Arguments:
+    columnar: store stop_times and shapes in a StopTimeTable and ShapeTable
+    instead of a list, which uses a lot less memory for large feeds
     """
-    def __init__(self):
+    agencies = LazyTable()
+    stops = LazyTable()
+    routes = LazyTable()
+    trips = LazyTable()
+    stop_times = LazyTable()
+    services = LazyTable()
+    service_exceptions = LazyTable()
+    fare_attributes = LazyTable()
+    fare_rules = LazyTable()
+    shapes = LazyTable()
+    frequencies = LazyTable()
+    transfers = LazyTable()
+    pathways = LazyTable()
+    levels = LazyTable()
+    translations = LazyTable()
+    feed_info = LazyTable()
+
+    def __init__(self, columnar=False):
+        # tables by attribute, and the (file name, parse method) of the tables
+        # that are parsed from lazy_zip_file on first access
+        self.loaded_tables = {}
+        self.lazy_members = {}
+        self.lazy_zip_file = None
+        # name: (tables, versions of the tables, index), see index
+        self.indexes = {}
+        self.columnar = columnar
+        self.clear()
+        self.connection = None
+        self.zip_file = None
+        self.zip_file_url = ""
+
+    def clear(self):
+        """
+        clear: empty every table and forget the parsed feed, its pending lazy
+        members and the indexes built on it
+        """
+        self.loaded_tables.clear()
+        self.lazy_members.clear()
+        self.lazy_zip_file = None
+        self.indexes.clear()
         self.agencies = []
         self.stops = []
         self.routes = []
         self.trips = []
-        self.stop_times = []
+        self.stop_times = StopTimeTable() if self.columnar else []
         self.services = []
         self.service_exceptions = []
         self.fare_attributes = []
         self.fare_rules = []
-        self.shapes = []
+        self.shapes = ShapeTable() if self.columnar else []
         self.frequencies = []
         self.transfers = []
         self.pathways = []
         self.levels = []
         self.translations = []
         self.feed_info = None
-        self.connection = None
-        self.zip_file = None
-        self.zip_file_url = ""
+        # identifies the feed that was parsed, see snapshot.feed_hash
+        self.feed_hash = None
 
-    def write_to_db(self, url, hard_reset=False):
+    def write_to_db(self, url, hard_reset=False, diff=False, **options):
         """
         write_to_db: write GTFS data to database
 
         Arguments:
         url: URL for database connection
+        hard_reset: drop and recreate all tables first
+        diff: replace the stored feed by only writing the rows that changed,
+        see DatabaseConnection.update_gtfs
+        options: passed on to DatabaseConnection (batch_size, bulk_load,
+        defer_constraints, max_parallel_tables)
         """
-        db_con = DatabaseConnection(url)
+        db_con = DatabaseConnection(url, **options)
         if hard_reset:
             db_con.reset()
-        db_con.add_gtfs(self)
+        if diff:
+            db_con.update_gtfs(self)
+        else:
+            db_con.add_gtfs(self)
 
     # GTFS reading
-    def get_zip(self, url):
+    def get_zip(self, url, cache_dir=None, downloader=None):
         """
         get_zip: download zip from url, returns tempfile with zip
 
         Arguments:
         url: URL to static GTFS data
+        cache_dir: keep the download in this directory and only download it
+        again if it changed, see FeedCache
+        downloader: Downloader to download with (chunk size, retries, progress
+        callback), a default one if None
         """
-        if self.zip_file is None or url != self.zip_file_url:
-            response = requests.get(url)
+        if cache_dir is not None:
+            path, _ = FeedCache(cache_dir, downloader).fetch(url)
+            return zipfile.ZipFile(path)
 
-            if response.status_code != 200:
+        if self.zip_file is None or url != self.zip_file_url:
+            if downloader is None:
+                downloader = Downloader()
+            temp_zip_file = tempfile.TemporaryFile()
+            if downloader.download(url, temp_zip_file).status_code != 200:
+                temp_zip_file.close()
                 raise InvalidURLError(url)
 
-            temp_zip_file = tempfile.TemporaryFile()
-            for chunk in response.iter_content(chunk_size=128):
-                temp_zip_file.write(chunk)
             self.zip_file = zipfile.ZipFile(temp_zip_file)
             self.zip_file_url = url
 
         return self.zip_file
 
 
-    def from_url(self, url):
+    def from_url(self, url, workers=None, cache_dir=None, downloader=None):
         """
-        from_url: initialize a gtfs object from a URL.
+        from_url: initialize a gtfs object from a URL, replacing the feed it
+        holds. Returns whether the feed was parsed, which it is not if
+        cache_dir holds the same feed already and this instance parsed it before.
 
         Arguments:
         url: URL to static GTFS data
-        """
-        zip_file = self.get_zip(url)
-        self.from_zip(zip_file)
+        workers: number of processes to parse with, see from_zip
+        cache_dir: keep the download in this directory, if the feed did not
+        change since it was last fetched into the cache it is not downloaded
+        again, and only parsed from the cache if this instance holds another feed
+        downloader: Downloader to download with, see get_zip
+        """
+        if cache_dir is None:
+            zip_file = self.get_zip(url, downloader=downloader)
+        else:
+            path, changed = FeedCache(cache_dir, downloader).fetch(url)
+            zip_file = zipfile.ZipFile(path)
+            if not changed and self.feed_hash == feed_hash(zip_file):
+                zip_file.close()
+                return False
+        self.clear()
+        self.from_zip(zip_file, workers)
         zip_file.close()
+        return True
 
-    def from_zip(self, zip_file):
+    def from_zip(self, zip_file, workers=None, chunk_size=CHUNK_SIZE, lazy=False):
         """
-        from_zip: initialize a gtfs object from a zip file.
+        from_zip: initialize a gtfs object from a zip file. Every member is
+        parsed as a stream, so the decoded contents are never held in memory
+        as a whole.
 
         Arguments:
         zip_file: ZipFile containing the GTFS data
+        workers: if more than 1, parse the member files in a pool of this many processes
+        chunk_size: when parsing in a pool, members larger than this many bytes
+        are split into chunks which are parsed in parallel
+        lazy: only parse a member when its table is first accessed, zip_file
+        has to stay open until then, see load_all. Not thread safe, workers
+        is ignored.
+        """
+        self.feed_hash = feed_hash(zip_file)
+        names = zip_file.namelist()
+        members = [(file_name, parser, attribute)
+                   for file_name, parser, attribute, required in GTFS_FILES
+                   if required or file_name in names]
+
+        if lazy:
+            for file_name, parser, attribute in members:
+                zip_file.getinfo(file_name)
+                self.lazy_members[attribute] = (file_name, parser)
+            self.lazy_zip_file = zip_file
+        elif workers is None or workers <= 1:
+            for file_name, parser, _ in members:
+                with zip_file.open(file_name) as member:
+                    getattr(self, parser)(member)
+        else:
+            self._parse_parallel(zip_file, members, workers, chunk_size)
+
+    def parse_lazy_member(self, file_name, parser):
+        """
+        parse_lazy_member: parse a member of the zip passed to from_zip with
+        lazy=True, the zip is let go once every member is parsed
+
+        Arguments:
+        file_name, parser: entry of GTFS_FILES to parse
         """
-        self.parse_agencies(zip_file.read("agency.txt"))
-        self.parse_stops(zip_file.read("stops.txt"))
-        self.parse_routes(zip_file.read("routes.txt"))
-        self.parse_trips(zip_file.read("trips.txt"))
-        self.parse_stop_times(zip_file.read("stop_times.txt"))
-        if "calendar.txt" in zip_file.namelist():
-            self.parse_calendar(zip_file.read("calendar.txt"))
-        if "calendar_dates.txt" in zip_file.namelist():
-            self.parse_calendar_dates(zip_file.read("calendar_dates.txt"))
-        if "fare_attributes.txt" in zip_file.namelist():
-            self.parse_fare_attributes(zip_file.read("fare_attributes.txt"))
-        if "fare_rules.txt" in zip_file.namelist():
-            self.parse_fare_rules(zip_file.read("fare_rules.txt"))
-        if "shapes.txt" in zip_file.namelist():
-            self.parse_shapes(zip_file.read("shapes.txt"))
-        if "frequencies.txt" in zip_file.namelist():
-            self.parse_frequencies(zip_file.read("frequencies.txt"))
-        if "transfers.txt" in zip_file.namelist():
-            self.parse_transfers(zip_file.read("transfers.txt"))
-        if "pathways.txt" in zip_file.namelist():
-            self.parse_pathways(zip_file.read("pathways.txt"))
-        if "levels.txt" in zip_file.namelist():
-            self.parse_levels(zip_file.read("levels.txt"))
-        if "feed_info.txt" in zip_file.namelist():
-            self.parse_feed_info(zip_file.read("feed_info.txt"))
-        if "translations.txt" in zip_file.namelist():
-            self.parse_translations(zip_file.read("translations.txt"))
+        with self.lazy_zip_file.open(file_name) as member:
+            getattr(self, parser)(member)
+        if not self.lazy_members:
+            self.lazy_zip_file = None
+
+    def load_all(self):
+        """
+        load_all: parse every member that was not parsed yet after from_zip
+        with lazy=True, after which the zip file can be closed
+        """
+        for attribute in list(self.lazy_members):
+            getattr(self, attribute)
+
+    def save_snapshot(self, path):
+        """
+        save_snapshot: write all tables to a binary snapshot, which load_snapshot
+        reads a lot faster than the feed can be parsed. The snapshot is keyed on
+        the hash of the feed that was parsed.
+
+        Arguments:
+        path: path of the snapshot, replaced atomically
+        """
+        write_snapshot(self, path)
+
+    def index(self, name):
+        """
+        index: one of the INDEXES as a dict, built on first use and rebuilt
+        after its table was replaced or changed
+
+        Arguments:
+        name: name of the index, e.g. "stop_by_id"
+        """
+        attribute, key, sort_field, unique = INDEXES[name]
+        table = getattr(self, attribute)
+        return self._cached(name, [table],
+                            lambda: build_index(table, key, sort_field, unique))
+
+    def _cached(self, name, tables, build):
+        """
+        _cached: the result of build(), kept in self.indexes under name until
+        one of tables is replaced or changed
+        """
+        versions = [table_version(table) for table in tables]
+        built = self.indexes.get(name)
+        if (built is None or built[1] != versions or
+                any(old is not new for old, new in zip(built[0], tables))):
+            built = (tables, versions, build())
+            self.indexes[name] = built
+        return built[2]
+
+    def service_calendar(self):
+        """
+        service_calendar: ServiceCalendar of services and service_exceptions,
+        rebuilt after either changed
+        """
+        services, exceptions = self.services, self.service_exceptions
+        return self._cached("service_calendar", [services, exceptions],
+                            lambda: ServiceCalendar(services, exceptions))
+
+    def trips_on_date(self, date):
+        """
+        trips_on_date: list of the Trips running on a date
+
+        Arguments:
+        date: datetime.date or GTFS date string
+        """
+        active = self.service_calendar().active_services(date)
+        return [trip for trip in self.trips if trip.service_id in active]
+
+    def stop_by_id(self, stop_id):
+        """
+        stop_by_id: the Stop with stop_id, None if there is none
+        """
+        return self.index("stop_by_id").get(stop_id)
+
+    def trip_by_id(self, trip_id):
+        """
+        trip_by_id: the Trip with trip_id, None if there is none
+        """
+        return self.index("trip_by_id").get(trip_id)
+
+    def route_by_id(self, route_id):
+        """
+        route_by_id: the Route with route_id, None if there is none
+        """
+        return self.index("route_by_id").get(route_id)
+
+    def stop_times_by_trip(self, trip_id):
+        """
+        stop_times_by_trip: tuple of the StopTimes of a trip, by stop_sequence
+        """
+        return self.index("stop_times_by_trip").get(trip_id, ())
+
+    def stop_times_by_stop(self, stop_id):
+        """
+        stop_times_by_stop: tuple of the StopTimes at a stop
+        """
+        return self.index("stop_times_by_stop").get(stop_id, ())
+
+    def trips_by_route(self, route_id):
+        """
+        trips_by_route: tuple of the Trips of a route
+        """
+        return self.index("trips_by_route").get(route_id, ())
+
+    def shape_points_by_shape(self, shape_id):
+        """
+        shape_points_by_shape: tuple of the Shape points of a shape, by shape_pt_sequence
+        """
+        return self.index("shape_points_by_shape").get(shape_id, ())
+
+    def frequencies_by_trip(self, trip_id):
+        """
+        frequencies_by_trip: tuple of the Frequencies of a trip
+        """
+        return self.index("frequencies_by_trip").get(trip_id, ())
+
+    def stop_index(self):
+        """
+        stop_index: StopIndex over the coordinates of the stops, rebuilt after they changed
+        """
+        stops = self.stops
+        return self._cached("stop_index", [stops], lambda: StopIndex(stops))
+
+    def nearest_stops(self, lat, lon, k=1):
+        """
+        nearest_stops: list of (distance in meters, Stop) of the k stops
+        nearest to a point, see StopIndex.nearest_stops
+        """
+        return self.stop_index().nearest_stops(lat, lon, k)
+
+    def stops_within(self, lat, lon, radius_m):
+        """
+        stops_within: list of (distance in meters, Stop) of the stops within
+        radius_m meters of a point, see StopIndex.stops_within
+        """
+        return self.stop_index().stops_within(lat, lon, radius_m)
+
+    def stops_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        stops_in_bbox: list of the Stops inside a bounding box, see StopIndex.stops_in_bbox
+        """
+        return self.stop_index().stops_in_bbox(min_lat, min_lon, max_lat, max_lon)
+
+    def departure_board(self):
+        """
+        departure_board: DepartureBoard of all stops, rebuilt after the trips,
+        stop_times, frequencies or services changed
+        """
+        tables = [self.trips, self.stop_times, self.frequencies, self.services,
+                  self.service_exceptions]
+        return self._cached("departure_board", tables, lambda: DepartureBoard(
+            self.trips, self.index("stop_times_by_trip"), self.index("frequencies_by_trip"),
+            self.service_calendar()))
+
+    def next_departures(self, stop_id, time, date, count=10):
+        """
+        next_departures: list of the first `count` Departures from a stop at or
+        after a time on a date, see DepartureBoard.next_departures
+
+        Arguments:
+        stop_id: id of the stop
+        time: seconds since noon minus 12h of the date, or a GTFS time string
+        date: datetime.date or GTFS date string
+        count: maximum number of departures
+        """
+        return self.departure_board().next_departures(stop_id, time, date, count)
+
+    def planner(self):
+        """
+        planner: Planner over all trips, rebuilt after the trips, stop_times,
+        frequencies, transfers or services changed
+        """
+        tables = [self.trips, self.stop_times, self.frequencies, self.transfers, self.services,
+                  self.service_exceptions]
+        return self._cached("planner", tables, lambda: Planner(
+            self.trips, self.index("stop_times_by_trip"), self.index("frequencies_by_trip"),
+            self.transfers, self.service_calendar()))
+
+    def plan(self, from_stop, to_stop, departure_time, date):
+        """
+        plan: list of the Legs of the journey arriving first at to_stop when
+        leaving from_stop at or after departure_time on a date, see Planner.plan
+
+        Arguments:
+        from_stop: stop_id to leave from
+        to_stop: stop_id to arrive at
+        departure_time: seconds since noon minus 12h of the date, or a GTFS time string
+        date: datetime.date or GTFS date string
+        """
+        return self.planner().plan(from_stop, to_stop, departure_time, date)
+
+    def save_feed_store(self, path):
+        """
+        save_feed_store: write all tables to a read-only feed store, which
+        FeedStore memory maps so many processes can share one copy of the feed
+
+        Arguments:
+        path: path of the feed store, replaced atomically
+        """
+        write_feed_store(self, path)
+
+    def load_snapshot(self, path, zip_file=None, workers=None):
+        """
+        load_snapshot: initialize a gtfs object from a snapshot written by
+        save_snapshot, returns whether the snapshot was used. If zip_file is
+        given, the snapshot is only used if it holds that feed and was written
+        by this version of the format, otherwise zip_file is parsed and the
+        snapshot rewritten. Without zip_file, SnapshotError is raised instead.
+
+        Arguments:
+        path: path of the snapshot
+        zip_file: ZipFile containing the GTFS data the snapshot should hold
+        workers: number of processes to parse with, see from_zip
+        """
+        expected_hash = None if zip_file is None else feed_hash(zip_file)
+        try:
+            read_snapshot(self, path, expected_hash)
+            return True
+        except SnapshotError:
+            if zip_file is None:
+                raise
+        self.from_zip(zip_file, workers)
+        self.save_snapshot(path)
+        return False
+
+    def _parse_parallel(self, zip_file, members, workers, chunk_size):
+        """
+        _parse_parallel: parse the given members of zip_file in a process pool,
+        largest files first. Workers reopen the zip if it is a file on disk,
+        otherwise they are sent the contents of their member. Members larger
+        than chunk_size are extracted and parsed in chunks, which are
+        concatenated in order.
+        """
+        source = zip_file.filename
+        if not isinstance(source, str) or not os.path.isfile(source):
+            source = None
+
+        by_size = sorted(members, key=lambda member: zip_file.getinfo(member[0]).file_size,
+                         reverse=True)
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for file_name, parser, attribute in by_size:
+                if zip_file.getinfo(file_name).file_size > chunk_size:
+                    path, byte_ranges = _split_member(zip_file, file_name, temp_dir, chunk_size)
+                    futures[file_name] = [
+                        executor.submit(_parse_member, path, file_name, parser, attribute,
+                                        byte_range)
+                        for byte_range in byte_ranges
+                    ]
+                else:
+                    data = zip_file.read(file_name) if source is None else source
+                    futures[file_name] = [
+                        executor.submit(_parse_member, data, file_name, parser, attribute)
+                    ]
+
+            for file_name, _, attribute in members:
+                for future in futures[file_name]:
+                    models = unpack_models(future.result())
+                    if attribute == "feed_info":
+                        self.feed_info = models[0] if models else None
+                    else:
+                        getattr(self, attribute).extend(models)
 
     def parse_agencies(self, agencies):
         """
         parse_agencies: read agency.txt
 
         Arguments:
-        agencies: bytes-like object containing the contents of `agency.txt`
+        agencies: bytes-like object or binary file-like object containing the contents of
+        `agency.txt`
         """
-        agency_info = [line.strip().split(',') for line in
-                       str(agencies, "UTF-8").strip().split('\n')]
-        for line in agency_info[1:]:
-            self.agencies.append(Agency.from_gtfs(agency_info[0], line))
+        lines = read_csv(agencies)
+        decode = RowDecoder(Agency, next(lines, [])).decode
+        self.agencies.extend(decode(line) for line in lines)
 
     def parse_stops(self, stops):
         """
         parse_stops: read stops.txt
 
         Arguments:
-        stops: bytes-like object containing the contents of `stops.txt`
+        stops: bytes-like object or binary file-like object containing the contents of
+        `stops.txt`
         """
-        stop_info = [line.strip().split(',') for line in str(stops, "UTF-8").strip().split('\n')]
-        for line in stop_info[1:]:
-            self.stops.append(Stop.from_gtfs(stop_info[0], line))
+        lines = read_csv(stops)
+        decode = RowDecoder(Stop, next(lines, [])).decode
+        self.stops.extend(decode(line) for line in lines)
 
     def parse_routes(self, routes):
         """
         parse_routes: read routes.txt
 
         Arguments:
-        routes: bytes-like object containing the contents of `routes.txt`
+        routes: bytes-like object or binary file-like object containing the contents of
+        `routes.txt`
         """
-        stop_info = [line.strip().split(',') for line in str(routes, "UTF-8").strip().split('\n')]
-
-        for line in stop_info[1:]:
-            self.routes.append(Route.from_gtfs(stop_info[0], line))
+        lines = read_csv(routes)
+        decode = RowDecoder(Route, next(lines, [])).decode
+        self.routes.extend(decode(line) for line in lines)
 
     def parse_trips(self, trips):
         """
         parse_trips: read trips.txt
 
         Arguments:
-        trips: bytes-like object containing the contents of `trips.txt`
+        trips: bytes-like object or binary file-like object containing the contents of
+        `trips.txt`
         """
-        trip_info = [line.strip().split(',') for line in
-                     str(trips, "UTF-8").strip().split('\n')]
-
-        # ------ v UGLY FIX FOR NMBS DATA v ------
-
-        if "trip_type" in trip_info[0]:
-            index = trip_info[0].index("trip_type")
-            for line in trip_info:
-                del line[index]
-
-        # ------ ^ UGLY FIX FOR NMBS DATA ^ ------
-
-
-        for line in trip_info[1:]:
-            self.trips.append(Trip.from_gtfs(trip_info[0], line))
+        lines = read_csv(trips)
+        # NMBS adds a trip_type column that is not part of GTFS
+        decode = RowDecoder(Trip, next(lines, []), ignore=["trip_type"]).decode
+        self.trips.extend(decode(line) for line in lines)
 
     def parse_stop_times(self, stop_times):
         """
         parse_stop_times: read stop_times.txt
 
         Arguments:
-        stop_times: bytes-like object containing the contents of `stop_times.txt`
+        stop_times: bytes-like object or binary file-like object containing the contents of
+        `stop_times.txt`
         """
-        stop_time_info = [line.strip().split(',') for line in
-                          str(stop_times, "UTF-8").strip().split('\n')]
-        for line in stop_time_info[1:]:
-            self.stop_times.append(StopTime.from_gtfs(stop_time_info[0], line))
+        lines = read_csv(stop_times)
+        decode = RowDecoder(StopTime, next(lines, [])).decode
+        self.stop_times.extend(decode(line) for line in lines)
 
     def parse_calendar(self, calendar):
         """
         parse_calendar: read calendar.txt
 
         Arguments:
-        calendar: bytes-like object containing the contents of `calendar.txt`
+        calendar: bytes-like object or binary file-like object containing the contents of
+        `calendar.txt`
         """
-        calendar_info = [line.strip().split(',') for line in
-                         str(calendar, "UTF-8").strip().split('\n')]
-        for line in calendar_info[1:]:
-            self.services.append(Service.from_gtfs(calendar_info[0], line))
+        lines = read_csv(calendar)
+        decode = RowDecoder(Service, next(lines, [])).decode
+        self.services.extend(decode(line) for line in lines)
 
     def parse_calendar_dates(self, calendar_dates):
         """
         parse_calendar_dates: read calendar_dates.txt
 
         Arguments:
-        calendar_dates: bytes-like object containing the contents of `calendar_dates.txt`
+        calendar_dates: bytes-like object or binary file-like object containing the contents of
+        `calendar_dates.txt`
         """
-        calendar_dates_info = [
-            line.strip().split(',') for line in str(calendar_dates, "UTF-8").strip().split('\n')
-        ]
-        for line in calendar_dates_info[1:]:
-            self.service_exceptions.append(ServiceException.from_gtfs(calendar_dates_info[0], line))
+        lines = read_csv(calendar_dates)
+        decode = RowDecoder(ServiceException, next(lines, [])).decode
+        self.service_exceptions.extend(decode(line) for line in lines)
 
     def parse_fare_attributes(self, fare_attribute):
         """
         parse_fare_attributes: read fare_attributes.txt
 
         Arguments:
-        fare_attribute: bytes-like object containing the contents of `fare_attributes.txt`
+        fare_attribute: bytes-like object or binary file-like object containing the contents of
+        `fare_attributes.txt`
         """
-        fare_attribute_info = [
-            line.strip().split(',') for line in str(fare_attribute, "UTF-8").strip().split('\n')
-        ]
-        for line in fare_attribute_info[1:]:
-            self.fare_attributes.append(FareAttribute.from_gtfs(fare_attribute_info[0], line))
+        lines = read_csv(fare_attribute)
+        decode = RowDecoder(FareAttribute, next(lines, [])).decode
+        self.fare_attributes.extend(decode(line) for line in lines)
 
     def parse_fare_rules(self, fare_rule):
         """
         parse_fare_rules: read fare_rules.txt
 
         Arguments:
-        fare_rule: bytes-like object containing the contents of `fare_rules.txt`
+        fare_rule: bytes-like object or binary file-like object containing the contents of
+        `fare_rules.txt`
         """
-        fare_rule_info = [
-            line.strip().split(',') for line in str(fare_rule, "UTF-8").strip().split('\n')
-        ]
-        for line in fare_rule_info[1:]:
-            self.fare_rules.append(FareRule.from_gtfs(fare_rule_info[0], line))
+        lines = read_csv(fare_rule)
+        decode = RowDecoder(FareRule, next(lines, [])).decode
+        self.fare_rules.extend(decode(line) for line in lines)
 
     def parse_shapes(self, shape):
         """
         parse_shapes: read shapes.txt
 
         Arguments:
-        shape: bytes-like object containing the contents of `shapes.txt`
+        shape: bytes-like object or binary file-like object containing the contents of
+        `shapes.txt`
         """
-        shape_info = [
-            line.strip().split(',') for line in str(shape, "UTF-8").strip().split('\n')
-        ]
-        for line in shape_info[1:]:
-            self.shapes.append(Shape.from_gtfs(shape_info[0], line))
+        lines = read_csv(shape)
+        decode = RowDecoder(Shape, next(lines, [])).decode
+        self.shapes.extend(decode(line) for line in lines)
 
     def parse_frequencies(self, freqency):
         """
         parse_frequencies: read frequencies.txt
 
         Arguments:
-        freqency: bytes-like object containing the contents of `frequencies.txt`
+        freqency: bytes-like object or binary file-like object containing the contents of
+        `frequencies.txt`
         """
-        freqency_info = [
-            line.strip().split(',') for line in str(freqency, "UTF-8").strip().split('\n')
-        ]
-        for line in freqency_info[1:]:
-            self.frequencies.append(Frequency.from_gtfs(freqency_info[0], line))
+        lines = read_csv(freqency)
+        decode = RowDecoder(Frequency, next(lines, [])).decode
+        self.frequencies.extend(decode(line) for line in lines)
 
     def parse_transfers(self, transfer):
         """
         parse_transfers: read transfers.txt
 
         Arguments:
-        transfer: bytes-like object containing the contents of `transfers.txt`
+        transfer: bytes-like object or binary file-like object containing the contents of
+        `transfers.txt`
         """
-        transfer_info = [
-            line.strip().split(',') for line in str(transfer, "UTF-8").strip().split('\n')
-        ]
-        for line in transfer_info[1:]:
-            self.transfers.append(Transfer.from_gtfs(transfer_info[0], line))
+        lines = read_csv(transfer)
+        decode = RowDecoder(Transfer, next(lines, [])).decode
+        self.transfers.extend(decode(line) for line in lines)
 
     def parse_pathways(self, pathway):
         """
         parse_pathways: read pathways.txt
 
         Arguments:
-        pathway: bytes-like object containing the contents of `pathways.txt`
+        pathway: bytes-like object or binary file-like object containing the contents of
+        `pathways.txt`
         """
-        pathway_info = [
-            line.strip().split(',') for line in str(pathway, "UTF-8").strip().split('\n')
-        ]
-        for line in pathway_info[1:]:
-            self.pathways.append(Pathway.from_gtfs(pathway_info[0], line))
+        lines = read_csv(pathway)
+        decode = RowDecoder(Pathway, next(lines, [])).decode
+        self.pathways.extend(decode(line) for line in lines)
 
     def parse_levels(self, level):
         """
         parse_levels: read levels.txt
 
         Arguments:
-        level: bytes-like object containing the contents of `levels.txt`
+        level: bytes-like object or binary file-like object containing the contents of
+        `levels.txt`
         """
-        level_info = [
-            line.strip().split(',') for line in str(level, "UTF-8").strip().split('\n')
-        ]
-        for line in level_info[1:]:
-            self.levels.append(Level.from_gtfs(level_info[0], line))
+        lines = read_csv(level)
+        decode = RowDecoder(Level, next(lines, [])).decode
+        self.levels.extend(decode(line) for line in lines)
 
     def parse_feed_info(self, feed_info):
         """
         parse_feed_info: read feed_info.txt
 
         Arguments:
-        feed_info: bytes-like object containing the contents of `feed_info.txt`
+        feed_info: bytes-like object or binary file-like object containing the contents of
+        `feed_info.txt`
         """
-        feed_info_info = [
-            line.strip().split(',') for line in str(feed_info, "UTF-8").strip().split('\n')
-        ]
-        self.feed_info = FeedInfo.from_gtfs(feed_info_info[0], feed_info_info[1])
+        lines = read_csv(feed_info)
+        decode = RowDecoder(FeedInfo, next(lines, [])).decode
+        self.feed_info = decode(next(lines, []))
 
     def parse_translations(self, translation):
         """
         parse_translations: read translations.txt
 
         Arguments:
-        translation: bytes-like object containing the contents of `translations.txt`
+        translation: bytes-like object or binary file-like object containing the contents of
+        `translations.txt`
         """
-        translation_info = [
-            line.strip().split(',') for line in str(translation, "UTF-8").strip().split('\n')
-        ]
+        lines = read_csv(translation)
+        header = next(lines, [])
 
         # ------ v UGLY FIX FOR NMBS DATA v ------
 
         # They just use their own standard, because who needs standarization anyway?
-        if "trans_id" in translation_info[0]:
-            for nmbs_line in translation_info[1:]:
+        if "trans_id" in header:
+            for nmbs_line in lines:
                 translation_stops_dict = {
                     "table_name": "stops", # One for stops
                     "field_name": "stop_name",
@@ -354,5 +824,5 @@ class GTFS():
 
         # ------ ^ UGLY FIX FOR NMBS DATA ^ ------
         else:
-            for line in translation_info[1:]:
-                self.translations.append(Translation.from_gtfs(translation_info[0], line))
+            decode = RowDecoder(Translation, header).decode
+            self.translations.extend(decode(line) for line in lines)
@@ -0,0 +1,83 @@
+"""
+indexes.py: hash indexes on the tables of a GTFS instance, rebuilt when their table changes
+"""
+
+from operator import attrgetter
+
+from realtime_gtfs.columnar import ColumnarTable
+
+# name: (table attribute, key field, field the rows of a key are sorted by,
+# True if a key has a single row)
+INDEXES = {
+    "stop_by_id": ("stops", "stop_id", None, True),
+    "trip_by_id": ("trips", "trip_id", None, True),
+    "route_by_id": ("routes", "route_id", None, True),
+    "stop_times_by_trip": ("stop_times", "trip_id", "stop_sequence", False),
+    "stop_times_by_stop": ("stop_times", "stop_id", None, False),
+    "trips_by_route": ("trips", "route_id", None, False),
+    "shape_points_by_shape": ("shapes", "shape_id", "shape_pt_sequence", False),
+    "frequencies_by_trip": ("frequencies", "trip_id", None, False),
+}
+
+def _mutating(method_name):
+    """
+    _mutating: method of list that also counts a change of the TableList
+    """
+    method = getattr(list, method_name)
+    def wrapper(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method_name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+class TableList(list):
+    """
+    TableList: list holding a table, counting changes in `version` so indexes
+    can tell they are stale. Models that are changed in place are not noticed.
+    """
+    version = 0
+
+    append = _mutating("append")
+    extend = _mutating("extend")
+    insert = _mutating("insert")
+    pop = _mutating("pop")
+    remove = _mutating("remove")
+    clear = _mutating("clear")
+    sort = _mutating("sort")
+    reverse = _mutating("reverse")
+    __setitem__ = _mutating("__setitem__")
+    __delitem__ = _mutating("__delitem__")
+    __iadd__ = _mutating("__iadd__")
+    __imul__ = _mutating("__imul__")
+
+def table_version(table):
+    """
+    table_version: number of changes made to a TableList or ColumnarTable
+    """
+    return getattr(table, "version", None)
+
+def build_index(table, key, sort_field=None, unique=False):
+    """
+    build_index: dict mapping the values of `key` to the row holding it if
+    unique, otherwise to a tuple of all rows holding it, in table order or
+    sorted by `sort_field`
+
+    Arguments:
+    table: list of models or ColumnarTable
+    key: name of the field to index
+    sort_field: name of the field the rows of a key are sorted by
+    unique: map every key to a single row, the last one holding it
+    """
+    rows = table.to_models() if isinstance(table, ColumnarTable) else table
+    get_key = attrgetter(key)
+    if unique:
+        return {get_key(row): row for row in rows}
+    groups = {}
+    for row in rows:
+        groups.setdefault(get_key(row), []).append(row)
+    if sort_field is not None:
+        get_sort = attrgetter(sort_field)
+        for group in groups.values():
+            group.sort(key=get_sort)
+    return {value: tuple(group) for value, group in groups.items()}
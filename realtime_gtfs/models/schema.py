@@ -0,0 +1,383 @@
+"""
+schema.py: declarative field schema shared by all models, from which parsing,
+verification, serialisation and the database tables are derived
+"""
+
+import functools
+
+import pytz
+
+import sqlalchemy as sa
+
+from realtime_gtfs.exceptions import InvalidKeyError, MissingKeyError, InvalidValueError
+
+# a feed holds few distinct times, each is only parsed once
+@functools.lru_cache(maxsize=None)
+def parse_time(value):
+    """
+    parse_time: a GTFS time (H:MM:SS) as seconds since noon minus 12h of the
+    service day, hours past 23 are kept for trips running past midnight
+    """
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+def format_time(seconds):
+    """
+    format_time: seconds since noon minus 12h as a GTFS time (HH:MM:SS)
+    """
+    return f"{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+
+SQL_TYPES = {
+    str: lambda: sa.String(length=255),
+    int: sa.Integer,
+    float: sa.Float,
+    parse_time: sa.Integer,
+}
+
+def is_timezone(value):
+    """
+    is_timezone: check if `value` is a known timezone
+    """
+    try:
+        pytz.timezone(value)
+    except pytz.exceptions.UnknownTimeZoneError:
+        return False
+    return True
+
+def is_color(value):
+    """
+    is_color: check if `value` is a color as six hexadecimal digits
+    """
+    try:
+        int(value, 16)
+    except ValueError:
+        return False
+    return len(value) == 6
+
+def _compile(function_name, lines, namespace):
+    """
+    _compile: compile a function generated from a schema, like dataclasses does,
+    so the code running once per row does not have to loop over the fields
+
+    Arguments:
+    function_name: name of the function defined in `lines`
+    lines: source code of the function
+    namespace: globals available to the function
+    """
+    exec("\n".join(lines), namespace) # pylint: disable=exec-used
+    return namespace[function_name]
+
+class Field():
+    """
+    Field: describes a single field of a model
+
+    Arguments:
+    name: name of the field, used for the GTFS column, attribute and database column
+    converter: function turning the value read from GTFS into the right type
+    default: value used when the field is not set
+    required: raise MissingKeyError when the field is not set
+    minimum, maximum: inclusive bounds for a set value, InvalidValueError otherwise
+    valid: container or predicate a set value has to satisfy, InvalidValueError otherwise
+    sql_type: SQLAlchemy type of the column, derived from converter by default
+    foreign_key: "table.column" the database column refers to
+    all other keyword arguments are passed to sqlalchemy.Column
+    """
+    __slots__ = ("name", "converter", "default", "required", "minimum", "maximum", "valid",
+                 "sql_type", "foreign_key", "column_options")
+
+    def __init__(self, name, converter=str, default=None, **options):
+        self.name = name
+        self.converter = converter
+        self.default = default
+        self.required = options.pop("required", False)
+        self.minimum = options.pop("minimum", None)
+        self.maximum = options.pop("maximum", None)
+        self.valid = options.pop("valid", None)
+        self.sql_type = options.pop("sql_type", None)
+        self.foreign_key = options.pop("foreign_key", None)
+        self.column_options = options
+
+    def invalid_condition(self, namespace):
+        """
+        invalid_condition: source code of a condition on `value` that holds if
+        a set value is invalid, None if every value is valid. Constants the
+        condition needs are added to namespace.
+        """
+        conditions = []
+        if self.minimum is not None:
+            namespace["minimum_" + self.name] = self.minimum
+            conditions.append(f"value < minimum_{self.name}")
+        if self.maximum is not None:
+            namespace["maximum_" + self.name] = self.maximum
+            conditions.append(f"value > maximum_{self.name}")
+        if self.valid is not None:
+            namespace["valid_" + self.name] = self.valid
+            if callable(self.valid):
+                conditions.append(f"not valid_{self.name}(value)")
+            else:
+                conditions.append(f"value not in valid_{self.name}")
+        return " or ".join(conditions) if conditions else None
+
+    def format(self, value):
+        """
+        format: a value of this field as the string a GTFS file holds
+        """
+        if value is None:
+            return ""
+        if self.converter is parse_time:
+            return format_time(value)
+        return str(value)
+
+    def create_column(self, suffix=""):
+        """
+        create_column: create the SQLAlchemy column for this field
+
+        Arguments:
+        suffix: appended to the name of the table the foreign key refers to
+        """
+        args = []
+        if self.foreign_key is not None:
+            table, column = self.foreign_key.split(".")
+            args.append(sa.ForeignKey(f"{table}{suffix}.{column}"))
+        sql_type = self.sql_type if self.sql_type is not None else SQL_TYPES[self.converter]()
+        return sa.Column(self.name, sql_type, *args, **self.column_options)
+
+class Model():
+    """
+    Model: base class for all models, subclasses list their fields in FIELDS,
+    declare the same names as annotations so static analysis knows the
+    attributes, list them in __slots__ and name their table in TABLE_NAME
+    """
+    __slots__ = ()
+    TABLE_NAME = None
+    FIELDS = []
+    FIELDS_BY_NAME = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = [field.name for field in cls.FIELDS]
+        if list(vars(cls).get("__annotations__", {})) != names:
+            raise TypeError(f"{cls.__name__}: the annotations do not match FIELDS")
+        cls.FIELDS_BY_NAME = {field.name: field for field in cls.FIELDS}
+        cls.row_decoder = (None, None)
+        cls.row_builders = {}
+
+        cls.__init__ = cls.compile_init()
+        cls.check_fields = cls.compile_check_fields()
+        cls.to_dict = cls.compile_to_dict()
+
+    @classmethod
+    def compile_init(cls):
+        """
+        compile_init: generate __init__, setting every field to its default
+        """
+        lines = ["def __init__(self):"]
+        lines += [f"    self.{field.name} = defaults[{index}]"
+                  for index, field in enumerate(cls.FIELDS)]
+        lines.append("    return None")
+        namespace = {"defaults": [field.default for field in cls.FIELDS]}
+        return _compile("__init__", lines, namespace)
+
+    @classmethod
+    def compile_to_dict(cls):
+        """
+        compile_to_dict: generate to_dict, returning the fields as a dict
+        """
+        lines = ["def to_dict(self):", "    return {"]
+        lines += [f"        {field.name!r}: self.{field.name}," for field in cls.FIELDS]
+        lines.append("    }")
+        return _compile("to_dict", lines, {})
+
+    @classmethod
+    def compile_check_fields(cls):
+        """
+        compile_check_fields: generate check_fields, which raises MissingKeyError
+        for the first required field that is not set and InvalidValueError for
+        the first set field with an invalid value
+        """
+        namespace = {"MissingKeyError": MissingKeyError, "InvalidValueError": InvalidValueError}
+        lines = ["def check_fields(self):"]
+        for field in cls.FIELDS:
+            if field.required:
+                lines.append(f"    if self.{field.name} is None:")
+                lines.append(f"        raise MissingKeyError({field.name!r})")
+        for field in cls.FIELDS:
+            condition = field.invalid_condition(namespace)
+            if condition is not None:
+                lines.append(f"    value = self.{field.name}")
+                lines.append(f"    if value is not None and ({condition}):")
+                lines.append(f"        raise InvalidValueError({field.name!r})")
+        lines.append("    return True")
+        return _compile("check_fields", lines, namespace)
+
+    @classmethod
+    def create_table(cls, meta, suffix=""):
+        """
+        Create the SQLAlchemy table
+
+        Arguments:
+        meta: the SQLAlchemy MetaData
+        suffix: appended to the name of the table and the tables it refers to
+        """
+        return sa.Table(cls.TABLE_NAME + suffix, meta,
+                        *[field.create_column(suffix) for field in cls.FIELDS])
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates an instance from a dict. Checks correctness after
+        creation.
+
+        Arguments:
+        data: dict containing the data
+        """
+        ret = cls()
+        for key, value in data.items():
+            ret.setkey(key, value)
+        ret.verify()
+        return ret
+
+    def to_dict(self):
+        """
+        to_dict: turn the class into a dict
+        """
+        return {field.name: getattr(self, field.name) for field in self.FIELDS}
+
+    def to_gtfs(self):
+        """
+        to_gtfs: the fields as the strings a GTFS file holds, e.g. times as HH:MM:SS
+        """
+        return {field.name: field.format(getattr(self, field.name)) for field in self.FIELDS}
+
+    @classmethod
+    def from_rows(cls, keys, rows):
+        """
+        from_rows: turn tuples of values that were already verified into a list
+        of instances, fields missing from keys are left unset. The function
+        doing this is compiled once per tuple of keys.
+
+        Arguments:
+        keys: tuple of field names
+        rows: iterable of tuples with a value for every key
+        """
+        builder = cls.row_builders.get(keys)
+        if builder is None:
+            lines = ["def build(rows):", "    models = []", "    append = models.append",
+                     "    for row in rows:", "        model = new(cls)"]
+            if keys:
+                lines.append(f"        {', '.join(keys)}, = row")
+            lines += [f"        model.{key} = {key}" for key in keys]
+            lines += ["        append(model)", "    return models"]
+            builder = _compile("build", lines, {"new": object.__new__, "cls": cls})
+            cls.row_builders[keys] = builder
+        return builder(rows)
+
+    @classmethod
+    def from_gtfs(cls, keys, data):
+        """
+        Creates an instance from a list of keys and a list of
+        corresponding values. Checks correctness after creation. The
+        RowDecoder for the keys is kept until different keys are passed.
+
+        Arguments:
+        keys: list of keys (strings)
+        data: list of values (strings)
+        """
+        header, decoder = cls.row_decoder
+        keys = tuple(keys)
+        if keys != header:
+            decoder = RowDecoder(cls, list(keys))
+            cls.row_decoder = (keys, decoder)
+        if not isinstance(data, list):
+            data = list(data)
+        return decoder.decode(data)
+
+    def verify(self):
+        """
+        Verify that all required fields are set and all set fields have valid
+        values, models extend this with their own rules
+        """
+        return self.check_fields()
+
+    def setkey(self, key, value):
+        """
+        Sets a class attribute depending on `key`, raising
+        InvalidKeyError if the key does not belong on the model
+
+        Arguments:
+        key, value: the key and value
+        """
+        if value == "":
+            return
+        field = self.FIELDS_BY_NAME.get(key)
+        if field is None:
+            raise InvalidKeyError(key)
+        setattr(self, key, field.converter(value))
+
+    def __repr__(self):
+        return str(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, type(self)):
+            return False
+        return all(getattr(self, field.name) == getattr(other, field.name)
+                   for field in self.FIELDS)
+
+class RowDecoder(): # pylint: disable=too-few-public-methods
+    """
+    RowDecoder: turns rows of a GTFS file into model instances. The header is
+    resolved once, into a function assigning every field straight from its
+    column, so decoding a row does not look up any keys.
+
+    A column that does not belong on the model raises InvalidKeyError as soon
+    as a row has a value for it, unless it is listed in `ignore`, in which case
+    it is dropped.
+
+    Arguments:
+    model: the Model subclass to create
+    header: list of column names
+    ignore: column names that are dropped without being checked
+    """
+    def __init__(self, model, header, ignore=()):
+        self.model = model
+        self.header = header
+        self.unknown = [key for key in header
+                        if key not in model.FIELDS_BY_NAME and key not in ignore]
+        self.decode = self.compile_decode()
+
+    def compile_decode(self):
+        """
+        compile_decode: generate decode(row), returning a verified instance of
+        the model. Rows shorter than the header are padded with empty values.
+        """
+        columns = {key: index for index, key in enumerate(self.header)}
+        namespace = {
+            "new": object.__new__,
+            "model": self.model,
+            "InvalidKeyError": InvalidKeyError,
+        }
+        lines = [
+            "def decode(row):",
+            f"    if len(row) < {len(self.header)}:",
+            f"        row = row + [''] * ({len(self.header)} - len(row))",
+        ]
+        for key in self.unknown:
+            lines.append(f"    if row[{columns[key]}] != '':")
+            lines.append(f"        raise InvalidKeyError({key!r})")
+        lines.append("    ret = new(model)")
+        for field in self.model.FIELDS:
+            namespace["default_" + field.name] = field.default
+            if field.name not in columns:
+                lines.append(f"    ret.{field.name} = default_{field.name}")
+                continue
+            lines.append(f"    value = row[{columns[field.name]}]")
+            if field.converter is str:
+                converted = "value"
+            else:
+                namespace["convert_" + field.name] = field.converter
+                converted = f"convert_{field.name}(value)"
+            lines.append(f"    ret.{field.name} = {converted} if value != '' "
+                         f"else default_{field.name}")
+        lines.append("    ret.verify()")
+        lines.append("    return ret")
+        return _compile("decode", lines, namespace)
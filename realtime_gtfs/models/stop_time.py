@@ -2,9 +2,9 @@
 stop_time.py: contains data relevant to stop_times.txt
 """
 
-import sqlalchemy as sa
+from realtime_gtfs.exceptions import MissingKeyError
 
-from realtime_gtfs.exceptions import InvalidKeyError, MissingKeyError, InvalidValueError
+from .schema import Field, Model, parse_time
 
 ENUM_PICKUP_TYPE = [
     "Regular pickup",
@@ -25,178 +25,46 @@ ENUM_TIMEPOINT_TYPE = [
     "Exact times"
 ]
 
-class StopTime():
+class StopTime(Model):
     """
     stop_time: class for stop_times
     """
-    def __init__(self):
-        self.trip_id = None
-        self.arrival_time = None
-        self.departure_time = None
-        self.stop_id = None
-        self.stop_sequence = None
-        self.stop_headsign = None
-        self.pickup_type = 0
-        self.drop_off_type = 0
-        self.shape_dist_traveled = None
-        self.timepoint = 1
-
-    @staticmethod
-    def create_table(meta):
-        """
-        Create the SQLAlchemy table
-        """
-        return sa.Table(
-            'stop_times', meta,
-            sa.Column('trip_id', sa.String(length=255), sa.ForeignKey("trips.trip_id"),
-                      nullable=False),
-            sa.Column('arrival_time', sa.String(length=255)),
-            sa.Column('departure_time', sa.String(length=255)),
-            sa.Column('stop_id', sa.String(length=255), sa.ForeignKey("stops.stop_id"),
-                      nullable=False),
-            sa.Column('stop_sequence', sa.Integer()),
-            sa.Column('stop_headsign', sa.String(length=255)),
-            sa.Column('pickup_type', sa.Integer()),
-            sa.Column('drop_off_type', sa.Integer()),
-            sa.Column('shape_dist_traveled', sa.Float()),
-            sa.Column('timepoint', sa.Integer()),
-        )
-
-    @staticmethod
-    def from_dict(data):
-        """
-        Creates a StopTime from a dict. Checks correctness after
-        creation.
-
-        Arguments:
-        data: dict containing the data
-        """
-        ret = StopTime()
-        for key, value in data.items():
-            ret.setkey(key, value)
-        ret.verify()
-        return ret
-
-    def to_dict(self):
-        """
-        to_dict: turn the class into a dict
-        """
-        ret = {}
-        ret["trip_id"] = self.trip_id
-        ret["arrival_time"] = self.arrival_time
-        ret["departure_time"] = self.departure_time
-        ret["stop_id"] = self.stop_id
-        ret["stop_sequence"] = self.stop_sequence
-        ret["stop_headsign"] = self.stop_headsign
-        ret["pickup_type"] = self.pickup_type
-        ret["drop_off_type"] = self.drop_off_type
-        ret["shape_dist_traveled"] = self.shape_dist_traveled
-        ret["timepoint"] = self.timepoint
-        return ret
-
-    @staticmethod
-    def from_gtfs(keys, data):
-        """
-        Creates an StopTime from a list of keys and a list of
-        corresponding values. Checks correctness after creation
-
-        Arguments:
-        keys: list of keys (strings)
-        data: list of values (strings)
-        """
-        ret = StopTime()
-        for key, value in zip(keys, data):
-            ret.setkey(key, value)
-        ret.verify()
-        return ret
+    TABLE_NAME = "stop_times"
+    FIELDS = [
+        Field("trip_id", required=True, foreign_key="trips.trip_id", nullable=False),
+        Field("arrival_time", parse_time, minimum=0),
+        Field("departure_time", parse_time, minimum=0),
+        Field("stop_id", required=True, foreign_key="stops.stop_id", nullable=False),
+        Field("stop_sequence", int, required=True, minimum=0),
+        Field("stop_headsign"),
+        Field("pickup_type", int, default=0, valid=range(len(ENUM_PICKUP_TYPE))),
+        Field("drop_off_type", int, default=0, valid=range(len(ENUM_DROP_OFF_TYPE))),
+        Field("shape_dist_traveled", float, minimum=0),
+        Field("timepoint", int, default=1, valid=range(len(ENUM_TIMEPOINT_TYPE))),
+    ]
+    trip_id: str
+    arrival_time: int
+    departure_time: int
+    stop_id: str
+    stop_sequence: int
+    stop_headsign: str
+    pickup_type: int
+    drop_off_type: int
+    shape_dist_traveled: float
+    timepoint: int
+    __slots__ = [field.name for field in FIELDS]
 
     def verify(self):
         """
-        Verify that the StopTime has at least the required keys, lat and lon are correct
+        Verify that the StopTime has at least the required keys and correct values
         """
-        # TODO: verify stop_id, trip_id, arrival_time and departure_time
-
-        if self.trip_id is None:
-            raise MissingKeyError("trip_id")
+        # TODO: verify stop_id and trip_id
+        self.check_fields()
 
         if self.arrival_time is None and self.departure_time is None:
-            raise MissingKeyError("arrival_time or departure_timee")
-
-        if self.stop_id is None:
-            raise MissingKeyError("stop_id")
-
-        if self.stop_sequence is None:
-            raise MissingKeyError("stop_sequence")
-
-        if self.stop_sequence < 0:
-            raise InvalidValueError("stop_sequence")
-
-        if self.pickup_type < 0 or self.pickup_type >= len(ENUM_PICKUP_TYPE):
-            raise InvalidValueError("pickup_type")
-
-        if self.drop_off_type < 0 or self.drop_off_type >= len(ENUM_DROP_OFF_TYPE):
-            raise InvalidValueError("drop_off_type")
-
-        if self.shape_dist_traveled is not None and self.shape_dist_traveled < 0:
-            raise InvalidValueError("shape_dist_traveled")
-
-        if self.timepoint < 0 or self.timepoint >= len(ENUM_TIMEPOINT_TYPE):
-            raise InvalidValueError("timepoint")
+            raise MissingKeyError("arrival_time or departure_time")
 
         return True
 
-    def setkey(self, key, value):
-        """
-        Sets a class attribute depending on `key`, raising
-        InvalidKeyError if the key does not belong on stop_time
-
-        Arguments:
-        key, value: the key and value
-        """
-        if value == "":
-            return
-
-        if key == "trip_id":
-            self.trip_id = value
-        elif key == "arrival_time":
-            self.arrival_time = value
-        elif key == "departure_time":
-            self.departure_time = value
-        elif key == "stop_id":
-            self.stop_id = value
-        elif key == "stop_sequence":
-            self.stop_sequence = int(value)
-        elif key == "stop_headsign":
-            self.stop_headsign = value
-        elif key == "pickup_type":
-            self.pickup_type = int(value)
-        elif key == "drop_off_type":
-            self.drop_off_type = int(value)
-        elif key == "shape_dist_traveled":
-            self.shape_dist_traveled = float(value)
-        elif key == "timepoint":
-            self.timepoint = int(value)
-        else:
-            raise InvalidKeyError(key)
-
-    def __repr__(self):
-        return str(self)
-
     def __str__(self):
         return f"[StopTime {self.trip_id} #{self.stop_sequence}]"
-
-    def __eq__(self, other):
-        if not isinstance(other, StopTime):
-            return False
-        return (
-            self.trip_id == other.trip_id and
-            self.arrival_time == other.arrival_time and
-            self.departure_time == other.departure_time and
-            self.stop_id == other.stop_id and
-            self.stop_sequence == other.stop_sequence and
-            self.stop_headsign == other.stop_headsign and
-            self.pickup_type == other.pickup_type and
-            self.drop_off_type == other.drop_off_type and
-            self.shape_dist_traveled == other.shape_dist_traveled and
-            self.timepoint == other.timepoint
-        )
@@ -0,0 +1,34 @@
+"""
+packing.py: compact representation of lists of model instances, used to ship
+parsed tables between processes
+"""
+
+from operator import attrgetter
+
+def pack_models(models):
+    """
+    pack_models: turn a list of instances of one model class into a tuple
+    (class, attribute names, list of value tuples), which pickles a lot
+    smaller and faster than the instances themselves
+
+    Arguments:
+    models: list of instances of a single model class
+    """
+    if not models:
+        return (None, (), [])
+    model_class = type(models[0])
+    keys = tuple(model_class.__slots__)
+    getter = attrgetter(*keys)
+    return (model_class, keys, [getter(model) for model in models])
+
+def unpack_models(packed):
+    """
+    unpack_models: turn the output of pack_models back into a list of instances
+
+    Arguments:
+    packed: tuple as returned by pack_models
+    """
+    model_class, keys, rows = packed
+    if model_class is None:
+        return []
+    return model_class.from_rows(keys, rows)
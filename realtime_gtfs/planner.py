@@ -0,0 +1,312 @@
+"""
+planner.py: earliest arrival journey planning with the Connection Scan Algorithm
+"""
+
+import collections
+import datetime
+from array import array
+from bisect import bisect_left
+
+from realtime_gtfs.departures import NO_PICKUP, SECONDS_PER_DAY, trip_run_offsets
+from realtime_gtfs.models.schema import parse_time
+from realtime_gtfs.service_calendar import parse_date
+
+# drop_off_type of a StopTime passengers can not alight at
+NO_DROP_OFF = 1
+# transfer_type of a Transfer that is not possible
+NO_TRANSFER = 3
+# number of service days whose connections are kept
+DAY_CACHE_SIZE = 8
+UNREACHED = 2 ** 31 - 1
+
+# A leg of a journey, trip_id is None for a transfer between stops. The times
+# are in seconds since noon minus 12h of the date of the query.
+Leg = collections.namedtuple("Leg", ["trip_id", "from_stop_id", "to_stop_id",
+                                     "departure_time", "arrival_time"])
+
+class Connections():
+    """
+    Connections: the connections of a service day, a vehicle leaving a stop
+    and arriving at the next, sorted by departure time and stored as parallel
+    arrays. Every run of a trip has its own index in `runs`.
+    """
+    def __init__(self):
+        self.departure_times = array("i")
+        self.arrival_times = array("i")
+        self.departure_stops = array("i")
+        self.arrival_stops = array("i")
+        self.runs = array("i")
+        # 1 if passengers can board at the departure / alight at the arrival stop
+        self.pickups = bytearray()
+        self.drop_offs = bytearray()
+
+    def append(self, connection, run):
+        """
+        append: add a (departure time, arrival time, departure stop, arrival
+        stop, pickup, drop off) tuple as a connection of run
+        """
+        departure_time, arrival_time, departure_stop, arrival_stop, pickup, drop_off = connection
+        self.departure_times.append(departure_time)
+        self.arrival_times.append(arrival_time)
+        self.departure_stops.append(departure_stop)
+        self.arrival_stops.append(arrival_stop)
+        self.runs.append(run)
+        self.pickups.append(pickup)
+        self.drop_offs.append(drop_off)
+
+    def __len__(self):
+        return len(self.departure_times)
+
+def _trip_connections(stop_times, stop_indexes):
+    """
+    _trip_connections: (departure time, arrival time, departure stop, arrival
+    stop, pickup, drop off) between consecutive timed stops of a trip, stops
+    without times are passed without stopping
+    """
+    timed = [(stop_time.arrival_time if stop_time.arrival_time is not None
+              else stop_time.departure_time,
+              stop_time.departure_time if stop_time.departure_time is not None
+              else stop_time.arrival_time, stop_time)
+             for stop_time in stop_times
+             if stop_time.arrival_time is not None or stop_time.departure_time is not None]
+    return [(departure, arrival, stop_indexes[start.stop_id], stop_indexes[end.stop_id],
+             start.pickup_type != NO_PICKUP, end.drop_off_type != NO_DROP_OFF)
+            for (_, departure, start), (arrival, _, end) in zip(timed, timed[1:])]
+
+class Planner():
+    """
+    Planner: earliest arrival journeys with the Connection Scan Algorithm. The
+    connections of all trips are sorted by departure time once, the ones of
+    a service day are picked from them on its first query. Transfers between
+    stops and minimum transfer times at a stop come from transfers.txt, a
+    change at a stop without one takes no time.
+
+    Arguments:
+    trips: list of Trip
+    stop_times_by_trip: dict of trip_id to the StopTimes of the trip, by stop_sequence
+    frequencies_by_trip: dict of trip_id to the Frequencies of the trip
+    transfers: list of Transfer
+    calendar: ServiceCalendar of the services of the trips
+    """
+    def __init__(self, trips, stop_times_by_trip, frequencies_by_trip, transfers, calendar):
+        self.calendar = calendar
+        self.stop_ids = []
+        self.stop_indexes = {}
+        for stop_times in stop_times_by_trip.values():
+            for stop_time in stop_times:
+                self._stop_index(stop_time.stop_id)
+
+        # trip_id and service index of every run of a trip
+        self.run_trips = []
+        service_ids = {}
+        run_services = array("i")
+        template = []
+        for trip in trips:
+            stop_times = stop_times_by_trip.get(trip.trip_id, ())
+            connections = _trip_connections(stop_times, self.stop_indexes)
+            if not connections:
+                continue
+            service = service_ids.setdefault(trip.service_id, len(service_ids))
+            for offset in trip_run_offsets(stop_times, frequencies_by_trip.get(trip.trip_id)):
+                run = len(self.run_trips)
+                self.run_trips.append(trip.trip_id)
+                run_services.append(service)
+                template += [(departure + offset, arrival + offset, start, end, pickup,
+                              drop_off, run)
+                             for departure, arrival, start, end, pickup, drop_off in connections]
+        # a connection departing and arriving at the same time comes before
+        # the next connection of its trip
+        template.sort(key=lambda connection: (connection[0], connection[1]))
+        self.template = Connections()
+        for connection in template:
+            self.template.append(connection[:6], connection[6])
+        self.service_ids = list(service_ids)
+        self.run_services = run_services
+        self.days = {}
+
+        # stop index: [(stop index, seconds)] of the stops reached on foot
+        self.footpaths = {}
+        # stop index: seconds needed to change trips at the stop, None if not possible
+        self.change_times = {}
+        for transfer in transfers:
+            if transfer.from_trip_id or transfer.to_trip_id or transfer.from_route_id or \
+                    transfer.to_route_id:
+                continue
+            seconds = None if transfer.transfer_type == NO_TRANSFER else \
+                transfer.min_transfer_time or 0
+            start = self._stop_index(transfer.from_stop_id)
+            if transfer.from_stop_id == transfer.to_stop_id:
+                self.change_times[start] = seconds
+            elif seconds is not None:
+                self.footpaths.setdefault(start, []).append(
+                    (self._stop_index(transfer.to_stop_id), seconds))
+
+    def _stop_index(self, stop_id):
+        index = self.stop_indexes.get(stop_id)
+        if index is None:
+            index = self.stop_indexes[stop_id] = len(self.stop_ids)
+            self.stop_ids.append(stop_id)
+        return index
+
+    def connections(self, date):
+        """
+        connections: Connections of the trips running on a date, and of the
+        trips of the day before still running after midnight, whose runs have
+        an index offset by the number of runs. Built on the first query of a
+        date, the last DAY_CACHE_SIZE dates are kept.
+
+        Arguments:
+        date: datetime.date or GTFS date string
+        """
+        date = parse_date(date)
+        day = self.days.get(date)
+        if day is not None:
+            return day
+        today = self._active(date)
+        yesterday = self._active(date - datetime.timedelta(days=1))
+        services, template = self.run_services, self.template
+        departures, arrivals, runs = template.departure_times, template.arrival_times, template.runs
+        rows = [(departures[index], arrivals[index], index, 0) for index in range(len(template))
+                if today[services[runs[index]]]]
+        rows += [(departures[index] - SECONDS_PER_DAY, arrivals[index] - SECONDS_PER_DAY,
+                  index, 1)
+                 for index in range(bisect_left(departures, SECONDS_PER_DAY), len(template))
+                 if yesterday[services[runs[index]]]]
+        # two sorted runs, merged by the sort in linear time
+        rows.sort()
+        day = Connections()
+        run_count = len(self.run_trips)
+        for departure, arrival, index, days_before in rows:
+            day.append((departure, arrival, template.departure_stops[index],
+                        template.arrival_stops[index], template.pickups[index],
+                        template.drop_offs[index]), runs[index] + days_before * run_count)
+        if len(self.days) >= DAY_CACHE_SIZE:
+            del self.days[next(iter(self.days))]
+        self.days[date] = day
+        return day
+
+    def _active(self, date):
+        """
+        _active: bytearray, 1 at the index of every service running on a date
+        """
+        running = self.calendar.active_services(date)
+        return bytearray(service_id in running for service_id in self.service_ids)
+
+    def plan(self, from_stop, to_stop, departure_time, date):
+        """
+        plan: list of the Legs of the journey arriving first at to_stop when
+        leaving from_stop at or after departure_time on a date, [] if both
+        stops are the same, None if to_stop can not be reached that day
+
+        Arguments:
+        from_stop: stop_id to leave from
+        to_stop: stop_id to arrive at
+        departure_time: seconds since noon minus 12h of the date, or a GTFS time string
+        date: datetime.date or GTFS date string
+        """
+        if isinstance(departure_time, str):
+            departure_time = parse_time(departure_time)
+        origin = self.stop_indexes.get(from_stop)
+        target = self.stop_indexes.get(to_stop)
+        if origin is None or target is None:
+            return None
+        if origin == target:
+            return []
+        day = self.connections(date)
+        reached = self._scan(day, origin, target, departure_time)
+        if reached is None:
+            return None
+        return self._journey(day, reached, origin, target, departure_time)
+
+    def _scan(self, day, origin, target, departure_time):
+        """
+        _scan: the Connection Scan, (arrival labels, boarding labels) with a
+        (time, how) tuple for every stop reached, None if target is not reached.
+        `how` is (boarding connection, alighting connection) for a trip and
+        (stop walked from, boarding connection, alighting connection) for a transfer.
+        """
+        count = len(self.stop_ids)
+        # earliest arrival, and earliest time a trip can be boarded, at every stop
+        arrivals = [UNREACHED] * count
+        ready = [UNREACHED] * count
+        arrival_via = [None] * count
+        ready_via = [None] * count
+        ready[origin] = departure_time
+        footpaths, change_times = self.footpaths, self.change_times
+        for stop, seconds in footpaths.get(origin, ()):
+            if departure_time + seconds < ready[stop]:
+                arrivals[stop] = ready[stop] = departure_time + seconds
+                arrival_via[stop] = ready_via[stop] = (origin, None, None)
+
+        departure_times, arrival_times = day.departure_times, day.arrival_times
+        departure_stops, arrival_stops = day.departure_stops, day.arrival_stops
+        runs, pickups, drop_offs = day.runs, day.pickups, day.drop_offs
+        # connection the run was boarded at, -1 if it was not
+        boarded = {}
+        for index in range(bisect_left(departure_times, departure_time), len(day)):
+            departure = departure_times[index]
+            if departure >= arrivals[target]:
+                break
+            run = runs[index]
+            board = boarded.get(run)
+            if board is None:
+                if not pickups[index] or ready[departure_stops[index]] > departure:
+                    continue
+                board = boarded[run] = index
+            if not drop_offs[index]:
+                continue
+            stop, arrival = arrival_stops[index], arrival_times[index]
+            if arrival < arrivals[stop]:
+                arrivals[stop] = arrival
+                arrival_via[stop] = (board, index)
+            change = change_times.get(stop, 0)
+            if change is not None and arrival + change < ready[stop]:
+                ready[stop] = arrival + change
+                ready_via[stop] = (board, index)
+            for other, seconds in footpaths.get(stop, ()):
+                if arrival + seconds < ready[other]:
+                    ready[other] = arrival + seconds
+                    ready_via[other] = (stop, board, index)
+                if arrival + seconds < arrivals[other]:
+                    arrivals[other] = arrival + seconds
+                    arrival_via[other] = (stop, board, index)
+        if arrival_via[target] is None:
+            return None
+        return arrival_via, ready_via
+
+    def _journey(self, day, reached, origin, target, departure_time):
+        """
+        _journey: the Legs leading to target, following the labels of _scan back to origin
+        """
+        arrival_via, ready_via = reached
+        legs = []
+        stop, via = target, arrival_via[target]
+        while stop != origin:
+            if len(via) == 3:
+                walked_from, board, alight = via
+                start = departure_time if board is None else day.arrival_times[alight]
+                legs.append(Leg(None, self.stop_ids[walked_from], self.stop_ids[stop],
+                                start, start + self._walk(walked_from, stop)))
+                if board is None:
+                    break
+                stop = walked_from
+            board, alight = via[-2:]
+            legs.append(Leg(self._trip_id(day.runs[board]),
+                            self.stop_ids[day.departure_stops[board]], self.stop_ids[stop],
+                            day.departure_times[board], day.arrival_times[alight]))
+            stop = day.departure_stops[board]
+            via = ready_via[stop]
+        legs.reverse()
+        return legs
+
+    def _walk(self, start, end):
+        """
+        _walk: seconds of the transfer from stop index start to end
+        """
+        return min(seconds for stop, seconds in self.footpaths[start] if stop == end)
+
+    def _trip_id(self, run):
+        """
+        _trip_id: trip_id of a run, of the day before if offset by the number of runs
+        """
+        return self.run_trips[run % len(self.run_trips)]
@@ -0,0 +1,122 @@
+"""
+service_calendar.py: the dates every service runs on, precomputed as one bitset per service
+"""
+
+import datetime
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# exception_type of a ServiceException
+SERVICE_ADDED = 1
+SERVICE_REMOVED = 2
+
+def parse_date(value):
+    """
+    parse_date: a GTFS date (YYYYMMDD string) or datetime.date as a date
+    """
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+def _repeat_week(week, days):
+    """
+    _repeat_week: bitset repeating a 7 bit weekly pattern for at least `days` bits
+    """
+    weeks = days // 7 + 1
+    # week * (1 + 2**7 + 2**14 + ...) places a copy of the pattern in every week
+    return week * (((1 << (7 * weeks)) - 1) // 127)
+
+class ServiceCalendar():
+    """
+    ServiceCalendar: the dates services run on. Bit i of the bitset of a
+    service is set if it runs on the i-th day of the feed's date range, the
+    weekday flags of calendar.txt are laid out a week at a time and the
+    exceptions of calendar_dates.txt set or clear single bits.
+
+    Arguments:
+    services: list of Service
+    service_exceptions: list of ServiceException
+    """
+    def __init__(self, services, service_exceptions):
+        ranges = [(parse_date(service.start_date).toordinal(),
+                   parse_date(service.end_date).toordinal(), service) for service in services]
+        exceptions = [(parse_date(exception.date).toordinal(), exception)
+                      for exception in service_exceptions]
+        days = [day for start, end, _ in ranges for day in (start, end)]
+        days += [day for day, _ in exceptions]
+        self.first_day = min(days, default=0)
+        self.last_day = max(days, default=-1)
+        self.bits = {}
+        # frozenset of the services active on a day, filled on first query
+        self.active_by_day = {}
+
+        length = self.last_day - self.first_day + 1
+        # day 1 of the proleptic Gregorian calendar is a monday
+        first_weekday = (self.first_day - 1) % 7
+        for start, end, service in ranges:
+            week = 0
+            for weekday, name in enumerate(WEEKDAYS):
+                if getattr(service, name):
+                    week |= 1 << ((weekday - first_weekday) % 7)
+            start -= self.first_day
+            end -= self.first_day
+            mask = ((1 << (end - start + 1)) - 1) << start if end >= start else 0
+            self.bits[service.service_id] = \
+                self.bits.get(service.service_id, 0) | (_repeat_week(week, length) & mask)
+
+        for day, exception in exceptions:
+            bit = 1 << (day - self.first_day)
+            bits = self.bits.get(exception.service_id, 0)
+            if exception.exception_type == SERVICE_ADDED:
+                bits |= bit
+            elif exception.exception_type == SERVICE_REMOVED:
+                bits &= ~bit
+            self.bits[exception.service_id] = bits
+
+    def _day(self, date):
+        """
+        _day: index of a date in the bitsets, None if it is outside the feed's range
+        """
+        day = parse_date(date).toordinal()
+        if not self.first_day <= day <= self.last_day:
+            return None
+        return day - self.first_day
+
+    def is_active(self, service_id, date):
+        """
+        is_active: whether a service runs on a date
+
+        Arguments:
+        service_id: id of the service
+        date: datetime.date or GTFS date string
+        """
+        day = self._day(date)
+        if day is None:
+            return False
+        return bool(self.bits.get(service_id, 0) >> day & 1)
+
+    def active_services(self, date):
+        """
+        active_services: frozenset of the ids of the services running on a
+        date, computed from the bitsets on the first query of a date
+
+        Arguments:
+        date: datetime.date or GTFS date string
+        """
+        day = self._day(date)
+        if day is None:
+            return frozenset()
+        active = self.active_by_day.get(day)
+        if active is None:
+            active = frozenset(service_id for service_id, bits in self.bits.items()
+                               if bits >> day & 1)
+            self.active_by_day[day] = active
+        return active
+
+    def dates(self, service_id):
+        """
+        dates: list of the dates a service runs on
+        """
+        bits = self.bits.get(service_id, 0)
+        return [datetime.date.fromordinal(self.first_day + day)
+                for day in range(bits.bit_length()) if bits >> day & 1]
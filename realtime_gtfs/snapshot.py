@@ -0,0 +1,120 @@
+"""
+snapshot.py: binary snapshots of parsed feeds, so a process can start without parsing the CSVs
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+
+from realtime_gtfs import models
+from realtime_gtfs.columnar import ColumnarTable, StopTimeTable, ShapeTable
+from realtime_gtfs.exceptions import SnapshotError
+from realtime_gtfs.packing import pack_models, unpack_models
+
+# Increase whenever the layout of the payload changes
+SNAPSHOT_VERSION = 2
+SNAPSHOT_MAGIC = b"RTGTFS\x00\x00"
+# magic, format version, feed hash (all zeros if unknown)
+HEADER = struct.Struct("<8sI32s")
+NO_HASH = bytes(32)
+
+# Attributes holding lists of models, the columnar ones are always stored as columns
+MODEL_ATTRIBUTES = ["agencies", "stops", "routes", "trips", "services", "service_exceptions",
+                    "fare_attributes", "fare_rules", "frequencies", "transfers", "pathways",
+                    "levels", "translations"]
+COLUMNAR_ATTRIBUTES = [("stop_times", StopTimeTable), ("shapes", ShapeTable)]
+
+def feed_hash(zip_file):
+    """
+    feed_hash: SHA-256 identifying the contents of a zipped feed, computed from
+    the name, size and CRC-32 of every member in the central directory, so the
+    members do not have to be read
+
+    Arguments:
+    zip_file: ZipFile containing the GTFS data
+    """
+    sha256 = hashlib.sha256()
+    for info in sorted(zip_file.infolist(), key=lambda info: info.filename):
+        sha256.update(f"{info.filename}\0{info.file_size}\0{info.CRC}\n".encode("utf-8"))
+    return sha256.digest()
+
+def _layout():
+    """
+    _layout: the fields of every stored model and columnar table, a snapshot
+    written with another layout can not be loaded
+    """
+    return {
+        "fields": {cls.__name__: tuple(cls.__slots__) for cls in _model_classes()},
+        "columns": {cls.__name__: tuple(cls.COLUMNS) for _, cls in COLUMNAR_ATTRIBUTES},
+    }
+
+def _model_classes():
+    """
+    _model_classes: every model class that can be stored in a snapshot
+    """
+    return [getattr(models, name) for name in models.__dict__
+            if isinstance(getattr(models, name), type)]
+
+def write_snapshot(gtfs, path):
+    """
+    write_snapshot: write the tables of a GTFS instance to a snapshot file,
+    replacing it atomically
+
+    Arguments:
+    gtfs: the GTFS instance
+    path: path of the snapshot
+    """
+    payload = {"layout": _layout()}
+    for attribute in MODEL_ATTRIBUTES:
+        payload[attribute] = pack_models(getattr(gtfs, attribute))
+    for attribute, table_class in COLUMNAR_ATTRIBUTES:
+        table = getattr(gtfs, attribute)
+        payload[attribute] = table if isinstance(table, ColumnarTable) else table_class(table)
+    payload["feed_info"] = pack_models([] if gtfs.feed_info is None else [gtfs.feed_info])
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp_file:
+        temp_file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                    gtfs.feed_hash or NO_HASH))
+        pickle.dump(payload, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file.name, path)
+
+def read_snapshot(gtfs, path, expected_hash=None):
+    """
+    read_snapshot: replace the tables of a GTFS instance by those in a snapshot
+    file. Raises SnapshotError, leaving gtfs untouched, if the file is missing,
+    was written by another format version or model layout, or does not hold
+    the expected feed. Snapshots are pickles, only read files you wrote.
+
+    Arguments:
+    gtfs: the GTFS instance
+    path: path of the snapshot
+    expected_hash: feed_hash of the feed the snapshot should hold, not checked if None
+    """
+    try:
+        with open(path, "rb") as snapshot_file:
+            magic, version, stored_hash = HEADER.unpack(snapshot_file.read(HEADER.size))
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"{path} has format version {version}")
+            if expected_hash is not None and stored_hash != expected_hash:
+                raise SnapshotError(f"{path} holds another feed")
+            try:
+                payload = pickle.load(snapshot_file)
+            except Exception as error: # pylint: disable=broad-except
+                # a damaged pickle raises about any exception, a missing class ImportError
+                raise SnapshotError(f"{path}: {error!r}") from error
+    except (OSError, struct.error) as error:
+        raise SnapshotError(f"{path}: {error}") from error
+    if not isinstance(payload, dict) or payload.get("layout") != _layout():
+        raise SnapshotError(f"{path} was written for other models")
+
+    for attribute in MODEL_ATTRIBUTES:
+        setattr(gtfs, attribute, unpack_models(payload[attribute]))
+    for attribute, _ in COLUMNAR_ATTRIBUTES:
+        table = payload[attribute]
+        setattr(gtfs, attribute, table if gtfs.columnar else table.to_models())
+    feed_info = unpack_models(payload["feed_info"])
+    gtfs.feed_info = feed_info[0] if feed_info else None
+    gtfs.feed_hash = None if stored_hash == NO_HASH else stored_hash
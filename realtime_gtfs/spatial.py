@@ -0,0 +1,201 @@
+"""
+spatial.py: grid index over stop coordinates for nearest stop, radius and bounding box queries
+"""
+
+import math
+from array import array
+
+# mean radius of the earth in meters
+EARTH_RADIUS = 6371008.8
+# number of stops a cell of the grid holds on average if cell_size is not given
+STOPS_PER_CELL = 4
+# slack in degrees added around the cells a query visits, against rounding errors
+MARGIN = 1e-9
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    haversine: great-circle distance in meters between two points in degrees
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    half_chord = (math.sin((lat2 - lat1) / 2) ** 2 +
+                  math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(half_chord)))
+
+def _lon_ranges(min_lon, max_lon):
+    """
+    _lon_ranges: list of (min, max) ranges within [-180, 180] covering the
+    longitudes from min_lon eastwards to max_lon, split at the antimeridian
+    """
+    width = max_lon - min_lon
+    if width >= 360:
+        return [(-180.0, 180.0)]
+    start = (min_lon + 180) % 360 - 180
+    if start + width <= 180:
+        return [(start, start + width)]
+    return [(start, 180.0), (-180.0, start + width - 360)]
+
+def _default_cell_size(lats, lons):
+    """
+    _default_cell_size: size in degrees of cells holding STOPS_PER_CELL stops
+    on average if the stops were spread evenly over their bounding box
+    """
+    if not lats:
+        return 1.0
+    area = max(max(lats) - min(lats), 1e-3) * max(max(lons) - min(lons), 1e-3)
+    return min(max(math.sqrt(area * STOPS_PER_CELL / len(lats)), 1e-4), 90.0)
+
+class StopIndex():
+    """
+    StopIndex: the stops with coordinates, bucketed in a grid of cells of
+    cell_size degrees of latitude and longitude. A query only computes the
+    haversine distance to the stops in the cells around the point, the
+    distances are exact, so are the results.
+
+    Arguments:
+    stops: list of Stop, stops without stop_lat or stop_lon are left out
+    cell_size: size of the cells in degrees, by default chosen from the
+    number of stops and the area they cover
+    """
+    def __init__(self, stops, cell_size=None):
+        self.stops = [stop for stop in stops
+                      if stop.stop_lat is not None and stop.stop_lon is not None]
+        self.lats = array("d", (stop.stop_lat for stop in self.stops))
+        self.lons = array("d", (stop.stop_lon for stop in self.stops))
+        self.cell_size = cell_size or _default_cell_size(self.lats, self.lons)
+        self.columns = math.ceil(360 / self.cell_size)
+        # the coordinates in radians and the cosine of the latitudes, used by every distance
+        self.lat_radians = array("d", map(math.radians, self.lats))
+        self.lon_radians = array("d", map(math.radians, self.lons))
+        self.cos_lats = array("d", map(math.cos, self.lat_radians))
+        # (row, column): list of the indexes of the stops in the cell
+        self.cells = {}
+        for index, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            self.cells.setdefault(self._cell(lat, lon), []).append(index)
+
+    def _row(self, lat):
+        return math.floor((lat + 90) / self.cell_size)
+
+    def _column(self, lon):
+        return min(math.floor((lon + 180) / self.cell_size), self.columns - 1)
+
+    def _cell(self, lat, lon):
+        return self._row(lat), self._column(lon)
+
+    def _candidates(self, min_lat, max_lat, lon_ranges):
+        """
+        _candidates: indexes of the stops in the cells overlapping a range of
+        latitudes and a list of ranges of longitudes
+        """
+        rows = range(self._row(max(min_lat - MARGIN, -90)),
+                     self._row(min(max_lat + MARGIN, 90)) + 1)
+        columns = {column for low, high in lon_ranges
+                   for column in range(self._column(max(low - MARGIN, -180)),
+                                       self._column(min(high + MARGIN, 180)) + 1)}
+        found = []
+        if len(rows) * len(columns) > len(self.cells):
+            # a large area, going over the occupied cells is quicker
+            for (row, column), cell in self.cells.items():
+                if row in rows and column in columns:
+                    found += cell
+            return found
+        cells = self.cells
+        for row in rows:
+            for column in columns:
+                cell = cells.get((row, column))
+                if cell is not None:
+                    found += cell
+        return found
+
+    def _distances(self, lat, lon, indexes):
+        """
+        _distances: list of (distance in meters, index) from a point to the stops at indexes
+        """
+        lat_radians, lon_radians = math.radians(lat), math.radians(lon)
+        cos_lat = math.cos(lat_radians)
+        lats, lons, cos_lats = self.lat_radians, self.lon_radians, self.cos_lats
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        found = []
+        for index in indexes:
+            half_chord = (sin((lats[index] - lat_radians) / 2) ** 2 + cos_lat *
+                          cos_lats[index] * sin((lons[index] - lon_radians) / 2) ** 2)
+            found.append((2 * EARTH_RADIUS * asin(min(1.0, sqrt(half_chord))), index))
+        return found
+
+    def _within(self, lat, lon, radius):
+        """
+        _within: list of (distance, index) of the stops within radius meters of a point
+        """
+        angle = radius / EARTH_RADIUS
+        delta = math.degrees(angle)
+        min_lat, max_lat = lat - delta, lat + delta
+        if min_lat <= -90 or max_lat >= 90 or angle >= math.pi / 2:
+            # the circle holds a pole, it covers every longitude
+            lon_ranges = [(-180.0, 180.0)]
+        else:
+            ratio = math.sin(angle) / math.cos(math.radians(lat))
+            if ratio >= 1:
+                lon_ranges = [(-180.0, 180.0)]
+            else:
+                delta_lon = math.degrees(math.asin(ratio))
+                lon_ranges = _lon_ranges(lon - delta_lon, lon + delta_lon)
+        candidates = self._candidates(min_lat, max_lat, lon_ranges)
+        return [(distance, index) for distance, index in self._distances(lat, lon, candidates)
+                if distance <= radius]
+
+    def stops_within(self, lat, lon, radius_m):
+        """
+        stops_within: list of (distance in meters, Stop) of all stops within
+        radius_m meters of a point, nearest first
+
+        Arguments:
+        lat: latitude of the point in degrees
+        lon: longitude of the point in degrees
+        radius_m: radius in meters
+        """
+        return [(distance, self.stops[index])
+                for distance, index in sorted(self._within(lat, lon, radius_m))]
+
+    def nearest_stops(self, lat, lon, k=1):
+        """
+        nearest_stops: list of (distance in meters, Stop) of the k stops
+        nearest to a point, nearest first. The radius searched starts at a
+        cell and doubles until it holds k stops.
+
+        Arguments:
+        lat: latitude of the point in degrees
+        lon: longitude of the point in degrees
+        k: number of stops
+        """
+        if k <= 0 or not self.stops:
+            return []
+        radius = self.cell_size * math.pi / 180 * EARTH_RADIUS
+        while True:
+            found = self._within(lat, lon, radius)
+            if len(found) >= k or radius >= math.pi * EARTH_RADIUS:
+                break
+            radius *= 2
+        return [(distance, self.stops[index]) for distance, index in sorted(found)[:k]]
+
+    def stops_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        stops_in_bbox: list of the Stops inside a bounding box, edges included,
+        in the order of the stops table. A box with min_lon > max_lon crosses
+        the antimeridian.
+
+        Arguments:
+        min_lat: southern edge in degrees
+        min_lon: western edge in degrees
+        max_lat: northern edge in degrees
+        max_lon: eastern edge in degrees
+        """
+        if min_lat > max_lat:
+            return []
+        if min_lon > max_lon:
+            lon_ranges = [(min_lon, 180.0), (-180.0, max_lon)]
+        else:
+            lon_ranges = [(min_lon, max_lon)]
+        lats, lons = self.lats, self.lons
+        found = [index for index in self._candidates(min_lat, max_lat, lon_ranges)
+                 if min_lat <= lats[index] <= max_lat and
+                 any(low <= lons[index] <= high for low, high in lon_ranges)]
+        return [self.stops[index] for index in sorted(found)]
@@ -0,0 +1,201 @@
+"""
+versions.py: load feeds into versioned tables and switch readers between them atomically
+"""
+
+import datetime
+
+import sqlalchemy
+
+from realtime_gtfs.database import DatabaseConnection, create_tables
+from realtime_gtfs.exceptions import VersionError
+
+# Number of versions kept for rollback by default, including the active one
+KEEP_VERSIONS = 3
+
+def version_suffix(version):
+    """
+    version_suffix: suffix of the tables of a version
+    """
+    return f"__v{version}"
+
+class FeedVersions:
+    """
+    FeedVersions: every feed is loaded into its own set of tables (stops__v1,
+    trips__v1, ...). Readers use views with the usual table names (stops,
+    trips, ...) that select from the tables of the active version, so they
+    never see a feed that is still loading. Activating a version only replaces
+    the views, in one transaction on SQLite and PostgreSQL and with a single
+    RENAME TABLE on MySQL, which does not depend on the size of the feed.
+
+    The views take the names of the tables add_gtfs writes, a database holds
+    either versioned feeds or a plain one.
+
+    Arguments:
+    url: URL for database connection
+    keep: number of versions kept for rollback, including the active one
+    options: passed on to DatabaseConnection for every load
+    """
+    def __init__(self, url, keep=KEEP_VERSIONS, **options):
+        self.url = url
+        self.keep = keep
+        self.options = options
+        self.engine = sqlalchemy.create_engine(url)
+        self.meta = sqlalchemy.MetaData()
+        self.versions_table = sqlalchemy.Table(
+            "feed_versions", self.meta,
+            sqlalchemy.Column("version", sqlalchemy.Integer, primary_key=True,
+                              autoincrement=False),
+            sqlalchemy.Column("loaded_at", sqlalchemy.String(length=32)),
+            sqlalchemy.Column("active", sqlalchemy.Boolean, nullable=False),
+        )
+        self.meta.create_all(self.engine)
+        self.view_names = [table.name for table in create_tables(sqlalchemy.MetaData()).values()]
+
+    def close(self):
+        """
+        close: close every pooled connection
+        """
+        self.engine.dispose()
+
+    def versions(self):
+        """
+        versions: all stored versions, oldest first
+        """
+        query = sqlalchemy.select([self.versions_table.c.version]) \
+            .order_by(self.versions_table.c.version)
+        return [version for version, in self.engine.execute(query)]
+
+    def active_version(self):
+        """
+        active_version: the version readers see, None before the first activation
+        """
+        query = sqlalchemy.select([self.versions_table.c.version]) \
+            .where(self.versions_table.c.active)
+        return self.engine.execute(query).scalar()
+
+    def load(self, gtfs, activate=True):
+        """
+        load: write a GTFS instance to the tables of a new version, returns the
+        version. The tables are dropped again if loading fails.
+
+        Arguments:
+        gtfs: the GTFS instance
+        activate: activate the new version and drop the versions that are no
+        longer kept
+        """
+        version = max(self.versions(), default=0) + 1
+        dbcon = DatabaseConnection(self.url, table_suffix=version_suffix(version),
+                                   **self.options)
+        loaded = False
+        try:
+            dbcon.add_gtfs(gtfs)
+            loaded = True
+        finally:
+            if not loaded:
+                dbcon.meta.drop_all()
+            dbcon.close()
+
+        self.engine.execute(sqlalchemy.sql.expression.insert(self.versions_table), {
+            "version": version,
+            "loaded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "active": False,
+        })
+        if activate:
+            self.activate(version)
+            self.prune()
+        return version
+
+    def activate(self, version):
+        """
+        activate: point the views readers use at the tables of a version
+
+        Arguments:
+        version: the version to activate
+        """
+        if version not in self.versions():
+            raise VersionError(str(version))
+        quote = self.engine.dialect.identifier_preparer.quote
+        views = [(name, name + version_suffix(version)) for name in self.view_names]
+        mark_active = f"UPDATE feed_versions SET active = (version = {int(version)})"
+
+        dialect = self.engine.dialect.name
+        if dialect == "mysql":
+            self._activate_mysql(views, mark_active)
+        elif dialect == "sqlite":
+            # pysqlite does not run DDL inside the transactions it starts itself
+            statements = ["BEGIN"]
+            for view, table in views:
+                statements.append(f"DROP VIEW IF EXISTS {quote(view)}")
+                statements.append(f"CREATE VIEW {quote(view)} AS SELECT * FROM {quote(table)}")
+            statements += [mark_active, "COMMIT"]
+            connection = self.engine.raw_connection()
+            try:
+                connection.executescript(";\n".join(statements) + ";")
+            finally:
+                connection.close()
+        else:
+            with self.engine.begin() as connection:
+                for view, table in views:
+                    connection.execute(f"CREATE OR REPLACE VIEW {quote(view)} AS "
+                                       f"SELECT * FROM {quote(table)}")
+                connection.execute(mark_active)
+
+    def _activate_mysql(self, views, mark_active):
+        """
+        _activate_mysql: MySQL commits after every DDL statement, the new views are
+        created under a temporary name and swapped in with a single RENAME TABLE
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        existing = set(sqlalchemy.inspect(self.engine).get_view_names())
+        with self.engine.connect() as connection:
+            renames = []
+            for view, table in views:
+                connection.execute(f"CREATE OR REPLACE VIEW {quote(view + '__next')} AS "
+                                   f"SELECT * FROM {quote(table)}")
+                if view in existing:
+                    renames.append(f"{quote(view)} TO {quote(view + '__old')}")
+                renames.append(f"{quote(view + '__next')} TO {quote(view)}")
+            connection.execute("RENAME TABLE " + ", ".join(renames))
+            for view, _ in views:
+                if view in existing:
+                    connection.execute(f"DROP VIEW {quote(view + '__old')}")
+            connection.execute(mark_active)
+
+    def rollback(self):
+        """
+        rollback: activate the newest version older than the active one, returns it
+        """
+        active = self.active_version()
+        older = [version for version in self.versions() if active is None or version < active]
+        if not older:
+            raise VersionError(f"no version before {active}")
+        self.activate(older[-1])
+        return older[-1]
+
+    def prune(self):
+        """
+        prune: drop the tables of all but the newest `keep` versions, the
+        active version is always kept
+        """
+        active = self.active_version()
+        versions = self.versions()
+        for version in versions[:max(len(versions) - self.keep, 0)]:
+            if version == active:
+                continue
+            self.drop(version)
+
+    def drop(self, version):
+        """
+        drop: drop the tables of a version that is not active
+
+        Arguments:
+        version: the version to drop
+        """
+        if version == self.active_version():
+            raise VersionError(f"{version} is active")
+        suffix = version_suffix(version)
+        meta = sqlalchemy.MetaData()
+        meta.reflect(self.engine, only=lambda name, _: name.endswith(suffix))
+        meta.drop_all(self.engine)
+        self.engine.execute(sqlalchemy.sql.expression.delete(self.versions_table)
+                            .where(self.versions_table.c.version == version))
@@ -1,8 +1,18 @@
 """
 conftest.py: set up pytest
 """
+import email.utils
+import gzip
+import hashlib
+import http.server
+import threading
+import time
+import zipfile
+
 import pytest
 
+from realtime_gtfs import GTFS
+
 def pytest_addoption(parser):
     """
     pytest_addoption: add options to pytest command line arguments
@@ -36,3 +46,139 @@ def pytest_collection_modifyitems(config, items):
         for item in items:
             if "integration" in item.keywords:
                 item.add_marker(skip_integration)
+
+class FeedRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    FeedRequestHandler: serves the feed of the server at any path except /missing.zip
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """
+        do_GET: answer a GET request, honouring conditional and Range headers if
+        the server does
+        """
+        feed = self.server.feed
+        feed.requests.append(dict(self.headers))
+        feed.clients.add(self.client_address)
+        if self.path == "/missing.zip":
+            self.send_error(404)
+            return
+        if "If-None-Match" in self.headers:
+            not_modified = self.headers["If-None-Match"] == feed.etag
+        else:
+            not_modified = self.headers.get("If-Modified-Since") == feed.last_modified
+        if feed.conditional and not_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        content = feed.content
+        encoded = feed.gzip == "always" or \
+            feed.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+        if encoded:
+            content = gzip.compress(content, mtime=0)
+        start = 0
+        byte_range = self.headers.get("Range", "")
+        if (feed.ranges and byte_range.startswith("bytes=") and
+                self.headers.get("If-Range", feed.etag) in (feed.etag, feed.last_modified)):
+            # a range of the encoded body
+            start = int(byte_range[len("bytes="):].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range",
+                             f"bytes {start}-{len(content) - 1}/{len(content)}")
+        else:
+            self.send_response(200)
+        body = content[start:]
+        self.send_header("Content-Length", str(len(body)))
+        if encoded:
+            self.send_header("Content-Encoding", "gzip")
+        if feed.conditional:
+            self.send_header("ETag", feed.etag)
+            self.send_header("Last-Modified", feed.last_modified)
+        self.end_headers()
+        if feed.drops > 0:
+            # send part of the body and hang up
+            feed.drops -= 1
+            self.wfile.write(body[:feed.drop_after])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        pass
+
+class FeedServer:
+    """
+    FeedServer: local HTTP server for one feed, in a thread
+
+    Arguments:
+    content: bytes of the feed
+    """
+    def __init__(self, content):
+        self.requests = []
+        self.clients = set()
+        self.conditional = True
+        self.ranges = True
+        # number of responses to drop after drop_after bytes of their body
+        self.drops = 0
+        self.drop_after = 0
+        # gzip the body if the request accepts it, or always if "always"
+        self.gzip = False
+        self.etag = None
+        self.last_modified = None
+        self.content = None
+        self.set_content(content)
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FeedRequestHandler)
+        self.httpd.feed = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def set_content(self, content):
+        """
+        set_content: serve new feed bytes, with a new ETag and Last-Modified
+        """
+        self.content = content
+        self.etag = '"' + hashlib.md5(content).hexdigest() + '"'
+        self.last_modified = email.utils.formatdate(time.time(), usegmt=True)
+
+    def url(self, path="/feed.zip"):
+        """
+        url: URL of a path on the server
+        """
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def close(self):
+        """
+        close: stop the server
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture(name="feed_server")
+def fixture_feed_server():
+    """
+    fixture_feed_server: FeedServer serving the sample feed
+    """
+    with open("./tests/static/sample-feed.zip", "rb") as feed_file:
+        server = FeedServer(feed_file.read())
+    yield server
+    server.close()
+
+@pytest.fixture(name="columnar_tables")
+def fixture_columnar_tables():
+    """
+    fixture_columnar_tables: whether the gtfs fixture stores stop_times and
+    shapes in columnar tables, test modules override it to run both ways
+    """
+    return False
+
+@pytest.fixture(name="gtfs")
+def fixture_gtfs(columnar_tables):
+    """
+    fixture_gtfs: the sample feed
+    """
+    gtfs = GTFS(columnar=columnar_tables)
+    with zipfile.ZipFile("./tests/static/sample-feed.zip") as zip_file:
+        gtfs.from_zip(zip_file)
+    return gtfs
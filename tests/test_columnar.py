@@ -0,0 +1,99 @@
+"""
+test_columnar.py: tests for realtime_gtfs/columnar.py
+"""
+
+import pickle
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.columnar import StringColumn, StopTimeTable, ShapeTable
+from realtime_gtfs.models import StopTime, Shape
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+FULL_STOP_TIME = StopTime.from_dict({
+    "trip_id": "123",
+    "arrival_time": "1:23:45",
+    "departure_time": "25:23:45",
+    "stop_id": "123",
+    "stop_sequence": "5",
+    "stop_headsign": "I'm a sign",
+    "pickup_type": "3",
+    "drop_off_type": "2",
+    "shape_dist_traveled": "5.25",
+    "timepoint": "0"
+})
+
+MINIMAL_STOP_TIME = StopTime.from_dict({
+    "trip_id": "123",
+    "arrival_time": "01:23:45",
+    "stop_id": "123",
+    "stop_sequence": "5"
+})
+
+def test_string_column():
+    """
+    test_string_column: values are deduplicated and None is supported
+    """
+    column = StringColumn()
+    for value in ["a", "b", None, "a"]:
+        column.append(value)
+    assert len(column) == 4
+    assert list(column) == ["a", "b", None, "a"]
+    assert column[3] == "a"
+    assert column[1:3] == ["b", None]
+    assert column.values == [None, "a", "b"]
+    assert column.code_of("b") == 2
+    assert column.code_of("c") is None
+
+    copy = pickle.loads(pickle.dumps(column))
+    assert list(copy) == ["a", "b", None, "a"]
+    assert copy.code_of("b") == 2
+
+def test_stop_time_table():
+    """
+    test_stop_time_table: rows come back equal to what was appended
+    """
+    table = StopTimeTable([FULL_STOP_TIME, MINIMAL_STOP_TIME])
+    assert len(table) == 2
+    assert table[0] == FULL_STOP_TIME
+    assert table[-1] == MINIMAL_STOP_TIME
+    assert table[1].shape_dist_traveled is None
+    assert table[0:2] == [FULL_STOP_TIME, MINIMAL_STOP_TIME]
+    assert table == [FULL_STOP_TIME, MINIMAL_STOP_TIME]
+    assert table != [FULL_STOP_TIME]
+    assert list(table.stop_sequence) == [5, 5]
+    assert list(table.trip_id) == ["123", "123"]
+    with pytest.raises(IndexError):
+        table[2] # pylint: disable=pointless-statement
+    assert str(table) != ""
+    assert table.to_models() == [FULL_STOP_TIME, MINIMAL_STOP_TIME]
+
+def test_shape_table():
+    """
+    test_shape_table: rows come back equal to what was appended
+    """
+    shapes = [
+        Shape.from_dict({"shape_id": "1", "shape_pt_lat": "1.5", "shape_pt_lon": "2.5",
+                         "shape_pt_sequence": "1"}),
+        Shape.from_dict({"shape_id": "1", "shape_pt_lat": "1.6", "shape_pt_lon": "2.6",
+                         "shape_pt_sequence": "2", "shape_dist_traveled": "1.2"}),
+    ]
+    table = ShapeTable(shapes)
+    assert list(table) == shapes
+    assert list(table.shape_pt_lat) == [1.5, 1.6]
+
+def test_gtfs_columnar():
+    """
+    test_gtfs_columnar: a columnar GTFS holds the same data as a regular one
+    """
+    regular = GTFS()
+    regular.from_zip(ZIP_FILE)
+    columnar = GTFS(columnar=True)
+    columnar.from_zip(ZIP_FILE)
+    assert isinstance(columnar.stop_times, StopTimeTable)
+    assert isinstance(columnar.shapes, ShapeTable)
+    assert columnar.stop_times == regular.stop_times
+    assert columnar.shapes == regular.shapes
@@ -0,0 +1,68 @@
+"""
+test_csv_reader.py: tests for realtime_gtfs/csv_reader.py
+"""
+
+import gc
+import io
+import sys
+import zipfile
+
+from realtime_gtfs.csv_reader import read_csv
+
+def test_read_csv_happyflow():
+    """
+    test_read_csv_happyflow: plain file, from bytes and from a stream
+    """
+    data = b"stop_id,stop_name\nA,Alpha\nB,Beta"
+    expected = [["stop_id", "stop_name"], ["A", "Alpha"], ["B", "Beta"]]
+    assert list(read_csv(data)) == expected
+    assert list(read_csv(io.BytesIO(data))) == expected
+
+def test_read_csv_quoted():
+    """
+    test_read_csv_quoted: commas, quotes and newlines inside quoted fields
+    """
+    data = b'stop_id,stop_name\n1,"Brussel-Zuid, perron 3"\n2,"Say ""hi""\nthere"\n'
+    assert list(read_csv(data)) == [
+        ["stop_id", "stop_name"],
+        ["1", "Brussel-Zuid, perron 3"],
+        ["2", 'Say "hi"\nthere']
+    ]
+
+def test_read_csv_bom_crlf():
+    """
+    test_read_csv_bom_crlf: byte order mark, CRLF line endings and padded header
+    """
+    data = b"\xef\xbb\xbfstop_id , stop_name\r\nA,Alpha\r\n\r\nB,Beta\r\n"
+    assert list(read_csv(data)) == [["stop_id", "stop_name"], ["A", "Alpha"], ["B", "Beta"]]
+
+def test_read_csv_empty():
+    """
+    test_read_csv_empty: an empty file yields nothing
+    """
+    assert not list(read_csv(b""))
+    assert not list(read_csv(b"\n\n"))
+
+def test_read_csv_leaves_stream_open():
+    """
+    test_read_csv_leaves_stream_open: the caller keeps ownership of the stream
+    """
+    stream = io.BytesIO(b"a,b\n1,2\n")
+    assert len(list(read_csv(stream))) == 2
+    assert not stream.closed
+
+def test_read_csv_closed_before_finalized(monkeypatch):
+    """
+    test_read_csv_closed_before_finalized: a reader whose file was closed
+    while it was being read is finalized without errors
+    """
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    archive = zipfile.ZipFile(io.BytesIO(), "w")
+    archive.writestr("stops.txt", "stop_id,stop_name\nA,Alpha\nB,Beta\n")
+    with archive.open("stops.txt") as member:
+        rows = read_csv(member)
+        assert next(rows) == ["stop_id", "stop_name"]
+    del rows
+    gc.collect()
+    assert not unraisable
@@ -1,10 +1,20 @@
 """
-test_fare_rule.py: tests for realtime_gtfs/database.py
+test_database.py: tests for realtime_gtfs/database.py
 """
 
+import contextlib
+import copy
+import os
+import threading
+import time
 import zipfile
 
+import pytest
+import sqlalchemy
+
 from realtime_gtfs import DatabaseConnection, GTFS
+from realtime_gtfs.database import csv_lines, load_in_tiers
+from realtime_gtfs.models import Stop
 
 ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
 SQLITE_URL = "sqlite:///:memory:"
@@ -38,3 +48,412 @@ def test_database_happyflow():
         assert table in dbcon.tables
     dbcon.add_gtfs(gtfs)
     dbcon.reset()
+
+def count_rows(dbcon, table):
+    """
+    count_rows: number of rows in a table
+    """
+    query = sqlalchemy.select([sqlalchemy.func.count()]).select_from(dbcon.tables[table])
+    return dbcon.connection.execute(query).scalar()
+
+def test_database_batches():
+    """
+    test_database_batches: all rows are written when they span several batches
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL, batch_size=2)
+    dbcon.add_gtfs(gtfs)
+    assert count_rows(dbcon, "stop_times") == len(gtfs.stop_times)
+    assert count_rows(dbcon, "stops") == len(gtfs.stops)
+    assert count_rows(dbcon, "services") == len(gtfs.services) + len(gtfs.service_exceptions)
+
+def test_database_times():
+    """
+    test_database_times: times are stored as integer seconds
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL)
+    assert isinstance(dbcon.tables["stop_times"].c.arrival_time.type, sqlalchemy.Integer)
+    assert isinstance(dbcon.tables["frequencies"].c.start_time.type, sqlalchemy.Integer)
+    dbcon.add_gtfs(gtfs)
+    table = dbcon.tables["stop_times"]
+    query = sqlalchemy.select([sqlalchemy.func.max(table.c.departure_time)])
+    assert dbcon.connection.execute(query).scalar() == \
+        max(stop_time.departure_time for stop_time in gtfs.stop_times)
+
+def test_database_transaction():
+    """
+    test_database_transaction: a failing batch rolls back the whole table
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL, batch_size=2)
+    dbcon.meta.create_all()
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        dbcon.write_stops(gtfs.stops + gtfs.stops[-1:])
+    assert count_rows(dbcon, "stops") == 0
+
+def test_csv_lines():
+    """
+    test_csv_lines: strings are quoted, None is written unquoted as null
+    """
+    rows = [
+        {"a": "x", "b": 1, "c": 2.5},
+        {"a": 'say "hi", bye', "b": None},
+        {"a": "", "c": 0.0},
+    ]
+    assert list(csv_lines(rows, ["a", "b", "c"])) == [
+        '"x",1,2.5\n',
+        '"say ""hi"", bye",,\n',
+        '"",,0.0\n',
+    ]
+    assert list(csv_lines(rows[1:2], ["a", "b"], null="NULL")) == ['"say ""hi"", bye",NULL\n']
+
+def test_database_bulk_load_fallback():
+    """
+    test_database_bulk_load_fallback: databases without a bulk load path use INSERT
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    for bulk_load in [True, False]:
+        dbcon = DatabaseConnection(SQLITE_URL, bulk_load=bulk_load)
+        dbcon.add_gtfs(gtfs)
+        assert count_rows(dbcon, "stop_times") == len(gtfs.stop_times)
+
+class RecordingConnection:
+    """
+    RecordingConnection: stands in for both the SQLAlchemy connection and the
+    DBAPI connection and cursor of a bulk load, records every statement with
+    the CSV it loads
+    """
+    def __init__(self):
+        self.loads = []
+        self.paths = []
+        self.transactions = 0
+
+    @property
+    def connection(self):
+        """
+        connection: the DBAPI connection
+        """
+        return self
+
+    def begin(self):
+        """
+        begin: a transaction that does nothing but being counted
+        """
+        self.transactions += 1
+        return contextlib.nullcontext()
+
+    def cursor(self):
+        """
+        cursor: the DBAPI cursor
+        """
+        return self
+
+    def close(self):
+        """
+        close: close the cursor
+        """
+
+    def copy_expert(self, sql, data):
+        """
+        copy_expert: psycopg2 COPY with the rows from a file object
+        """
+        self.loads.append((sql, data.read()))
+
+    def execute(self, statement, rows=None, path=None):
+        """
+        execute: INSERT with a list of rows, or LOAD DATA with the rows from
+        the file at path, which is removed after the statement
+        """
+        if path is None:
+            self.loads.append((str(statement), rows))
+            return
+        self.paths.append(path)
+        with open(path, encoding="utf-8", newline="") as csv_file:
+            self.loads.append((str(statement), csv_file.read()))
+
+def bulk_stops():
+    """
+    bulk_stops: a stop with quotes, a comma and a newline in its name and an
+    empty stop_code, and a stop without optional fields
+    """
+    tricky = Stop.from_dict({"stop_id": "S1", "stop_name": 'A "b", c\nd',
+                             "stop_lat": "50.5", "stop_lon": "4.25"})
+    tricky.stop_code = ""
+    return [tricky, Stop.from_dict({"stop_id": "S2", "stop_name": "E",
+                                    "stop_lat": "1", "stop_lon": "2"})]
+
+def test_copy_postgresql():
+    """
+    test_copy_postgresql: COPY gets every batch as CSV, an empty string is quoted and None is not
+    """
+    dbcon = DatabaseConnection(SQLITE_URL, batch_size=1)
+    dbcon.engine = sqlalchemy.create_engine("postgresql://", strategy="mock",
+                                            executor=lambda *args, **kwargs: None)
+    dbcon.connection = RecordingConnection()
+    dbcon.write_stops(bulk_stops())
+    sql = ('COPY stops (stop_id, stop_code, stop_name, stop_desc, stop_lat, stop_lon, zone_id, '
+           'stop_url, location_type, parent_station, stop_timezone, wheelchair_boarding, '
+           'level_id, platform_code, vehicle_type) FROM STDIN WITH (FORMAT csv)')
+    assert dbcon.connection.loads == [
+        (sql, '"S1","","A ""b"", c\nd",,50.5,4.25,,,0,,,0,,,\n'),
+        (sql, '"S2",,"E",,1.0,2.0,,,0,,,0,,,\n'),
+    ]
+
+def test_copy_postgresql_other_driver():
+    """
+    test_copy_postgresql_other_driver: PostgreSQL drivers other than psycopg2 insert the rows
+    """
+    dbcon = DatabaseConnection(SQLITE_URL)
+    dbcon.engine = sqlalchemy.create_engine("postgresql+pg8000://", strategy="mock",
+                                            executor=lambda *args, **kwargs: None)
+    dbcon.connection = RecordingConnection()
+    stops = bulk_stops()
+    dbcon.write_stops(stops)
+    [(sql, rows)] = dbcon.connection.loads
+    assert sql.startswith("INSERT INTO stops ")
+    assert rows == [stop.to_dict() for stop in stops]
+
+def test_write_services():
+    """
+    test_write_services: services and service exceptions are written in one transaction
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL)
+    dbcon.connection = RecordingConnection()
+    dbcon.write_services(gtfs.services, gtfs.service_exceptions)
+    assert dbcon.connection.transactions == 1
+    [(_, rows)] = dbcon.connection.loads
+    assert [row["exception_type"] for row in rows] == \
+        [None] * len(gtfs.services) + \
+        [exception.exception_type for exception in gtfs.service_exceptions]
+
+def test_load_data_mysql():
+    """
+    test_load_data_mysql: LOAD DATA gets all rows as CSV in a temporary file,
+    an empty string is quoted and None is written as NULL
+    """
+    dbcon = DatabaseConnection(SQLITE_URL, batch_size=1)
+    dbcon.engine = sqlalchemy.create_engine("mysql://", strategy="mock",
+                                            executor=lambda *args, **kwargs: None)
+    dbcon.connection = RecordingConnection()
+    dbcon.write_stops(bulk_stops())
+    [(sql, data)] = dbcon.connection.loads
+    assert sql == ("LOAD DATA LOCAL INFILE :path INTO TABLE stops CHARACTER SET utf8mb4 "
+                   "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                   "LINES TERMINATED BY '\\n' (stop_id, stop_code, stop_name, stop_desc, "
+                   "stop_lat, stop_lon, zone_id, stop_url, location_type, parent_station, "
+                   "stop_timezone, wheelchair_boarding, level_id, platform_code, vehicle_type)")
+    assert data == ('"S1","","A ""b"", c\nd",NULL,50.5,4.25,NULL,NULL,0,NULL,NULL,0,NULL,'
+                    'NULL,NULL\n'
+                    '"S2",NULL,"E",NULL,1.0,2.0,NULL,NULL,0,NULL,NULL,0,NULL,NULL,NULL\n')
+    assert not os.path.exists(dbcon.connection.paths[0])
+
+@pytest.mark.integration
+@pytest.mark.parametrize("variable", ["POSTGRESQL_URL", "MYSQL_URL"])
+def test_database_bulk_load(variable):
+    """
+    test_database_bulk_load: COPY and LOAD DATA write the same rows as INSERT,
+    runs when the environment variable holds the URL of a test database
+    """
+    url = os.environ.get(variable)
+    if url is None:
+        pytest.skip(f"{variable} is not set")
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    contents = {}
+    for bulk_load in [True, False]:
+        dbcon = DatabaseConnection(url, bulk_load=bulk_load,
+                                   max_parallel_tables=4 if bulk_load else 1)
+        dbcon.reset()
+        dbcon.add_gtfs(gtfs)
+        contents[bulk_load] = {
+            table: sorted(dbcon.connection.execute(dbcon.tables[table].select()).fetchall(),
+                          key=repr)
+            for table in ALL_TABLES
+        }
+        dbcon.meta.drop_all()
+    assert contents[True] == contents[False]
+
+def test_database_defer_constraints():
+    """
+    test_database_defer_constraints: tables loaded bare get the same data and
+    the same keys, constraints and indexes as tables created up front
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcons = {}
+    for defer_constraints in [False, True]:
+        dbcon = DatabaseConnection(SQLITE_URL, defer_constraints=defer_constraints)
+        dbcon.add_gtfs(gtfs)
+        dbcons[defer_constraints] = dbcon
+
+    for table in ALL_TABLES:
+        name = dbcons[False].tables[table].name
+        contents = []
+        for dbcon in dbcons.values():
+            inspector = sqlalchemy.inspect(dbcon.connection)
+            rows = dbcon.connection.execute(dbcon.tables[table].select()).fetchall()
+            contents.append((
+                sorted(rows, key=repr),
+                inspector.get_pk_constraint(name)["constrained_columns"],
+                inspector.get_unique_constraints(name),
+                inspector.get_foreign_keys(name),
+            ))
+        assert contents[0] == contents[1]
+    assert sqlalchemy.inspect(dbcons[True].connection).get_unique_constraints("stops")
+
+def test_database_defer_constraints_existing():
+    """
+    test_database_defer_constraints_existing: existing tables keep their constraints
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL, defer_constraints=True)
+    dbcon.meta.create_all()
+    dbcon.add_gtfs(gtfs)
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        dbcon.add_gtfs(gtfs)
+
+def test_load_tiers():
+    """
+    test_load_tiers: every table is in a later tier than the tables it refers to
+    """
+    dbcon = DatabaseConnection(SQLITE_URL)
+    tiers = dbcon.load_tiers()
+    assert sorted(sum(tiers, [])) == sorted(ALL_TABLES)
+    assert tiers[0] == ["agencies", "feed_infos", "levels", "services", "shapes", "translations"]
+    tier_of = {table: index for index, tier in enumerate(tiers) for table in tier}
+    for table_name, table in dbcon.tables.items():
+        for foreign_key in table.foreign_keys:
+            referred = foreign_key.column.table
+            if referred is not table:
+                referred_name = next(name for name, other in dbcon.tables.items()
+                                     if other is referred)
+                assert tier_of[referred_name] < tier_of[table_name]
+
+def test_load_in_tiers():
+    """
+    test_load_in_tiers: tables of a tier load at the same time, the next tier waits
+    """
+    events = []
+    running = []
+    lock = threading.Lock()
+
+    def load(table_name):
+        with lock:
+            events.append(("start", table_name))
+            running.append(table_name)
+        time.sleep(0.01)
+        with lock:
+            events.append(("parallel", len(running)))
+            running.remove(table_name)
+            events.append(("end", table_name))
+
+    load_in_tiers([["a", "b"], ["c"]], load, 2)
+    assert events.index(("end", "a")) < events.index(("start", "c"))
+    assert events.index(("end", "b")) < events.index(("start", "c"))
+    assert ("parallel", 2) in events
+
+def test_load_in_tiers_error():
+    """
+    test_load_in_tiers_error: a failing table stops the later tiers
+    """
+    loaded = []
+
+    def load(table_name):
+        if table_name == "b":
+            raise ValueError(table_name)
+        loaded.append(table_name)
+
+    with pytest.raises(ValueError):
+        load_in_tiers([["a", "b"], ["c"]], load, 2)
+    assert loaded == ["a"]
+
+def test_database_max_parallel_tables():
+    """
+    test_database_max_parallel_tables: SQLite loads one table at a time regardless
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL, max_parallel_tables=4)
+    dbcon.add_gtfs(gtfs)
+    assert count_rows(dbcon, "stop_times") == len(gtfs.stop_times)
+
+def test_database_unknown_option():
+    """
+    test_database_unknown_option: misspelled options are not ignored
+    """
+    with pytest.raises(TypeError):
+        DatabaseConnection(SQLITE_URL, batchsize=10)
+
+def table_contents(dbcon):
+    """
+    table_contents: the sorted rows of every GTFS table
+    """
+    return {table: sorted(dbcon.connection.execute(dbcon.tables[table].select()).fetchall(),
+                          key=repr)
+            for table in ALL_TABLES}
+
+def test_database_update_gtfs():
+    """
+    test_database_update_gtfs: only changes are written and the result equals a full load
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL, batch_size=3)
+    counts = dbcon.update_gtfs(gtfs)
+    assert counts["stop_times"] == (len(gtfs.stop_times), 0, 0)
+    assert counts["stops"] == (len(gtfs.stops), 0, 0)
+    assert all(count == (0, 0, 0) for count in dbcon.update_gtfs(gtfs).values())
+
+    changed = copy.deepcopy(gtfs)
+    changed.stops[0].stop_name = "Renamed"
+    removed = changed.stop_times.pop()
+    changed.stop_times[0].stop_headsign = "Somewhere"
+    changed.transfers = []
+    counts = dbcon.update_gtfs(changed)
+    assert counts["stops"] == (0, 1, 0)
+    assert counts["stop_times"] == (0, 1, 1)
+    assert counts["trips"] == (0, 0, 0)
+    assert counts["transfers"][0] == 0
+
+    reference = DatabaseConnection(SQLITE_URL)
+    reference.add_gtfs(changed)
+    assert table_contents(dbcon) == table_contents(reference)
+
+    changed.stop_times.append(removed)
+    assert dbcon.update_gtfs(changed)["stop_times"] == (1, 0, 0)
+
+def test_database_update_after_add():
+    """
+    test_database_update_after_add: the first update of a loaded database hashes its rows
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL)
+    dbcon.add_gtfs(gtfs)
+    contents = table_contents(dbcon)
+    assert all(count == (0, 0, 0) for count in dbcon.update_gtfs(gtfs).values())
+    assert table_contents(dbcon) == contents
+    assert all(count == (0, 0, 0) for count in dbcon.update_gtfs(gtfs).values())
+
+def test_database_update_exception_type():
+    """
+    test_database_update_exception_type: a changed exception_type replaces the exception
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    dbcon = DatabaseConnection(SQLITE_URL)
+    dbcon.update_gtfs(gtfs)
+    changed = copy.deepcopy(gtfs)
+    changed.service_exceptions[0].exception_type = 3 - changed.service_exceptions[0].exception_type
+    assert dbcon.update_gtfs(changed)["services"] == (1, 0, 1)
+    reference = DatabaseConnection(SQLITE_URL)
+    reference.add_gtfs(changed)
+    assert table_contents(dbcon) == table_contents(reference)
@@ -0,0 +1,139 @@
+"""
+test_departures.py: tests for realtime_gtfs/departures.py and GTFS.next_departures
+"""
+
+import datetime
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.models import Frequency, Service, StopTime, Trip
+from realtime_gtfs.models.schema import parse_time
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+@pytest.fixture(name="columnar_tables", params=[False, True], ids=["lists", "columnar"])
+def fixture_columnar_tables(request):
+    """
+    fixture_columnar_tables: run the tests on the sample feed with and without columnar tables
+    """
+    return request.param
+
+def scan(gtfs, stop_id, time, date):
+    """
+    scan: (departure time, trip_id, service date) of all departures from a
+    stop at or after a time on a date, worked out the slow way
+    """
+    calendar = gtfs.service_calendar()
+    found = []
+    for days_before in (0, 1):
+        service_date = date - datetime.timedelta(days=days_before)
+        shift = days_before * 24 * 3600
+        for trip in gtfs.trips:
+            if not calendar.is_active(trip.service_id, service_date):
+                continue
+            stop_times = sorted((stop_time for stop_time in gtfs.stop_times
+                                 if stop_time.trip_id == trip.trip_id),
+                                key=lambda stop_time: stop_time.stop_sequence)
+            starts = [0]
+            frequencies = [frequency for frequency in gtfs.frequencies
+                           if frequency.trip_id == trip.trip_id]
+            if frequencies:
+                first = stop_times[0].departure_time
+                starts = [start - first for frequency in frequencies
+                          for start in range(frequency.start_time, frequency.end_time,
+                                             frequency.headway_secs)]
+            for stop_time in stop_times[:-1]:
+                if stop_time.stop_id != stop_id or stop_time.pickup_type == 1:
+                    continue
+                for start in starts:
+                    departure = start + stop_time.departure_time - shift
+                    if departure >= time:
+                        found.append((departure, trip.trip_id, service_date))
+    return sorted(found)
+
+def test_against_scan(gtfs):
+    """
+    test_against_scan: the board finds the departures a scan finds
+    """
+    for date in [datetime.date(2007, 6, 4), datetime.date(2007, 6, 9)]:
+        for stop in gtfs.stops:
+            for time in ["0:00:00", "6:10:00", "12:00:00", "21:55:00"]:
+                expected = scan(gtfs, stop.stop_id, parse_time(time), date)
+                found = gtfs.next_departures(stop.stop_id, time, date, count=len(expected) + 1)
+                assert [departure.departure_time for departure in found] == \
+                    [departure[0] for departure in expected]
+                assert sorted((departure.departure_time, departure.trip_id,
+                               departure.service_date) for departure in found) == expected
+                found = gtfs.next_departures(stop.stop_id, time, date, count=3)
+                assert [departure.departure_time for departure in found] == \
+                    [departure[0] for departure in expected[:3]]
+
+def test_frequencies(gtfs):
+    """
+    test_frequencies: a trip with frequencies departs every headway
+    """
+    found = gtfs.next_departures("STAGECOACH", "6:00:00", "20070605", count=4)
+    shuttles = [departure for departure in found if departure.trip_id == "STBA"]
+    assert [departure.departure_time for departure in shuttles] == \
+        [parse_time("6:00:00"), parse_time("6:30:00")]
+    assert all(departure.stop_sequence == 1 for departure in shuttles)
+
+def small_feed():
+    """
+    small_feed: a feed with a trip running past midnight and a stop without pickup
+    """
+    gtfs = GTFS()
+    gtfs.services = [Service.from_dict({
+        "service_id": "DAILY", "monday": "1", "tuesday": "1", "wednesday": "1",
+        "thursday": "1", "friday": "1", "saturday": "1", "sunday": "1",
+        "start_date": "20240101", "end_date": "20240131"})]
+    gtfs.trips = [Trip.from_dict({"route_id": "R", "service_id": "DAILY", "trip_id": "NIGHT"})]
+    gtfs.stop_times = [StopTime.from_dict({
+        "trip_id": "NIGHT", "stop_id": stop_id, "stop_sequence": str(sequence),
+        "arrival_time": time, "departure_time": time, "pickup_type": pickup_type})
+                       for sequence, (stop_id, time, pickup_type) in enumerate([
+                           ("A", "23:50:00", "0"), ("B", "24:10:00", "1"),
+                           ("C", "24:20:00", "0"), ("D", "24:30:00", "0")])]
+    return gtfs
+
+def test_past_midnight():
+    """
+    test_past_midnight: trips of the previous service day are found after midnight
+    """
+    gtfs = small_feed()
+    found = gtfs.next_departures("C", "00:00:00", "20240110")
+    assert found == [
+        (parse_time("00:20:00"), "NIGHT", 2, datetime.date(2024, 1, 9)),
+        (parse_time("24:20:00"), "NIGHT", 2, datetime.date(2024, 1, 10)),
+    ]
+    # the feed starts on the 1st, so nothing runs on the day before
+    assert gtfs.next_departures("C", "00:00:00", "20240101", count=1)[0].service_date == \
+        datetime.date(2024, 1, 1)
+    assert gtfs.next_departures("C", "00:00:00", "20240301") == []
+
+def test_no_pickup():
+    """
+    test_no_pickup: stops without pickup and the last stop of a trip have no departures
+    """
+    gtfs = small_feed()
+    assert gtfs.next_departures("B", "00:00:00", "20240110") == []
+    assert gtfs.next_departures("D", "00:00:00", "20240110") == []
+    assert gtfs.next_departures("nosuch", "00:00:00", "20240110") == []
+    assert gtfs.next_departures("A", "00:00:00", "20240110", count=0) == []
+
+def test_rebuilt_after_change():
+    """
+    test_rebuilt_after_change: the board follows changes of its tables
+    """
+    gtfs = small_feed()
+    board = gtfs.departure_board()
+    assert gtfs.departure_board() is board
+    gtfs.frequencies.append(Frequency.from_dict({
+        "trip_id": "NIGHT", "start_time": "20:00:00", "end_time": "21:00:00",
+        "headway_secs": "1800"}))
+    assert gtfs.departure_board() is not board
+    assert [departure.departure_time for departure in
+            gtfs.next_departures("C", "00:00:00", "20240110")] == \
+        [parse_time("20:30:00"), parse_time("21:00:00")]
@@ -0,0 +1,63 @@
+"""
+test_diff.py: tests for realtime_gtfs/diff.py
+"""
+
+from realtime_gtfs.diff import (content_hash, diff_hashes, hash_rows, parse_row_key, row_key,
+                                table_hash)
+
+COLUMNS = ["trip_id", "stop_sequence", "stop_id"]
+KEY = ["trip_id", "stop_sequence"]
+
+ROWS = [
+    {"trip_id": "A", "stop_sequence": 1, "stop_id": "S1"},
+    {"trip_id": "A", "stop_sequence": 2, "stop_id": "S2"},
+    {"trip_id": "B", "stop_sequence": 1, "stop_id": None},
+]
+
+def test_content_hash():
+    """
+    test_content_hash: equal values hash equal, types and None matter
+    """
+    assert content_hash(("a", 1, None)) == content_hash(("a", 1, None))
+    assert content_hash(("a", 1, None)) != content_hash(("a", "1", None))
+    assert content_hash(("a", None)) != content_hash(("a", ""))
+
+def test_row_key():
+    """
+    test_row_key: a row key can be turned back into its values
+    """
+    for values in [("a", 1, None), ('quo"te\'s', 2.5), ("only",)]:
+        assert parse_row_key(row_key(values)) == values
+
+def test_hash_rows():
+    """
+    test_hash_rows: rows are keyed by the row key of their key columns
+    """
+    hashes = hash_rows(ROWS, COLUMNS, KEY)
+    assert len(hashes) == 3
+    key, row_hash, row = hashes[row_key(("A", 2))]
+    assert key == ("A", 2)
+    assert row_hash == content_hash(("A", 2, "S2"))
+    assert row is ROWS[1]
+
+def test_table_hash():
+    """
+    test_table_hash: order does not matter, duplicates do
+    """
+    assert table_hash(ROWS, COLUMNS) == table_hash(ROWS[::-1], COLUMNS)
+    assert table_hash(ROWS, COLUMNS) != table_hash(ROWS + ROWS[:1], COLUMNS)
+
+def test_diff_hashes():
+    """
+    test_diff_hashes: find the rows to insert, update and delete
+    """
+    stored = {key_text: row_hash
+              for key_text, (_, row_hash, _) in hash_rows(ROWS, COLUMNS, KEY).items()}
+    changed = {"trip_id": "A", "stop_sequence": 2, "stop_id": "S3"}
+    added = {"trip_id": "C", "stop_sequence": 1, "stop_id": "S1"}
+    new = hash_rows([ROWS[0], changed, added], COLUMNS, KEY)
+    inserts, updates, deletes = diff_hashes(stored, new)
+    assert inserts == [added]
+    assert updates == [(("A", 2), changed)]
+    assert deletes == [row_key(("B", 1))]
+    assert diff_hashes(stored, hash_rows(ROWS, COLUMNS, KEY)) == ([], [], [])
@@ -0,0 +1,125 @@
+"""
+test_download.py: tests for realtime_gtfs/download.py
+"""
+
+import hashlib
+import io
+
+import pytest
+import requests
+
+from realtime_gtfs.download import Downloader, shared_session
+
+def test_download(feed_server):
+    """
+    test_download: the body, its hash and progress are reported
+    """
+    progress = []
+    out_file = io.BytesIO()
+    download = Downloader(chunk_size=4096, progress=lambda *args: progress.append(args)) \
+        .download(feed_server.url(), out_file)
+    assert out_file.getvalue() == feed_server.content
+    assert download.status_code == 200
+    assert download.sha256 == hashlib.sha256(feed_server.content).hexdigest()
+    assert download.size == len(feed_server.content)
+    assert download.headers["ETag"] == feed_server.etag
+    assert len(progress) == -(-len(feed_server.content) // 4096)
+    assert progress[-1][:2] == (len(feed_server.content), len(feed_server.content))
+    assert all(rate > 0 for _, _, rate in progress)
+
+def test_download_not_found(feed_server):
+    """
+    test_download_not_found: only the status of a response other than 200 is returned
+    """
+    out_file = io.BytesIO()
+    download = Downloader().download(feed_server.url("/missing.zip"), out_file)
+    assert download.status_code == 404
+    assert download.sha256 is None
+    assert out_file.getvalue() == b""
+
+def test_resume(feed_server):
+    """
+    test_resume: a dropped connection is resumed with a Range request
+    """
+    feed_server.drops = 2
+    feed_server.drop_after = 1000
+    out_file = io.BytesIO()
+    download = Downloader(chunk_size=500).download(feed_server.url(), out_file)
+    assert out_file.getvalue() == feed_server.content
+    assert download.sha256 == hashlib.sha256(feed_server.content).hexdigest()
+    assert [headers.get("Range") for headers in feed_server.requests] == \
+        [None, "bytes=1000-", "bytes=2000-"]
+    assert feed_server.requests[1]["If-Range"] == feed_server.etag
+
+def test_resume_compressed(feed_server):
+    """
+    test_resume_compressed: the body is requested without content encoding, so
+    the Range offsets are the bytes written, and a body the server encodes
+    anyway is downloaded again from the start
+    """
+    feed_server.gzip = True
+    feed_server.drops = 1
+    feed_server.drop_after = 1000
+    out_file = io.BytesIO()
+    Downloader(chunk_size=500).download(feed_server.url(), out_file)
+    assert out_file.getvalue() == feed_server.content
+    assert [headers.get("Range") for headers in feed_server.requests] == [None, "bytes=1000-"]
+
+    feed_server.gzip = "always"
+    feed_server.drops = 1
+    feed_server.requests.clear()
+    out_file = io.BytesIO()
+    download = Downloader(chunk_size=500).download(feed_server.url(), out_file)
+    assert out_file.getvalue() == feed_server.content
+    assert download.size == len(feed_server.content)
+    assert [headers.get("Range") for headers in feed_server.requests] == [None, None]
+
+def test_resume_without_ranges(feed_server):
+    """
+    test_resume_without_ranges: a server ignoring Range sends the feed from the start
+    """
+    feed_server.ranges = False
+    feed_server.drops = 1
+    feed_server.drop_after = 1000
+    out_file = io.BytesIO()
+    download = Downloader().download(feed_server.url(), out_file)
+    assert out_file.getvalue() == feed_server.content
+    assert download.size == len(feed_server.content)
+
+def test_resume_changed(feed_server):
+    """
+    test_resume_changed: a feed that changed before the download resumed is
+    downloaded again from the start
+    """
+    feed_server.drops = 1
+    feed_server.drop_after = 1000
+    old_content = feed_server.content
+
+    def change(size, _total, _rate):
+        if feed_server.content is old_content and size >= 1000:
+            feed_server.set_content(b"new feed")
+
+    out_file = io.BytesIO()
+    download = Downloader(chunk_size=500, progress=change).download(feed_server.url(), out_file)
+    assert out_file.getvalue() == b"new feed"
+    assert download.sha256 == hashlib.sha256(b"new feed").hexdigest()
+    assert download.headers["ETag"] == feed_server.etag
+
+def test_retries_exhausted(feed_server):
+    """
+    test_retries_exhausted: a connection that keeps dropping raises
+    """
+    feed_server.drops = 3
+    feed_server.drop_after = 10
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        Downloader(retries=2).download(feed_server.url(), io.BytesIO())
+
+def test_shared_session(feed_server):
+    """
+    test_shared_session: downloaders reuse the keep-alive connection of the shared session
+    """
+    assert Downloader().session is shared_session()
+    Downloader().download(feed_server.url(), io.BytesIO())
+    Downloader().download(feed_server.url(), io.BytesIO())
+    assert len(feed_server.requests) == 2
+    assert len(feed_server.clients) == 1
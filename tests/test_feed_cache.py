@@ -0,0 +1,110 @@
+"""
+test_feed_cache.py: tests for realtime_gtfs/feed_cache.py
+"""
+
+import io
+import os
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.exceptions import InvalidURLError
+from realtime_gtfs.feed_cache import FeedCache
+
+def test_fetch_not_modified(feed_server, tmp_path):
+    """
+    test_fetch_not_modified: the second fetch revalidates and gets a 304
+    """
+    cache = FeedCache(str(tmp_path))
+    path, changed = cache.fetch(feed_server.url())
+    assert changed
+    with open(path, "rb") as feed_file:
+        assert feed_file.read() == feed_server.content
+    assert cache.metadata(feed_server.url())["etag"] == feed_server.etag
+
+    assert cache.fetch(feed_server.url()) == (path, False)
+    assert feed_server.requests[-1]["If-None-Match"] == feed_server.etag
+    assert feed_server.requests[-1]["If-Modified-Since"] == feed_server.last_modified
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_fetch_same_hash(feed_server, tmp_path):
+    """
+    test_fetch_same_hash: without conditional requests an unchanged feed is
+    recognised by its hash
+    """
+    feed_server.conditional = False
+    cache = FeedCache(str(tmp_path))
+    assert cache.fetch(feed_server.url())[1]
+    assert not cache.fetch(feed_server.url())[1]
+    assert "If-None-Match" not in feed_server.requests[-1]
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_fetch_changed(feed_server, tmp_path):
+    """
+    test_fetch_changed: a new feed replaces the cached one
+    """
+    cache = FeedCache(str(tmp_path))
+    path, _ = cache.fetch(feed_server.url())
+    feed_server.set_content(b"new feed")
+    assert cache.fetch(feed_server.url()) == (path, True)
+    with open(path, "rb") as feed_file:
+        assert feed_file.read() == b"new feed"
+
+def test_fetch_missing(feed_server, tmp_path):
+    """
+    test_fetch_missing: a URL that is not found raises InvalidURLError
+    """
+    with pytest.raises(InvalidURLError):
+        FeedCache(str(tmp_path)).fetch(feed_server.url("/missing.zip"))
+    assert os.listdir(tmp_path) == []
+
+def test_from_url_cache_dir(feed_server, tmp_path):
+    """
+    test_from_url_cache_dir: an unchanged feed is not parsed again by the
+    instance that parsed it, another instance parses it from the cache
+    """
+    gtfs = GTFS()
+    assert gtfs.from_url(feed_server.url(), cache_dir=str(tmp_path))
+    assert len(gtfs.stops) > 0
+    assert not gtfs.from_url(feed_server.url(), cache_dir=str(tmp_path))
+    assert len(gtfs.stops) > 0
+
+    unchanged = GTFS()
+    requests = len(feed_server.requests)
+    assert unchanged.from_url(feed_server.url(), cache_dir=str(tmp_path))
+    assert [stop.stop_id for stop in unchanged.stops] == [stop.stop_id for stop in gtfs.stops]
+    # answered with 304 Not Modified
+    assert len(feed_server.requests) == requests + 1
+    assert feed_server.requests[-1]["If-None-Match"] == feed_server.etag
+
+    with unchanged.get_zip(feed_server.url(), cache_dir=str(tmp_path)) as zip_file:
+        assert "stops.txt" in zip_file.namelist()
+
+def test_from_url_cache_dir_refresh(feed_server, tmp_path):
+    """
+    test_from_url_cache_dir_refresh: a changed feed replaces the tables and
+    indexes of the instance holding the previous one
+    """
+    gtfs = GTFS()
+    assert gtfs.from_url(feed_server.url(), cache_dir=str(tmp_path))
+    stop_count = len(gtfs.stops)
+    assert gtfs.stop_by_id("AMV") is not None
+
+    changed = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(feed_server.content)) as feed, \
+            zipfile.ZipFile(changed, "w") as changed_feed:
+        for name in feed.namelist():
+            data = feed.read(name)
+            if name == "agency.txt":
+                data = data.replace(b"Demo Transit Authority", b"Renamed Transit Authority")
+            if name == "stops.txt":
+                data = b"\n".join(line for line in data.splitlines()
+                                   if not line.startswith(b"AMV,"))
+            changed_feed.writestr(name, data)
+    feed_server.set_content(changed.getvalue())
+
+    assert gtfs.from_url(feed_server.url(), cache_dir=str(tmp_path))
+    assert len(gtfs.stops) == stop_count - 1
+    assert [agency.agency_name for agency in gtfs.agencies] == ["Renamed Transit Authority"]
+    assert gtfs.stop_by_id("AMV") is None
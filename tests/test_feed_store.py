@@ -0,0 +1,131 @@
+"""
+test_feed_store.py: tests for realtime_gtfs/feed_store.py
+"""
+
+import struct
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from realtime_gtfs import GTFS, FeedStore
+from realtime_gtfs import feed_store
+from realtime_gtfs.columnar import StopTimeTable
+from realtime_gtfs.exceptions import FeedStoreError
+from realtime_gtfs.models import StopTime
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+@pytest.fixture(name="store_path")
+def fixture_store_path(gtfs, tmp_path):
+    """
+    fixture_store_path: path of a feed store of the sample feed
+    """
+    path = str(tmp_path / "feed.store")
+    gtfs.save_feed_store(path)
+    return path
+
+def count_trip_stops(path, trip_id):
+    """
+    count_trip_stops: open a feed store in a worker process and query it
+    """
+    with FeedStore(path) as store:
+        return len(store.stop_times.where("trip_id", trip_id))
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_roundtrip(tmp_path, columnar):
+    """
+    test_roundtrip: every table reads back equal to the parsed one
+    """
+    gtfs = GTFS(columnar=columnar)
+    gtfs.from_zip(ZIP_FILE)
+    path = str(tmp_path / "feed.store")
+    gtfs.save_feed_store(path)
+    with FeedStore(path) as store:
+        for attribute, _ in feed_store.STORE_TABLES:
+            assert getattr(store, attribute) == getattr(gtfs, attribute), attribute
+        assert store.stop_times[-1] == gtfs.stop_times[-1]
+        assert store.stop_times[2:5] == gtfs.stop_times[2:5]
+        with pytest.raises(IndexError):
+            store.stop_times[len(gtfs.stop_times)] # pylint: disable=expression-not-assigned
+
+def test_columnar_nulls(tmp_path):
+    """
+    test_columnar_nulls: missing values of columnar tables read back as None,
+    not as the values standing for them in the columns
+    """
+    gtfs = GTFS(columnar=True)
+    gtfs.from_zip(ZIP_FILE)
+    gtfs.stop_times.append(StopTime.from_dict({
+        "trip_id": "AB1", "stop_id": "BULLFROG", "stop_sequence": "3",
+        "departure_time": "08:20:00"}))
+    path = str(tmp_path / "feed.store")
+    gtfs.save_feed_store(path)
+    with FeedStore(path) as store:
+        stop_time = store.stop_times[-1]
+        assert stop_time.arrival_time is None
+        assert stop_time.shape_dist_traveled is None
+        assert stop_time.departure_time == 8 * 3600 + 20 * 60
+        assert StopTimeTable(store.stop_times) == gtfs.stop_times
+
+def test_columns(gtfs, store_path):
+    """
+    test_columns: columns are typed views of the mapped file with the field names
+    """
+    with FeedStore(store_path) as store:
+        stop_times = store.stop_times
+        assert stop_times.stop_sequence.view.obj is store.mmap
+        assert stop_times.stop_sequence.view.format == "b"
+        assert list(stop_times.trip_id) == [stop_time.trip_id for stop_time in gtfs.stop_times]
+        assert list(stop_times.shape_dist_traveled) == \
+            [stop_time.shape_dist_traveled for stop_time in gtfs.stop_times]
+        assert list(stop_times.timepoint) == [stop_time.timepoint for stop_time in gtfs.stop_times]
+        assert stop_times.trip_id[0:2] == [gtfs.stop_times[0].trip_id, gtfs.stop_times[1].trip_id]
+        assert stop_times.where("trip_id", "AB1") == \
+            [stop_time for stop_time in gtfs.stop_times if stop_time.trip_id == "AB1"]
+        assert stop_times.where("trip_id", "nosuch") == []
+        assert len(stop_times.timepoint.indices(None)) == \
+            sum(stop_time.timepoint is None for stop_time in gtfs.stop_times)
+        assert store.strings.code_of("AB1") is not None
+        assert store.strings[store.strings.code_of("AB1")] == "AB1"
+        assert store.strings.code_of(None) == 0
+
+def test_worker_processes(gtfs, store_path):
+    """
+    test_worker_processes: several processes query the same file
+    """
+    expected = sum(stop_time.trip_id == "AB1" for stop_time in gtfs.stop_times)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        counts = list(executor.map(count_trip_stops, [store_path] * 2, ["AB1"] * 2))
+    assert counts == [expected, expected]
+
+def test_close(store_path):
+    """
+    test_close: the file is unmapped and columns are released
+    """
+    store = FeedStore(store_path)
+    column = store.stops.stop_id
+    store.close()
+    assert store.mmap.closed
+    with pytest.raises(ValueError):
+        column[0] # pylint: disable=pointless-statement
+
+def test_version_mismatch(store_path):
+    """
+    test_version_mismatch: a file of another format version is not opened
+    """
+    with open(store_path, "r+b") as store_file:
+        store_file.seek(8)
+        store_file.write(struct.pack("<I", feed_store.FEED_STORE_VERSION + 1))
+    with pytest.raises(FeedStoreError):
+        FeedStore(store_path)
+
+def test_int_typecode():
+    """
+    test_int_typecode: the smallest type is chosen, keeping its minimum for None
+    """
+    assert feed_store._int_typecode([1, None, 127]) == "b" # pylint: disable=protected-access
+    assert feed_store._int_typecode([-128]) == "h" # pylint: disable=protected-access
+    assert feed_store._int_typecode([70000]) == "i" # pylint: disable=protected-access
+    with pytest.raises(FeedStoreError):
+        feed_store._int_typecode([2 ** 63]) # pylint: disable=protected-access
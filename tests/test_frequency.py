@@ -67,7 +67,15 @@ def test_invalid_values():
     """
     test_invalid_values: test for values out of range, invalid enums, ...
     """
-    # TODO: test trip_id, start_time and end_time
+    # TODO: test trip_id
+    assert FULL_FREQUENCY.start_time == 9 * 3600
+    assert FULL_FREQUENCY.to_gtfs()["end_time"] == "10:00:00"
+
+    temp_dict = FULL_FREQUENCY_DICT.copy()
+    temp_dict["start_time"] = "-9:00:00"
+    with pytest.raises(InvalidValueError):
+        Frequency.from_gtfs(temp_dict.keys(), temp_dict.values())
+
     temp_dict = FULL_FREQUENCY_DICT.copy()
     temp_dict["headway_secs"] = "-1"
     with pytest.raises(InvalidValueError):
@@ -2,11 +2,13 @@
 test_gtfs.py: contains tests for realtime_gtfs/gtfs.py
 """
 
+import io
 import zipfile
 import pytest
+import sqlalchemy
 
-from realtime_gtfs import GTFS
-from realtime_gtfs.exceptions import InvalidURLError
+from realtime_gtfs import DatabaseConnection, GTFS
+from realtime_gtfs.exceptions import InvalidURLError, InvalidValueError
 
 # TODO: read from config file
 NMBS_URL = "https://sncb-opendata.hafas.de/gtfs/static/c21ac6758dd25af84cca5b707f3cb3de"
@@ -73,3 +75,154 @@ def test_invalid_url():
     test_gtfs = GTFS()
     with pytest.raises(InvalidURLError):
         test_gtfs.from_url("https://robbevanherck.be/nosuch.zip")
+
+def test_parse_stream():
+    """
+    test_parse_stream: test if parsing a member stream gives the same result as parsing its bytes
+    """
+    from_bytes = GTFS()
+    from_bytes.parse_stop_times(ZIP_FILE.read("stop_times.txt"))
+    from_stream = GTFS()
+    with ZIP_FILE.open("stop_times.txt") as member:
+        from_stream.parse_stop_times(member)
+    assert len(from_stream.stop_times) == 28
+    assert from_stream.stop_times == from_bytes.stop_times
+
+ALL_LISTS = [
+    "agencies", "stops", "routes", "trips", "stop_times", "services", "service_exceptions",
+    "fare_attributes", "fare_rules", "shapes", "frequencies", "transfers", "pathways",
+    "levels", "translations"
+]
+
+def test_from_zip_workers():
+    """
+    test_from_zip_workers: test if parsing in a process pool gives the same result,
+    both for a zip on disk and for an in-memory zip
+    """
+    serial = GTFS()
+    serial.from_zip(ZIP_FILE)
+
+    with open("./tests/static/sample-feed.zip", "rb") as zip_data:
+        in_memory_zip = zipfile.ZipFile(io.BytesIO(zip_data.read()))
+
+    for zip_file in [ZIP_FILE, in_memory_zip]:
+        parallel = GTFS()
+        parallel.from_zip(zip_file, workers=2)
+        for attribute in ALL_LISTS:
+            assert getattr(parallel, attribute) == getattr(serial, attribute)
+        assert parallel.feed_info == serial.feed_info
+
+def test_from_zip_chunks():
+    """
+    test_from_zip_chunks: test if parsing large members in chunks gives the same result
+    """
+    serial = GTFS()
+    serial.from_zip(ZIP_FILE)
+
+    chunked = GTFS()
+    chunked.from_zip(ZIP_FILE, workers=3, chunk_size=100)
+    for attribute in ALL_LISTS:
+        assert getattr(chunked, attribute) == getattr(serial, attribute)
+    assert chunked.feed_info == serial.feed_info
+
+def test_from_zip_chunks_multiline():
+    """
+    test_from_zip_chunks_multiline: quoted values with newlines are not cut
+    into two chunks, wherever the chunks would end
+    """
+    stops = ZIP_FILE.read("stops.txt").decode("utf-8").splitlines()
+    lines = [stops[0]] + [line.replace(",,", ',"a ""quoted""\nmultiline\n, value",', 1)
+                          for line in stops[1:]]
+    multiline_zip = io.BytesIO()
+    with zipfile.ZipFile(multiline_zip, "w") as multiline:
+        for name in ZIP_FILE.namelist():
+            data = "\n".join(lines).encode("utf-8") if name == "stops.txt" else \
+                ZIP_FILE.read(name)
+            multiline.writestr(name, data)
+
+    serial = GTFS()
+    serial.from_zip(zipfile.ZipFile(multiline_zip))
+    assert all("multiline\n" in stop.stop_desc for stop in serial.stops)
+    for chunk_size in [1, 30, 45, 70]:
+        chunked = GTFS()
+        chunked.from_zip(zipfile.ZipFile(multiline_zip), workers=2, chunk_size=chunk_size)
+        assert chunked.stops == serial.stops
+
+def test_from_zip_lazy():
+    """
+    test_from_zip_lazy: members are parsed when their table is first accessed
+    """
+    eager = GTFS()
+    eager.from_zip(ZIP_FILE)
+
+    lazy = GTFS()
+    lazy.from_zip(ZIP_FILE, lazy=True)
+    assert lazy.feed_hash == eager.feed_hash
+    assert "stops" in lazy.lazy_members
+    assert lazy.stops == eager.stops
+    assert "stops" not in lazy.lazy_members
+    assert "shapes" in lazy.lazy_members
+    lazy.shapes = []
+    assert "shapes" not in lazy.lazy_members
+    assert lazy.shapes == []
+
+    lazy.load_all()
+    assert not lazy.lazy_members
+    assert lazy.lazy_zip_file is None
+    for attribute in ALL_LISTS:
+        if attribute != "shapes":
+            assert getattr(lazy, attribute) == getattr(eager, attribute)
+    assert lazy.feed_info == eager.feed_info
+
+def test_from_zip_lazy_missing():
+    """
+    test_from_zip_lazy_missing: a missing required member is reported by from_zip
+    """
+    without_stops = zipfile.ZipFile(io.BytesIO(), "w")
+    for name in ZIP_FILE.namelist():
+        if name != "stops.txt":
+            without_stops.writestr(name, ZIP_FILE.read(name))
+    with pytest.raises(KeyError):
+        GTFS().from_zip(without_stops, lazy=True)
+
+def test_from_zip_lazy_invalid():
+    """
+    test_from_zip_lazy_invalid: a member that fails to parse fails on every access
+    """
+    bad_stops = zipfile.ZipFile(io.BytesIO(), "w")
+    for name in ZIP_FILE.namelist():
+        data = ZIP_FILE.read(name)
+        if name == "stops.txt":
+            data += b"\nBAD,Bad stop,,95,-116.40094,,"
+        bad_stops.writestr(name, data)
+    gtfs = GTFS()
+    gtfs.from_zip(bad_stops, lazy=True)
+    for _ in range(2):
+        with pytest.raises(InvalidValueError):
+            gtfs.stops # pylint: disable=pointless-statement
+    assert gtfs.lazy_zip_file is not None
+    gtfs.stops = []
+    assert gtfs.stops == []
+
+def test_parse_trips_nmbs_trip_type():
+    """
+    test_parse_trips_nmbs_trip_type: the trip_type column NMBS adds is dropped
+    """
+    gtfs = GTFS()
+    gtfs.parse_trips(b"route_id,service_id,trip_id,trip_type\nAB,FULLW,AB1,S\n")
+    assert len(gtfs.trips) == 1
+    assert gtfs.trips[0].trip_id == "AB1"
+
+def test_write_to_db_diff(tmp_path):
+    """
+    test_write_to_db_diff: writing the same feed twice with diff keeps one copy
+    """
+    url = f"sqlite:///{tmp_path / 'gtfs.sqlite'}"
+    test_gtfs = GTFS()
+    test_gtfs.from_zip(ZIP_FILE)
+    test_gtfs.write_to_db(url, diff=True)
+    test_gtfs.write_to_db(url, diff=True)
+    dbcon = DatabaseConnection(url)
+    query = sqlalchemy.select([sqlalchemy.func.count()]).select_from(dbcon.tables["stop_times"])
+    count = dbcon.connection.execute(query).scalar()
+    assert count == len(test_gtfs.stop_times)
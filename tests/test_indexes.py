@@ -0,0 +1,93 @@
+"""
+test_indexes.py: tests for realtime_gtfs/indexes.py and the lookups of GTFS
+"""
+
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.indexes import TableList, build_index
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+@pytest.fixture(name="columnar_tables", params=[False, True], ids=["lists", "columnar"])
+def fixture_columnar_tables(request):
+    """
+    fixture_columnar_tables: run the tests on the sample feed with and without columnar tables
+    """
+    return request.param
+
+def test_by_id(gtfs):
+    """
+    test_by_id: rows are found by their id
+    """
+    for stop in gtfs.stops:
+        assert gtfs.stop_by_id(stop.stop_id) is stop
+    assert gtfs.trip_by_id("AB1").route_id == "AB"
+    assert gtfs.route_by_id("AB").route_id == "AB"
+    assert gtfs.stop_by_id("nosuch") is None
+
+def test_by_foreign_key(gtfs):
+    """
+    test_by_foreign_key: every index holds the rows a scan finds
+    """
+    for trip in gtfs.trips:
+        expected = sorted((stop_time for stop_time in gtfs.stop_times
+                           if stop_time.trip_id == trip.trip_id),
+                          key=lambda stop_time: stop_time.stop_sequence)
+        assert list(gtfs.stop_times_by_trip(trip.trip_id)) == expected
+        assert list(gtfs.frequencies_by_trip(trip.trip_id)) == \
+            [frequency for frequency in gtfs.frequencies if frequency.trip_id == trip.trip_id]
+    for stop in gtfs.stops:
+        assert list(gtfs.stop_times_by_stop(stop.stop_id)) == \
+            [stop_time for stop_time in gtfs.stop_times if stop_time.stop_id == stop.stop_id]
+    for route in gtfs.routes:
+        assert list(gtfs.trips_by_route(route.route_id)) == \
+            [trip for trip in gtfs.trips if trip.route_id == route.route_id]
+    for shape_id in {point.shape_id for point in gtfs.shapes}:
+        points = gtfs.shape_points_by_shape(shape_id)
+        assert [point.shape_pt_sequence for point in points] == \
+            sorted(point.shape_pt_sequence for point in gtfs.shapes if point.shape_id == shape_id)
+    assert gtfs.stop_times_by_trip("nosuch") == ()
+
+def test_invalidation(gtfs):
+    """
+    test_invalidation: an index is rebuilt after its table changed or was replaced
+    """
+    index = gtfs.index("stop_by_id")
+    assert gtfs.index("stop_by_id") is index
+    removed = gtfs.stops.pop()
+    assert gtfs.stop_by_id(removed.stop_id) is None
+    gtfs.stops.append(removed)
+    assert gtfs.stop_by_id(removed.stop_id) is removed
+    gtfs.stops = gtfs.stops[:1]
+    assert isinstance(gtfs.stops, TableList)
+    assert gtfs.stop_by_id(removed.stop_id) is None
+
+    trip_id = gtfs.stop_times[0].trip_id
+    before = len(gtfs.stop_times_by_trip(trip_id))
+    gtfs.stop_times.append(gtfs.stop_times[0])
+    assert len(gtfs.stop_times_by_trip(trip_id)) == before + 1
+
+def test_table_list_version():
+    """
+    test_table_list_version: every change counts
+    """
+    table = TableList([3, 1])
+    table.append(2)
+    table[0] = 4
+    table.sort()
+    del table[0]
+    table += [5]
+    assert table == [2, 4, 5]
+    assert table.version == 5
+
+def test_build_index_unique():
+    """
+    test_build_index_unique: the last row of a key wins
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    doubled = gtfs.stops + gtfs.stops[:1]
+    assert build_index(doubled, "stop_id", unique=True)[gtfs.stops[0].stop_id] is doubled[-1]
@@ -0,0 +1,45 @@
+"""
+test_models.py: tests shared by all models in realtime_gtfs/models
+"""
+
+import copy
+import pickle
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+GTFS_DATA = GTFS()
+GTFS_DATA.from_zip(ZIP_FILE)
+
+ALL_MODELS = [
+    models[0] for models in [
+        GTFS_DATA.agencies, GTFS_DATA.stops, GTFS_DATA.routes, GTFS_DATA.trips,
+        GTFS_DATA.stop_times, GTFS_DATA.services, GTFS_DATA.service_exceptions,
+        GTFS_DATA.fare_attributes, GTFS_DATA.fare_rules, GTFS_DATA.shapes,
+        GTFS_DATA.frequencies, GTFS_DATA.transfers, GTFS_DATA.pathways, GTFS_DATA.levels,
+        GTFS_DATA.translations, [GTFS_DATA.feed_info]
+    ]
+]
+
+@pytest.mark.parametrize("model", ALL_MODELS, ids=lambda model: type(model).__name__)
+def test_slots(model):
+    """
+    test_slots: models have no per-instance __dict__ and reject unknown attributes
+    """
+    assert not hasattr(model, "__dict__")
+    with pytest.raises(AttributeError):
+        model.favorite_food = "Pizza"
+
+@pytest.mark.parametrize("model", ALL_MODELS, ids=lambda model: type(model).__name__)
+def test_pickle(model):
+    """
+    test_pickle: models survive pickling and copying, and compare equal afterwards
+    """
+    for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+        assert pickle.loads(pickle.dumps(model, protocol)) == model
+    assert copy.copy(model) == model
+    assert copy.deepcopy(model) == model
@@ -0,0 +1,35 @@
+"""
+test_packing.py: tests for realtime_gtfs/packing.py
+"""
+
+import pickle
+
+from realtime_gtfs.models import Stop
+from realtime_gtfs.packing import pack_models, unpack_models
+
+STOPS = [
+    Stop.from_dict({"stop_id": "A", "stop_name": "Alpha", "stop_lat": "1", "stop_lon": "2"}),
+    Stop.from_dict({"stop_id": "B", "stop_name": "Beta", "stop_lat": "3", "stop_lon": "4",
+                    "platform_code": "5"}),
+]
+
+def test_pack_roundtrip():
+    """
+    test_pack_roundtrip: unpacking a packed list gives back equal models
+    """
+    packed = pickle.loads(pickle.dumps(pack_models(STOPS)))
+    assert unpack_models(packed) == STOPS
+
+def test_pack_empty():
+    """
+    test_pack_empty: empty lists survive packing
+    """
+    assert not unpack_models(pack_models([]))
+
+def test_pack_compact():
+    """
+    test_pack_compact: the packed form is smaller than the pickled models
+    """
+    stops = [Stop.from_dict({"stop_id": str(i), "stop_name": "Stop", "stop_lat": "1",
+                             "stop_lon": "2"}) for i in range(1000)]
+    assert len(pickle.dumps(pack_models(stops))) < len(pickle.dumps(stops))
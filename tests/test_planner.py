@@ -0,0 +1,222 @@
+"""
+test_planner.py: tests for realtime_gtfs/planner.py and GTFS.plan
+"""
+
+import datetime
+import random
+import zipfile
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.models import Frequency, Service, StopTime, Transfer, Trip
+from realtime_gtfs.models.schema import parse_time
+from realtime_gtfs.planner import Leg
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+DAY = 24 * 3600
+
+def test_sample_feed():
+    """
+    test_sample_feed: journeys on the sample feed, with a change and with a transfer on foot
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    assert gtfs.plan("STAGECOACH", "AMV", "7:00:00", "20070609") == [
+        Leg("STBA", "STAGECOACH", "BEATTY_AIRPORT", parse_time("7:00:00"), parse_time("7:20:00")),
+        Leg("AAMV1", "BEATTY_AIRPORT", "AMV", parse_time("8:00:00"), parse_time("9:00:00")),
+    ]
+    # AAMV only runs in the weekend
+    assert gtfs.plan("STAGECOACH", "AMV", "7:00:00", "20070605") is None
+    # transfers.txt has a 120 second transfer from BULLFROG to FUR_CREEK_RES
+    assert gtfs.plan("BEATTY_AIRPORT", "FUR_CREEK_RES", "7:30:00", "20070605") == [
+        Leg("AB1", "BEATTY_AIRPORT", "BULLFROG", parse_time("8:00:00"), parse_time("8:10:00")),
+        Leg(None, "BULLFROG", "FUR_CREEK_RES", parse_time("8:10:00"), parse_time("8:12:00")),
+    ]
+    assert gtfs.plan("BULLFROG", "FUR_CREEK_RES", "7:30:00", "20070605") == [
+        Leg(None, "BULLFROG", "FUR_CREEK_RES", parse_time("7:30:00"), parse_time("7:32:00")),
+    ]
+    assert gtfs.plan("AMV", "AMV", "7:00:00", "20070605") == []
+    assert gtfs.plan("nosuch", "AMV", "7:00:00", "20070605") is None
+    assert gtfs.planner() is gtfs.planner()
+
+def line_feed(transfers=(), pickup_type="0"):
+    """
+    line_feed: a trip A-B from 10:00 to 10:10 and trips B-C at 10:12, 10:20
+    and after midnight, with optional transfers
+    """
+    gtfs = GTFS()
+    gtfs.services = [Service.from_dict({
+        "service_id": "DAILY", "monday": "1", "tuesday": "1", "wednesday": "1",
+        "thursday": "1", "friday": "1", "saturday": "1", "sunday": "1",
+        "start_date": "20240101", "end_date": "20240131"})]
+    rows = [("T1", "A", "10:00:00", "0"), ("T1", "B", "10:10:00", "0"),
+            ("T2", "B", "10:12:00", pickup_type), ("T2", "C", "10:30:00", "0"),
+            ("T3", "B", "10:20:00", "0"), ("T3", "C", "10:40:00", "0"),
+            ("T4", "B", "24:30:00", "0"), ("T4", "C", "24:50:00", "0")]
+    gtfs.trips = [Trip.from_dict({"route_id": "R", "service_id": "DAILY", "trip_id": trip_id})
+                  for trip_id in ["T1", "T2", "T3", "T4"]]
+    gtfs.stop_times = [StopTime.from_dict({
+        "trip_id": trip_id, "stop_id": stop_id, "stop_sequence": str(sequence),
+        "arrival_time": time, "departure_time": time, "pickup_type": pickup})
+                       for sequence, (trip_id, stop_id, time, pickup) in enumerate(rows)]
+    gtfs.transfers = [Transfer.from_dict(values) for values in transfers]
+    return gtfs
+
+def test_min_transfer_time():
+    """
+    test_min_transfer_time: a change at a stop takes its min_transfer_time
+    """
+    assert [leg.trip_id for leg in line_feed().plan("A", "C", "09:00:00", "20240110")] == \
+        ["T1", "T2"]
+    gtfs = line_feed([{"from_stop_id": "B", "to_stop_id": "B", "transfer_type": "2",
+                       "min_transfer_time": "180"}])
+    assert [leg.trip_id for leg in gtfs.plan("A", "C", "09:00:00", "20240110")] == ["T1", "T3"]
+    gtfs = line_feed([{"from_stop_id": "B", "to_stop_id": "B", "transfer_type": "3"}])
+    assert gtfs.plan("A", "C", "09:00:00", "20240110") is None
+    # the transfer rules apply to changes, not to the stop the journey starts at
+    assert [leg.trip_id for leg in gtfs.plan("B", "C", "10:12:00", "20240110")] == ["T2"]
+
+def test_pickup_type():
+    """
+    test_pickup_type: trips can not be boarded at stops without pickup
+    """
+    gtfs = line_feed(pickup_type="1")
+    assert [leg.trip_id for leg in gtfs.plan("A", "C", "09:00:00", "20240110")] == ["T1", "T3"]
+
+def test_past_midnight():
+    """
+    test_past_midnight: trips of the previous service day run after midnight
+    """
+    gtfs = line_feed()
+    assert gtfs.plan("B", "C", "00:10:00", "20240110") == [
+        Leg("T4", "B", "C", parse_time("00:30:00"), parse_time("00:50:00"))]
+    assert gtfs.plan("B", "C", "00:10:00", "20240101") == [
+        Leg("T2", "B", "C", parse_time("10:12:00"), parse_time("10:30:00"))]
+
+def random_feed(rng, stops):
+    """
+    random_feed: random routes over `stops` stops, with trips past midnight,
+    stops without pickup or drop off, frequencies and transfers
+    """
+    gtfs = GTFS()
+    gtfs.services = [Service.from_dict({
+        "service_id": f"S{index}", "start_date": "20240101", "end_date": "20240131",
+        **{day: str(rng.randrange(2)) for day in ["monday", "tuesday", "wednesday", "thursday",
+                                                   "friday", "saturday", "sunday"]}})
+                     for index in range(3)]
+    gtfs.trips, gtfs.stop_times, gtfs.frequencies = [], [], []
+    for route in range(25):
+        path = rng.sample(range(stops), rng.randrange(3, 9))
+        for number in range(8):
+            trip_id = f"R{route}T{number}"
+            gtfs.trips.append(Trip.from_dict({"route_id": f"R{route}", "trip_id": trip_id,
+                                              "service_id": f"S{rng.randrange(3)}"}))
+            time = rng.randrange(5 * 3600, 28 * 3600)
+            for sequence, stop in enumerate(path):
+                arrival = time
+                time += rng.randrange(0, 90)
+                gtfs.stop_times.append(StopTime.from_rows(
+                    ("trip_id", "stop_id", "stop_sequence", "arrival_time", "departure_time",
+                     "pickup_type", "drop_off_type"),
+                    [(trip_id, f"P{stop}", sequence, arrival, time,
+                      int(rng.random() < 0.1), int(rng.random() < 0.1))])[0])
+                time += rng.randrange(60, 900)
+            if number == 0 and route % 5 == 0:
+                gtfs.frequencies.append(Frequency.from_dict({
+                    "trip_id": trip_id, "start_time": "07:00:00", "end_time": "09:00:00",
+                    "headway_secs": str(rng.choice([600, 1200]))}))
+    gtfs.transfers = []
+    for _ in range(30):
+        start, end = f"P{rng.randrange(stops)}", f"P{rng.randrange(stops)}"
+        gtfs.transfers.append(Transfer.from_dict({
+            "from_stop_id": start, "to_stop_id": rng.choice([start, end]),
+            "transfer_type": str(rng.choice([0, 2, 2, 3])),
+            "min_transfer_time": str(rng.randrange(0, 600))}))
+    return gtfs
+
+def oracle(gtfs, origin, target, departure_time, date):
+    """
+    oracle: earliest arrival at target, None if not reached, relaxing trip
+    by trip until no arrival improves instead of scanning connections by time
+    """
+    calendar = gtfs.service_calendar()
+    runs = []
+    for days_before in (0, 1):
+        service_date = date - datetime.timedelta(days=days_before)
+        for trip in gtfs.trips:
+            if not calendar.is_active(trip.service_id, service_date):
+                continue
+            stop_times = sorted((stop_time for stop_time in gtfs.stop_times
+                                 if stop_time.trip_id == trip.trip_id),
+                                key=lambda stop_time: stop_time.stop_sequence)
+            offsets = [0]
+            frequencies = [frequency for frequency in gtfs.frequencies
+                           if frequency.trip_id == trip.trip_id]
+            if frequencies:
+                offsets = [start - stop_times[0].departure_time for frequency in frequencies
+                           for start in range(frequency.start_time, frequency.end_time,
+                                              frequency.headway_secs)]
+            for offset in offsets:
+                shift = offset - days_before * DAY
+                runs.append([(start.departure_time + shift, end.arrival_time + shift,
+                              start.stop_id, end.stop_id, start.pickup_type != 1,
+                              end.drop_off_type != 1)
+                             for start, end in zip(stop_times, stop_times[1:])])
+    change_times, footpaths = {}, {}
+    for transfer in gtfs.transfers:
+        seconds = None if transfer.transfer_type == 3 else transfer.min_transfer_time
+        if transfer.from_stop_id == transfer.to_stop_id:
+            change_times[transfer.from_stop_id] = seconds
+        elif seconds is not None:
+            footpaths.setdefault(transfer.from_stop_id, []).append((transfer.to_stop_id, seconds))
+
+    arrivals, ready = {}, {origin: departure_time}
+    def improve(labels, stop, time):
+        if time < labels.get(stop, float("inf")):
+            labels[stop] = time
+            return True
+        return False
+    for stop, seconds in footpaths.get(origin, ()):
+        improve(arrivals, stop, departure_time + seconds)
+        improve(ready, stop, departure_time + seconds)
+    changed = True
+    while changed:
+        changed = False
+        for run in runs:
+            aboard = False
+            for departure, arrival, start, end, pickup, drop_off in run:
+                aboard = aboard or pickup and ready.get(start, float("inf")) <= departure
+                if not aboard or not drop_off:
+                    continue
+                changed |= improve(arrivals, end, arrival)
+                if change_times.get(end, 0) is not None:
+                    changed |= improve(ready, end, arrival + change_times.get(end, 0))
+                for other, seconds in footpaths.get(end, ()):
+                    changed |= improve(arrivals, other, arrival + seconds)
+                    changed |= improve(ready, other, arrival + seconds)
+    return arrivals.get(target)
+
+def test_against_oracle():
+    """
+    test_against_oracle: the planner arrives as early as the oracle, along legs that connect
+    """
+    rng = random.Random(1)
+    gtfs = random_feed(rng, 40)
+    stop_ids = sorted({stop_time.stop_id for stop_time in gtfs.stop_times})
+    reached = 0
+    for _ in range(150):
+        origin, target = rng.sample(stop_ids, 2)
+        departure_time = rng.randrange(0, 26 * 3600)
+        date = datetime.date(2024, 1, rng.randrange(1, 32))
+        expected = oracle(gtfs, origin, target, departure_time, date)
+        legs = gtfs.plan(origin, target, departure_time, date)
+        if expected is None:
+            assert legs is None
+            continue
+        reached += 1
+        assert legs[-1].arrival_time == expected
+        assert legs[0].from_stop_id == origin and legs[-1].to_stop_id == target
+        assert legs[0].departure_time >= departure_time
+        for leg, following in zip(legs, legs[1:]):
+            assert leg.to_stop_id == following.from_stop_id
+            assert leg.arrival_time <= following.departure_time
+    assert reached > 30
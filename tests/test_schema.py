@@ -0,0 +1,192 @@
+"""
+test_schema: tests for realtime_gtfs/models/schema.py
+"""
+
+import pytest
+import sqlalchemy as sa
+
+from realtime_gtfs.models.schema import (Field, Model, RowDecoder, is_color, is_timezone,
+                                         parse_time, format_time)
+from realtime_gtfs.exceptions import MissingKeyError, InvalidKeyError, InvalidValueError
+
+class Example(Model): # pylint: disable=too-few-public-methods
+    """
+    Example: model using every kind of field option
+    """
+    TABLE_NAME = "examples"
+    FIELDS = [
+        Field("example_id", required=True, primary_key=True),
+        Field("count", int, default=1, minimum=0, maximum=10),
+        Field("kind", int, valid={0, 3}),
+        Field("color", valid=is_color),
+        Field("parent_id", foreign_key="examples.example_id"),
+    ]
+    example_id: str
+    count: int
+    kind: int
+    color: str
+    parent_id: str
+    __slots__ = [field.name for field in FIELDS]
+
+    def __str__(self):
+        return f"[Example {self.example_id}]"
+
+def test_defaults():
+    """
+    test_defaults: check if every field starts at its default
+    """
+    example = Example()
+    assert example.to_dict() == {
+        "example_id": None,
+        "count": 1,
+        "kind": None,
+        "color": None,
+        "parent_id": None,
+    }
+
+def test_from_gtfs():
+    """
+    test_from_gtfs: check if values are converted and empty values are skipped
+    """
+    example = Example.from_gtfs(["example_id", "count", "kind"], ["a", "7", ""])
+    assert example.example_id == "a"
+    assert example.count == 7
+    assert example.kind is None
+
+def test_from_gtfs_new_header():
+    """
+    test_from_gtfs_new_header: check if a different header is resolved again
+    """
+    first = Example.from_gtfs(["example_id", "count"], ["a", "2"])
+    second = Example.from_gtfs(["count", "example_id"], ["3", "b"])
+    assert (first.example_id, first.count) == ("a", 2)
+    assert (second.example_id, second.count) == ("b", 3)
+
+def test_from_gtfs_mutated_header():
+    """
+    test_from_gtfs_mutated_header: a header list changed in place is resolved again
+    """
+    header = ["example_id", "count"]
+    assert Example.from_gtfs(header, ["a", "2"]).count == 2
+    header.reverse()
+    second = Example.from_gtfs(header, ["3", "b"])
+    assert (second.example_id, second.count) == ("b", 3)
+
+def test_from_rows():
+    """
+    test_from_rows: instances are built from value tuples without conversion
+    """
+    keys = ("example_id", "count", "kind", "color", "parent_id")
+    first, second = Example.from_rows(keys, [("a", 2, 0, None, None), ("b", 3, 3, None, "a")])
+    assert first.to_dict() == dict(zip(keys, ("a", 2, 0, None, None)))
+    assert (second.example_id, second.parent_id) == ("b", "a")
+    assert Example.from_rows(keys, []) == []
+
+def test_row_decoder():
+    """
+    test_row_decoder: check decoding rows, including short ones, with a fixed header
+    """
+    decode = RowDecoder(Example, ["kind", "example_id", "count"]).decode
+    assert decode(["3", "a", "4"]) == Example.from_dict({"example_id": "a", "kind": "3",
+                                                         "count": "4"})
+    example = decode(["", "b"])
+    assert (example.example_id, example.kind, example.count) == ("b", None, 1)
+    with pytest.raises(MissingKeyError):
+        decode(["0"])
+
+def test_row_decoder_ignore():
+    """
+    test_row_decoder_ignore: ignored columns are dropped, other unknown columns raise
+    """
+    header = ["example_id", "trip_type", "unknown"]
+    decoder = RowDecoder(Example, header, ignore=["trip_type"])
+    assert decoder.unknown == ["unknown"]
+    assert decoder.decode(["a", "T", ""]).example_id == "a"
+    with pytest.raises(InvalidKeyError):
+        decoder.decode(["a", "T", "x"])
+
+def test_invalid_key_only_with_value():
+    """
+    test_invalid_key_only_with_value: unknown columns only raise when they hold a value
+    """
+    Example.from_gtfs(["example_id", "unknown"], ["a", ""])
+    with pytest.raises(InvalidKeyError):
+        Example.from_gtfs(["example_id", "unknown"], ["a", "x"])
+
+@pytest.mark.parametrize("key,value", [
+    ("count", "-1"),
+    ("count", "11"),
+    ("kind", "1"),
+    ("color", "FFFFFG"),
+])
+def test_invalid_value(key, value):
+    """
+    test_invalid_value: check minimum, maximum, containers and predicates
+    """
+    with pytest.raises(InvalidValueError):
+        Example.from_dict({"example_id": "a", key: value})
+
+def test_missing_key():
+    """
+    test_missing_key: a missing required field is reported before invalid values
+    """
+    with pytest.raises(MissingKeyError):
+        Example.from_dict({"count": "-1"})
+
+def test_create_table():
+    """
+    test_create_table: check the columns derived from the fields
+    """
+    table = Example.create_table(sa.MetaData())
+    assert table.name == "examples"
+    assert table.c.keys() == [field.name for field in Example.FIELDS]
+    assert table.c.example_id.primary_key
+    assert isinstance(table.c.count.type, sa.Integer)
+    assert isinstance(table.c.color.type, sa.String)
+    assert table.c.color.type.length == 255
+    assert [key.target_fullname for key in table.c.parent_id.foreign_keys] == \
+        ["examples.example_id"]
+
+def test_validators():
+    """
+    test_validators: check is_color and is_timezone
+    """
+    assert is_color("00FF00")
+    assert not is_color("00FF0")
+    assert not is_color("hello!")
+    assert is_timezone("Europe/Brussels")
+    assert not is_timezone("Europe/Gent")
+
+def test_times():
+    """
+    test_times: times are seconds since noon minus 12h, past midnight included
+    """
+    assert parse_time("8:05:09") == 8 * 3600 + 5 * 60 + 9
+    assert parse_time("08:05:09") == parse_time("8:05:09")
+    assert parse_time("25:13:00") == 25 * 3600 + 13 * 60
+    assert format_time(parse_time("25:13:00")) == "25:13:00"
+    assert format_time(parse_time("8:05:09")) == "08:05:09"
+    with pytest.raises(ValueError):
+        parse_time("8:05")
+
+def test_to_gtfs():
+    """
+    test_to_gtfs: fields are turned back into GTFS strings
+    """
+    example = Example.from_dict({"example_id": "a", "count": "3"})
+    assert example.to_gtfs() == {"example_id": "a", "count": "3", "kind": "", "color": "",
+                                 "parent_id": ""}
+    assert Field("time", parse_time).format(parse_time("24:00:01")) == "24:00:01"
+    assert isinstance(Field("time", parse_time).create_column().type, sa.Integer)
+
+def test_annotations_match_fields():
+    """
+    test_annotations_match_fields: a model has to declare every field as an annotation
+    """
+    with pytest.raises(TypeError):
+        class Missing(Model): # pylint: disable=unused-variable
+            """
+            Missing: a model without the annotation of its field
+            """
+            FIELDS = [Field("missing_id")]
+            __slots__ = [field.name for field in FIELDS]
@@ -0,0 +1,97 @@
+"""
+test_service_calendar.py: tests for realtime_gtfs/service_calendar.py
+"""
+
+import datetime
+import random
+import zipfile
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.models import Service, ServiceException
+from realtime_gtfs.service_calendar import WEEKDAYS, ServiceCalendar, parse_date
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+def runs_on(services, service_exceptions, service_id, date):
+    """
+    runs_on: whether a service runs on a date, worked out the slow way
+    """
+    for exception in service_exceptions:
+        if exception.service_id == service_id and parse_date(exception.date) == date:
+            return exception.exception_type == 1
+    return any(service.service_id == service_id and
+               parse_date(service.start_date) <= date <= parse_date(service.end_date) and
+               getattr(service, WEEKDAYS[date.weekday()]) == 1
+               for service in services)
+
+def random_feed(rng, count):
+    """
+    random_feed: `count` random services with random exceptions
+    """
+    base = datetime.date(2024, 1, 1)
+    services, service_exceptions = [], []
+    for index in range(count):
+        start = base + datetime.timedelta(days=rng.randrange(60))
+        end = start + datetime.timedelta(days=rng.randrange(-5, 120))
+        values = {"service_id": f"S{index % (count - 3)}",
+                  "start_date": start.strftime("%Y%m%d"), "end_date": end.strftime("%Y%m%d")}
+        values.update({name: str(rng.randrange(2)) for name in WEEKDAYS})
+        services.append(Service.from_dict(values))
+    for _ in range(count * 3):
+        date = base + datetime.timedelta(days=rng.randrange(-10, 200))
+        service_exceptions.append(ServiceException.from_dict({
+            "service_id": f"S{rng.randrange(count + 5)}", "date": date.strftime("%Y%m%d"),
+            "exception_type": str(rng.randrange(1, 3))}))
+    # the oracle takes the first exception of a day, the calendar the last
+    unique = {(exception.service_id, exception.date): exception
+              for exception in reversed(service_exceptions)}
+    return services, list(unique.values())
+
+def test_against_oracle():
+    """
+    test_against_oracle: every service and date agrees with the slow way
+    """
+    rng = random.Random(7)
+    services, service_exceptions = random_feed(rng, 40)
+    calendar = ServiceCalendar(services, service_exceptions)
+    service_ids = {service.service_id for service in services}
+    service_ids |= {exception.service_id for exception in service_exceptions}
+    date = datetime.date(2023, 12, 20)
+    while date < datetime.date(2024, 8, 1):
+        expected = {service_id for service_id in service_ids
+                    if runs_on(services, service_exceptions, service_id, date)}
+        assert calendar.active_services(date) == expected, date
+        for service_id in service_ids:
+            assert calendar.is_active(service_id, date) == (service_id in expected)
+        date += datetime.timedelta(days=1)
+
+def test_sample_feed():
+    """
+    test_sample_feed: the exception of the sample feed removes FULLW on one day
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    calendar = gtfs.service_calendar()
+    assert calendar.active_services("20070603") == {"FULLW", "WE"}
+    assert calendar.active_services("20070604") == set()
+    assert calendar.active_services("20070605") == {"FULLW"}
+    assert calendar.is_active("WE", datetime.date(2010, 12, 26))
+    assert not calendar.is_active("WE", "20110101")
+    assert not calendar.is_active("nosuch", "20070605")
+    weekend_days = [datetime.date(2007, 1, 1) + datetime.timedelta(days=day)
+                    for day in range(4 * 365 + 1)]
+    assert calendar.dates("WE") == [date for date in weekend_days if date.weekday() >= 5]
+    assert gtfs.service_calendar() is calendar
+
+    assert {trip.service_id for trip in gtfs.trips_on_date("20070605")} == {"FULLW"}
+    gtfs.service_exceptions.pop()
+    assert gtfs.service_calendar() is not calendar
+    assert gtfs.service_calendar().active_services("20070604") == {"FULLW"}
+
+def test_empty():
+    """
+    test_empty: a feed without services has no active services
+    """
+    calendar = ServiceCalendar([], [])
+    assert calendar.active_services("20240101") == frozenset()
+    assert not calendar.is_active("S", "20240101")
@@ -0,0 +1,125 @@
+"""
+test_snapshot.py: tests for realtime_gtfs/snapshot.py
+"""
+
+import pickle
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+from realtime_gtfs import snapshot
+from realtime_gtfs.columnar import StopTimeTable
+from realtime_gtfs.exceptions import SnapshotError
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+def assert_same_feed(loaded, gtfs):
+    """
+    assert_same_feed: every table of loaded equals the one of gtfs
+    """
+    for attribute in snapshot.MODEL_ATTRIBUTES + ["stop_times", "shapes", "feed_info"]:
+        assert getattr(loaded, attribute) == getattr(gtfs, attribute), attribute
+    assert loaded.feed_hash == gtfs.feed_hash
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_roundtrip(gtfs, tmp_path, columnar):
+    """
+    test_roundtrip: a snapshot holds every table, in the representation the
+    loading instance uses
+    """
+    path = tmp_path / "feed.snapshot"
+    gtfs.save_snapshot(path)
+    loaded = GTFS(columnar=columnar)
+    assert loaded.load_snapshot(path, ZIP_FILE)
+    assert_same_feed(loaded, gtfs)
+    assert isinstance(loaded.stop_times, StopTimeTable) == columnar
+    assert loaded.feed_hash == snapshot.feed_hash(ZIP_FILE)
+
+def test_without_zip(gtfs, tmp_path):
+    """
+    test_without_zip: without a feed to fall back to, a missing snapshot raises
+    """
+    path = tmp_path / "feed.snapshot"
+    with pytest.raises(SnapshotError):
+        GTFS().load_snapshot(path)
+    gtfs.save_snapshot(path)
+    loaded = GTFS()
+    assert loaded.load_snapshot(path)
+    assert_same_feed(loaded, gtfs)
+
+def test_missing_snapshot(gtfs, tmp_path):
+    """
+    test_missing_snapshot: the feed is parsed and the snapshot written
+    """
+    path = tmp_path / "feed.snapshot"
+    loaded = GTFS()
+    assert not loaded.load_snapshot(path, ZIP_FILE)
+    assert_same_feed(loaded, gtfs)
+    assert path.exists()
+    assert GTFS().load_snapshot(path, ZIP_FILE)
+
+def test_version_mismatch(gtfs, tmp_path, monkeypatch):
+    """
+    test_version_mismatch: a snapshot of another format version is parsed again
+    """
+    path = tmp_path / "feed.snapshot"
+    monkeypatch.setattr(snapshot, "SNAPSHOT_VERSION", 0)
+    gtfs.save_snapshot(path)
+    monkeypatch.undo()
+    with pytest.raises(SnapshotError):
+        GTFS().load_snapshot(path)
+    loaded = GTFS()
+    assert not loaded.load_snapshot(path, ZIP_FILE)
+    assert_same_feed(loaded, gtfs)
+    assert GTFS().load_snapshot(path)
+
+def test_layout_mismatch(gtfs, tmp_path, monkeypatch):
+    """
+    test_layout_mismatch: a snapshot written for other models is not used
+    """
+    path = tmp_path / "feed.snapshot"
+    gtfs.save_snapshot(path)
+    monkeypatch.setattr(snapshot, "_layout", lambda: {})
+    loaded = GTFS()
+    with pytest.raises(SnapshotError):
+        loaded.load_snapshot(path)
+    assert not loaded.stops
+
+def test_other_feed(gtfs, tmp_path):
+    """
+    test_other_feed: a snapshot of another feed is replaced
+    """
+    path = tmp_path / "feed.snapshot"
+    gtfs.save_snapshot(path)
+    other_path = tmp_path / "other.zip"
+    with zipfile.ZipFile(other_path, "w") as other:
+        for name in ZIP_FILE.namelist():
+            data = ZIP_FILE.read(name)
+            if name == "stops.txt":
+                data = b"\n".join(data.splitlines()[:3])
+            other.writestr(name, data)
+
+    with zipfile.ZipFile(other_path) as other:
+        loaded = GTFS()
+        assert not loaded.load_snapshot(path, other)
+        assert len(loaded.stops) == 2
+        assert GTFS().load_snapshot(path, other)
+
+@pytest.mark.parametrize("payload", [
+    b"", b"garbage", b"cnosuchmodule\nthing\n.", b"c__builtin__\nint\n(S'x'\ntR.",
+    pickle.dumps([1, 2]), pickle.dumps({"layout": None}), pickle.dumps(len)[:-3]])
+def test_damaged_snapshot(tmp_path, payload):
+    """
+    test_damaged_snapshot: any snapshot that can not be unpickled raises SnapshotError
+    """
+    path = tmp_path / "feed.snapshot"
+    path.write_bytes(snapshot.HEADER.pack(snapshot.SNAPSHOT_MAGIC, snapshot.SNAPSHOT_VERSION,
+                                          snapshot.NO_HASH) + payload)
+    loaded = GTFS()
+    with pytest.raises(SnapshotError):
+        loaded.load_snapshot(path)
+    assert not loaded.stops
+    path.write_bytes(payload[:4])
+    with pytest.raises(SnapshotError):
+        loaded.load_snapshot(path)
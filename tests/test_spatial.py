@@ -0,0 +1,128 @@
+"""
+test_spatial.py: tests for realtime_gtfs/spatial.py and the spatial queries of GTFS
+"""
+
+import random
+import zipfile
+
+import pytest
+
+from realtime_gtfs import GTFS
+from realtime_gtfs.models import Stop
+from realtime_gtfs.spatial import StopIndex, haversine
+
+ZIP_FILE = zipfile.ZipFile("./tests/static/sample-feed.zip")
+
+def random_stops(rng, count, bounds):
+    """
+    random_stops: `count` stops at random coordinates within (min_lat, min_lon, max_lat, max_lon)
+    """
+    min_lat, min_lon, max_lat, max_lon = bounds
+    return Stop.from_rows(("stop_id", "stop_lat", "stop_lon"),
+                          [(f"S{index}", rng.uniform(min_lat, max_lat),
+                            rng.uniform(min_lon, max_lon)) for index in range(count)])
+
+@pytest.fixture(name="stops", scope="module", params=[
+    (-90, -180, 90, 180), (49.5, 2.5, 51.5, 6.4)], ids=["world", "belgium"])
+def fixture_stops(request):
+    """
+    fixture_stops: 100k random stops spread over the world or over a country
+    """
+    return random_stops(random.Random(1), 100000, request.param)
+
+def oracle(stops, lat, lon):
+    """
+    oracle: (distance, stop_id) of all stops, nearest first, the slow way
+    """
+    return sorted((haversine(lat, lon, stop.stop_lat, stop.stop_lon), stop.stop_id)
+                  for stop in stops)
+
+def random_points(rng, stops, count):
+    """
+    random_points: `count` points near random stops and a few anywhere in
+    the world, poles and antimeridian included
+    """
+    points = [(stop.stop_lat + rng.uniform(-0.1, 0.1), stop.stop_lon + rng.uniform(-0.1, 0.1))
+              for stop in rng.sample(stops, count)]
+    points = [(max(-90, min(90, lat)), (lon + 180) % 360 - 180) for lat, lon in points]
+    return points + [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(2)] + \
+        [(90, 0), (-89.999, 179.99), (0, -180), (12.5, 179.999)]
+
+def test_against_oracle(stops):
+    """
+    test_against_oracle: the index finds the stops a scan of all stops finds
+    """
+    index = StopIndex(stops)
+    rng = random.Random(2)
+    for lat, lon in random_points(rng, stops, 3):
+        expected = oracle(stops, lat, lon)
+        for k in [1, 10]:
+            found = index.nearest_stops(lat, lon, k)
+            assert [(distance, stop.stop_id) for distance, stop in found] == expected[:k]
+        for radius in [500, 20000, 100000]:
+            found = index.stops_within(lat, lon, radius)
+            assert [(distance, stop.stop_id) for distance, stop in found] == \
+                [(distance, stop_id) for distance, stop_id in expected if distance <= radius]
+
+def test_bbox_against_oracle(stops):
+    """
+    test_bbox_against_oracle: the index finds the stops in a box a scan finds,
+    for boxes crossing the antimeridian too
+    """
+    index = StopIndex(stops)
+    rng = random.Random(3)
+    for _ in range(20):
+        lat, lon = rng.choice(stops).stop_lat, rng.choice(stops).stop_lon
+        size = rng.choice([0.01, 0.5, 30])
+        min_lon, max_lon = lon - size, lon + rng.uniform(0, size)
+        if min_lon < -180:
+            min_lon += 360
+        box = (lat - size, min_lon, lat + size, max_lon)
+        expected = [stop for stop in stops if box[0] <= stop.stop_lat <= box[2] and (
+            box[1] <= stop.stop_lon <= box[3] if box[1] <= box[3] else
+            stop.stop_lon >= box[1] or stop.stop_lon <= box[3])]
+        assert index.stops_in_bbox(*box) == expected
+    assert index.stops_in_bbox(10, 0, -10, 1) == []
+
+def test_cell_sizes():
+    """
+    test_cell_sizes: the results do not depend on the size of the cells
+    """
+    rng = random.Random(4)
+    stops = random_stops(rng, 2000, (-60, 170, 60, 180)) + \
+        random_stops(rng, 2000, (-60, -180, 60, -170))
+    expected = StopIndex(stops, cell_size=360).nearest_stops(0, 180, 25)
+    for cell_size in [0.01, 0.3, 7]:
+        index = StopIndex(stops, cell_size=cell_size)
+        assert index.nearest_stops(0, 180, 25) == expected
+        assert index.stops_within(0, -180, 300000) == StopIndex(stops, 360).stops_within(
+            0, -180, 300000)
+
+def test_empty_and_missing_coordinates():
+    """
+    test_empty_and_missing_coordinates: stops without coordinates are left out
+    """
+    assert StopIndex([]).nearest_stops(0, 0, 3) == []
+    stops = Stop.from_rows(("stop_id", "stop_lat", "stop_lon"),
+                           [("A", None, None), ("B", 1.0, 1.0)])
+    index = StopIndex(stops)
+    assert [stop.stop_id for _, stop in index.nearest_stops(0, 0, 5)] == ["B"]
+    assert index.nearest_stops(0, 0, 0) == []
+
+def test_gtfs():
+    """
+    test_gtfs: the spatial queries of GTFS on the sample feed
+    """
+    gtfs = GTFS()
+    gtfs.from_zip(ZIP_FILE)
+    stop = gtfs.stop_by_id("BEATTY_AIRPORT")
+    distance, nearest = gtfs.nearest_stops(stop.stop_lat, stop.stop_lon)[0]
+    assert nearest is stop and distance == 0
+    assert [found.stop_id for _, found in gtfs.stops_within(36.905, -116.76, 1000)] == \
+        ["EMSI", "DADAN"]
+    assert {found.stop_id for found in gtfs.stops_in_bbox(36.4, -117.2, 36.95, -116.7)} == \
+        {stop.stop_id for stop in gtfs.stops if stop.stop_lat < 36.95 and stop.stop_lon < -116.7}
+    index = gtfs.stop_index()
+    assert gtfs.stop_index() is index
+    gtfs.stops = gtfs.stops[:2]
+    assert len(gtfs.stop_index().stops) == 2
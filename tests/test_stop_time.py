@@ -70,11 +70,29 @@ def test_missing_key():
         StopTime.from_gtfs(temp_dict.keys(), temp_dict.values())
 
 
+def test_times():
+    """
+    test_times: times are kept as seconds, past midnight included
+    """
+    assert MINIMAL_STOP_TIME.arrival_time == 1 * 3600 + 23 * 60 + 45
+    assert MINIMAL_STOP_TIME.departure_time is None
+    assert FULL_STOP_TIME.departure_time == 25 * 3600 + 23 * 60 + 45
+    assert FULL_STOP_TIME.to_gtfs()["departure_time"] == "25:23:45"
+    assert FULL_STOP_TIME.to_gtfs()["arrival_time"] == "01:23:45"
+
 def test_invalid_values():
     """
     test_invalid_values: test for values out of range, invalid enums, ...
     """
-    # TODO: test times
+    temp_dict = MINIMAL_STOP_TIME_DICT.copy()
+    temp_dict["arrival_time"] = "-1:00:00"
+    with pytest.raises(InvalidValueError):
+        StopTime.from_gtfs(temp_dict.keys(), temp_dict.values())
+
+    temp_dict = MINIMAL_STOP_TIME_DICT.copy()
+    temp_dict["arrival_time"] = "1:23"
+    with pytest.raises(ValueError):
+        StopTime.from_gtfs(temp_dict.keys(), temp_dict.values())
 
     temp_dict = MINIMAL_STOP_TIME_DICT.copy()
     temp_dict["stop_sequence"] = "-1"
@@ -0,0 +1,90 @@
+"""
+test_versions.py: tests for realtime_gtfs/versions.py
+"""
+
+import copy
+
+import pytest
+import sqlalchemy
+
+from realtime_gtfs.exceptions import VersionError
+from realtime_gtfs.versions import FeedVersions
+
+@pytest.fixture(name="feed_versions")
+def fixture_feed_versions(tmp_path):
+    """
+    fixture_feed_versions: FeedVersions on an empty SQLite database
+    """
+    feed_versions = FeedVersions(f"sqlite:///{tmp_path / 'gtfs.sqlite'}", keep=2)
+    yield feed_versions
+    feed_versions.close()
+
+def count_stops(feed_versions):
+    """
+    count_stops: number of stops readers see
+    """
+    return feed_versions.engine.execute("SELECT COUNT(*) FROM stops").scalar()
+
+def table_names(feed_versions):
+    """
+    table_names: names of all tables in the database
+    """
+    return set(sqlalchemy.inspect(feed_versions.engine).get_table_names())
+
+def test_load_and_activate(feed_versions, gtfs):
+    """
+    test_load_and_activate: readers see the active version through views
+    """
+    assert feed_versions.active_version() is None
+    assert feed_versions.load(gtfs) == 1
+    assert feed_versions.active_version() == 1
+    assert count_stops(feed_versions) == len(gtfs.stops)
+    assert "stops__v1" in table_names(feed_versions)
+    assert "stops" in sqlalchemy.inspect(feed_versions.engine).get_view_names()
+
+    smaller = copy.deepcopy(gtfs)
+    smaller.stops = smaller.stops[:1]
+    smaller.pathways = []
+    smaller.transfers = []
+    assert feed_versions.load(smaller, activate=False) == 2
+    assert count_stops(feed_versions) == len(gtfs.stops)
+    feed_versions.activate(2)
+    assert count_stops(feed_versions) == 1
+
+def test_rollback(feed_versions, gtfs):
+    """
+    test_rollback: go back to the previous version
+    """
+    feed_versions.load(gtfs)
+    with pytest.raises(VersionError):
+        feed_versions.rollback()
+    feed_versions.load(gtfs)
+    assert feed_versions.rollback() == 1
+    assert feed_versions.active_version() == 1
+    assert count_stops(feed_versions) == len(gtfs.stops)
+    with pytest.raises(VersionError):
+        feed_versions.activate(7)
+
+def test_prune(feed_versions, gtfs):
+    """
+    test_prune: only the newest versions are kept
+    """
+    for _ in range(3):
+        feed_versions.load(gtfs)
+    assert feed_versions.versions() == [2, 3]
+    assert not any(name.endswith("__v1") for name in table_names(feed_versions))
+    with pytest.raises(VersionError):
+        feed_versions.drop(3)
+
+def test_failed_load(feed_versions, gtfs):
+    """
+    test_failed_load: a feed that fails to load leaves the active version alone
+    """
+    feed_versions.load(gtfs)
+    broken = copy.deepcopy(gtfs)
+    broken.stops.append(broken.stops[0])
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        feed_versions.load(broken)
+    assert feed_versions.versions() == [1]
+    assert not any(name.endswith("__v2") for name in table_names(feed_versions))
+    assert count_stops(feed_versions) == len(gtfs.stops)